@@ -8,55 +8,171 @@ Run by hand once after installing Ollama and pulling the model:
 
 Safe to re-run: already-tagged recipes are skipped. Saves periodically so a long
 run can be interrupted and resumed without losing progress.
+
+After retraining the seasonal model, rescore the recipes whose seasonality is
+stale (scored by another model, or from different recipe text):
+
+    python backfill_seasonality.py --retag
+
+Works on whichever RECIPE_STORE is configured (JSON files, corpus or SQLite).
 """
 
 from __future__ import annotations
 
 import logging
-from typing import Any
+import sys
+from functools import partial
+from typing import TYPE_CHECKING, Any, cast
 
 from tqdm import tqdm
 
-from config import UNUSED_MAINS_FILENAME, UNUSED_SIDES_FILENAME
-from file_utils import load_json, save_json
-from seasonal_tagging import ensure_recipe_tagged
+from config import (
+    FAILED_FILENAME,
+    JOURNAL_COMPACT_BYTES,
+    RECIPE_DB_FILENAME,
+    RECIPE_STORE,
+    TAGGING_BATCH_SIZE,
+    UNUSED_MAINS_FILENAME,
+    UNUSED_SIDES_FILENAME,
+    USED_FILENAME,
+)
+from file_utils import append_journal, load_json, save_json
+from recipe_corpus import corpus_path, load_corpus, save_corpus
+from recipe_db import open_recipe_db
+from seasonal_tagging import ensure_recipes_tagged, is_stale, retag_recipes
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Mapping, MutableMapping
+    from pathlib import Path
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
 def backfill_file(
-    filename: str, recipes: dict[str, dict[str, Any]], save_every: int = 25
+    filename: str,
+    recipes: MutableMapping[str, dict[str, Any]],
+    save_every: int = 25,
+    retag: bool = False,
+    save: Callable[[MutableMapping[str, dict[str, Any]]], None] | None = None,
+    journal: bool = True,
+    batch_size: int = TAGGING_BATCH_SIZE,
 ) -> int:
-    """Tag every untagged recipe in `recipes`, saving every `save_every` changes.
+    """Tag every untagged recipe, checkpointing every `save_every` changes.
 
-    Returns the number of recipes newly tagged.
+    Recipes are scored `batch_size` at a time, one model pass per batch, and the
+    changed ones are assigned back into `recipes`. Once `save_every` changes
+    are pending (checked after each batch) they are appended to filename's
+    journal, so an interrupted run resumes from there; the journal is compacted
+    with `save` (default: save_json to filename) once at the end, or sooner if
+    it outgrows JOURNAL_COMPACT_BYTES. journal=False skips the checkpoints, for
+    stores that write every assignment themselves. With retag, only recipes
+    whose seasonality is stale are batched, and they are rescored (see
+    seasonal_tagging.retag_recipes).
+    Returns the number of recipes newly tagged (or rescored).
     """
+    if save is None:
+        save = partial(_save_json, filename)
+    tag = retag_recipes if retag else ensure_recipes_tagged
     tagged = 0
-    for recipe in tqdm(recipes.values(), desc=filename):
-        if ensure_recipe_tagged(recipe):
-            tagged += 1
-            if tagged % save_every == 0:
-                save_json(filename, recipes)
+    pending: dict[str, dict[str, Any]] = {}
+    items = list(recipes.items())
+    if retag:
+        items = [(url, recipe) for url, recipe in items if is_stale(recipe)]
+
+    def checkpoint() -> None:
+        # Plain dicts, so corpus LazyRecipes encode too.
+        records = {url: dict(recipe) for url, recipe in pending.items()}
+        if journal and append_journal(filename, records) > JOURNAL_COMPACT_BYTES:
+            save(recipes)
+        pending.clear()
+
+    with tqdm(total=len(items), desc=filename) as progress:
+        for start in range(0, len(items), batch_size):
+            batch = items[start : start + batch_size]
+            flags = tag([recipe for _, recipe in batch])
+            for (url, recipe), flag in zip(batch, flags, strict=True):
+                if flag:
+                    recipes[url] = recipe
+                    pending[url] = recipe
+                    tagged += 1
+            if len(pending) >= save_every:
+                checkpoint()
+            progress.update(len(batch))
+    if pending:
+        checkpoint()
     if tagged:
-        save_json(filename, recipes)
+        save(recipes)
     return tagged
 
 
-def main() -> None:
-    """Backfill both unused recipe files and print a summary."""
+def _save_json(filename: str | Path, recipes: Mapping[str, Any]) -> None:
+    """save_json for the JSON store, whose recipes are always a plain dict."""
+    save_json(filename, cast("dict[str, Any]", recipes))
+
+
+def _log_summary(
+    name: str, recipes: MutableMapping[str, dict[str, Any]], tagged: int
+) -> None:
+    """Log how many recipes were tagged and how many still lack seasonality."""
+    still_untagged = sum(1 for r in recipes.values() if "seasonality" not in r)
+    logger.info(
+        f"{name}: tagged {tagged}, {still_untagged} still untagged "
+        f"(model failures — re-run to retry)"
+    )
+
+
+def _backfill_files(retag: bool) -> int:
+    """Backfill (or retag) the unused mains/sides JSON (or corpus) files."""
     total = 0
     for filename in (UNUSED_MAINS_FILENAME, UNUSED_SIDES_FILENAME):
-        recipes, _ = load_json(filename)
-        tagged = backfill_file(filename, recipes)
-        still_untagged = sum(1 for r in recipes.values() if "seasonality" not in r)
-        logger.info(
-            f"{filename}: tagged {tagged}, {still_untagged} still untagged "
-            f"(model failures — re-run to retry)"
-        )
+        path: str | Path
+        if RECIPE_STORE == "corpus":
+            path = corpus_path(filename)
+            recipes, _ = load_corpus(path, migrate_from=filename)
+            save = partial(save_corpus, path)
+        else:
+            path = filename
+            recipes, _ = load_json(path)
+            save = partial(_save_json, path)
+        tagged = backfill_file(str(path), recipes, retag=retag, save=save)
+        _log_summary(str(path), recipes, tagged)
         total += tagged
+    return total
+
+
+def _backfill_database(retag: bool) -> int:
+    """Backfill (or retag) unused mains/sides in the SQLite store."""
+    db = open_recipe_db(
+        RECIPE_DB_FILENAME,
+        UNUSED_MAINS_FILENAME,
+        UNUSED_SIDES_FILENAME,
+        FAILED_FILENAME,
+        USED_FILENAME,
+    )
+    total = 0
+    try:
+        for name, table in (("mains", db.mains), ("sides", db.sides)):
+            # The table's views already wrote each recipe as it was assigned.
+            tagged = backfill_file(
+                name, table, retag=retag, save=lambda _: None, journal=False
+            )
+            _log_summary(f"{RECIPE_DB_FILENAME} {name}", table, tagged)
+            total += tagged
+    finally:
+        db.close()
+    return total
+
+
+def main(retag: bool = False) -> None:
+    """Backfill (or retag) the configured recipe store and print a summary."""
+    total = (
+        _backfill_database(retag)
+        if RECIPE_STORE == "sqlite"
+        else _backfill_files(retag)
+    )
     logger.info(f"Backfill complete: {total} recipe(s) tagged.")
 
 
 if __name__ == "__main__":
-    main()
+    main(retag="--retag" in sys.argv[1:])
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""Benchmark the JSON codecs on the real data files.
+
+Run by hand from the repo root (orjson is optional: pip install orjson):
+
+    python benchmark_json_codecs.py
+
+For every data file present and every available codec, reports the time to
+load and save it and its size on disk, indented and compact. Saves go to a
+temp directory, so the real files are never touched.
+"""
+
+from __future__ import annotations
+
+import tempfile
+import time
+from pathlib import Path
+from typing import Any
+
+from config import (
+    FAILED_FILENAME,
+    SEASONAL_LABELS_FILENAME,
+    SEASONAL_MODEL_FILENAME,
+    UNUSED_MAINS_FILENAME,
+    UNUSED_SIDES_FILENAME,
+    USED_FILENAME,
+)
+from file_utils import JsonCodec, get_codec
+
+DATA_FILES = (
+    UNUSED_MAINS_FILENAME,
+    UNUSED_SIDES_FILENAME,
+    FAILED_FILENAME,
+    USED_FILENAME,
+    SEASONAL_MODEL_FILENAME,
+    SEASONAL_LABELS_FILENAME,
+)
+
+
+def available_codecs() -> list[JsonCodec]:
+    """Return the stdlib codec, plus orjson if it is installed."""
+    codecs = [get_codec("stdlib")]
+    fast = get_codec("auto")
+    if fast.name != "stdlib":
+        codecs.append(fast)
+    return codecs
+
+
+def _best_of(repeat: int, func: Any) -> float:
+    """Return the fastest of repeat calls to func, in milliseconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def benchmark_file(
+    path: Path, codec: JsonCodec, out_dir: Path, repeat: int = 5
+) -> list[dict[str, Any]]:
+    """Time loading and saving path with codec, indented and compact."""
+    raw = path.read_bytes()
+    data = codec.loads(raw)
+    rows = []
+    for compact in (False, True):
+        target = out_dir / f"{path.name}.{codec.name}.{int(compact)}"
+
+        def save(target: Path = target, compact: bool = compact) -> None:
+            target.write_bytes(codec.dumps(data, compact=compact))
+
+        save_ms = _best_of(repeat, save)
+        encoded = target.read_bytes()
+        load_ms = _best_of(repeat, lambda encoded=encoded: codec.loads(encoded))
+        rows.append(
+            {
+                "file": path.name,
+                "codec": codec.name,
+                "mode": "compact" if compact else "indent",
+                "load_ms": load_ms,
+                "save_ms": save_ms,
+                "size_kb": len(encoded) / 1024,
+            }
+        )
+    return rows
+
+
+def main() -> None:
+    """Benchmark every data file present with every available codec."""
+    codecs = available_codecs()
+    print(
+        f"{'file':<28} {'codec':<7} {'mode':<8} {'load ms':>8} "
+        f"{'save ms':>8} {'size KB':>9}"
+    )
+    with tempfile.TemporaryDirectory() as tmp:
+        for filename in DATA_FILES:
+            path = Path(filename)
+            if not path.exists():
+                continue
+            for codec in codecs:
+                for row in benchmark_file(path, codec, Path(tmp)):
+                    print(
+                        f"{row['file']:<28} {row['codec']:<7} {row['mode']:<8} "
+                        f"{row['load_ms']:>8.1f} {row['save_ms']:>8.1f} "
+                        f"{row['size_kb']:>9.0f}"
+                    )
+
+
+if __name__ == "__main__":
+    main()
@@ -15,6 +15,7 @@ from dotenv import load_dotenv
 load_dotenv()
 
 __all__ = [
+    "COMPACT_JSON_FILES",
     "DEBUG_TIMEOUT",
     "EMAIL_BCC",
     "EMAIL_PASSWORD",
@@ -25,28 +26,53 @@ __all__ = [
     "HEADERS",
     "HEALTH_SUBJECT",
     "HEAT_WEIGHT",
+    "HOST_BURST",
+    "HOST_MAX_CONNECTIONS",
+    "HOST_REQUESTS_PER_SECOND",
+    "HTTP_CACHE_DIR",
+    "HTTP_CACHE_MAX_BYTES",
+    "HTTP_CACHE_TTL_SECONDS",
+    "HTTP_POOL_CONNECTIONS",
+    "HTTP_POOL_MAXSIZE",
+    "JOURNAL_COMPACT_BYTES",
+    "JSONLD_FAST_PATH",
+    "JSON_CODEC",
     "LANDFOOD_COUNT_NO_SEAFOOD",
     "LANDFOOD_COUNT_WITH_SEAFOOD",
     "LANDFOOD_PROTEINS",
+    "LISTING_CONCURRENCY",
+    "LISTING_PER_HOST",
     "MIN_SCORE",
     "NORMAL_TIMEOUT",
     "OLLAMA_HOST",
     "OLLAMA_TIMEOUT",
     "PUBLISH_PAGE_FILENAME",
+    "RECIPE_DB_FILENAME",
+    "RECIPE_STORE",
     "REQUIRED_RECIPE_KEYS",
     "SCRAPE_FLUSH_INTERVAL",
+    "SCRAPE_PARSE_WORKERS",
+    "SCRAPE_WORKERS",
     "SEAFOOD_COUNT",
     "SEAFOOD_PROTEINS",
+    "SEASONAL_FEATURIZER",
+    "SEASONAL_HASH_FEATURES",
     "SEASONAL_LABELS_FILENAME",
     "SEASONAL_MODEL",
     "SEASONAL_MODEL_FILENAME",
+    "SEASONAL_QUANTIZATION",
+    "SEASONAL_QUANTIZATION_MAX_MAE_DELTA",
     "SELECTION_SHARPNESS",
     "SITE_HEALTH_FILENAME",
     "SMTP_PORT",
     "SMTP_SERVER",
     "SPRING_CENTER",
+    "STATE_COMPRESSION",
+    "STORED_RECIPE_KEYS",
     "SUBJECT",
     "SUMMER_CENTER",
+    "TAGGING_BATCH_SIZE",
+    "TAGGING_QUEUE_FILENAME",
     "UNUSED_MAINS_FILENAME",
     "UNUSED_SIDES_FILENAME",
     "URL_EXCLUSION_PATTERNS",
@@ -64,12 +90,38 @@ VERSION: Final[float] = 17.0
 # Email Subject Line
 SUBJECT: Final[str] = "Weekly Meals"
 
+# Compression for the machine-only state files: "" (plain JSON), ".gz" or
+# ".zst" (needs zstandard). Existing plain files are converted on first load.
+STATE_COMPRESSION: Final[str] = ""
+
 # FILENAME CONSTANTS
-UNUSED_MAINS_FILENAME: Final[str] = "unused_mains_recipes.json"
-UNUSED_SIDES_FILENAME: Final[str] = "unused_sides_recipes.json"
-FAILED_FILENAME: Final[str] = "failed_recipes.json"
+UNUSED_MAINS_FILENAME: Final[str] = "unused_mains_recipes.json" + STATE_COMPRESSION
+UNUSED_SIDES_FILENAME: Final[str] = "unused_sides_recipes.json" + STATE_COMPRESSION
+FAILED_FILENAME: Final[str] = "failed_recipes.json" + STATE_COMPRESSION
 USED_FILENAME: Final[str] = "used_recipes.json"
 SITE_HEALTH_FILENAME: Final[str] = "site_health.json"
+# Newly-scraped recipes awaiting seasonal tagging ({url: unused recipes file}):
+# appended by the scraper, drained by the tagging stage (JSON and corpus stores).
+TAGGING_QUEUE_FILENAME: Final[str] = "tagging_queue.json"
+
+# JSON codec for the state files: "auto" (orjson if installed, else stdlib),
+# "orjson" or "stdlib".
+JSON_CODEC: Final[str] = "auto"
+
+# Machine-only state files, written without indentation (much smaller + faster).
+COMPACT_JSON_FILES: Final[tuple[str, ...]] = (
+    UNUSED_MAINS_FILENAME,
+    UNUSED_SIDES_FILENAME,
+    FAILED_FILENAME,
+    TAGGING_QUEUE_FILENAME,
+)
+
+# Where the unused/used/failed recipe state lives: "json" (the four files above),
+# "sqlite" (RECIPE_DB_FILENAME, migrated from the JSON files on first use) or
+# "corpus" (unused mains/sides in lazily decoded .corpus files beside their JSON
+# files, converted on first use; used/failed stay JSON).
+RECIPE_STORE: Final[str] = "json"
+RECIPE_DB_FILENAME: Final[str] = "recipes.db"
 HEALTH_SUBJECT: Final[str] = "Recipe Emailer — Site Health"
 
 # Standalone HTML page written each run for GitHub Pages publishing. cook.sh
@@ -88,6 +140,33 @@ HEADERS: Final[dict[str, str]] = {
     )
 }
 
+# HTTP CONNECTION POOLING
+# One keep-alive session serves the whole run. Number of per-host pools kept
+# (one per site, with headroom); connections kept open per host follow
+# SCRAPE_WORKERS (see HTTP_POOL_MAXSIZE below).
+HTTP_POOL_CONNECTIONS: Final[int] = 32
+
+# PER-HOST POLITENESS
+# Default budget for any one site while fetching in parallel: sustained requests
+# per second, burst allowance, and simultaneous connections. Individual sites
+# can override requests_per_second / max_connections in websites.WEBSITES.
+HOST_REQUESTS_PER_SECOND: Final[float] = 2.0
+HOST_BURST: Final[int] = 2
+HOST_MAX_CONNECTIONS: Final[int] = 2
+
+# CONDITIONAL-GET HTTP CACHE
+# Listing pages (and, in debug runs, recipe pages) are cached on disk with their
+# ETag / Last-Modified validators; an unchanged page comes back as a bodiless 304.
+HTTP_CACHE_DIR: Final[str] = "http_cache"
+HTTP_CACHE_MAX_BYTES: Final[int] = 64 * 1024 * 1024  # LRU-evicted past this
+HTTP_CACHE_TTL_SECONDS: Final[int] = 30 * 24 * 3600  # drop entries after 30 days
+
+# LISTING-PAGE DISCOVERY
+# Every site's main + side listing pages are fetched at once before scraping.
+# Total listing fetches in flight, and in flight against any single host.
+LISTING_CONCURRENCY: Final[int] = 8
+LISTING_PER_HOST: Final[int] = 2
+
 # TIMEOUT SETTINGS (in seconds)
 DEBUG_TIMEOUT: Final[int] = 20
 NORMAL_TIMEOUT: Final[int] = 9
@@ -109,6 +188,31 @@ REQUIRED_RECIPE_KEYS: Final[tuple[str, ...]] = (
     "image",
 )
 
+# Fields kept when a scraped recipe is stored; everything else the parsers return
+# (ingredient_groups, instructions_list, nutrients, description, ...) is dropped
+# to keep the state files small. REQUIRED_RECIPE_KEYS plus what the email
+# (yields), the seasonal model (keywords) and tagging (oven_use, seasonality,
+# and the cached selection features from recipe_selector.ensure_features) read.
+# Add a field here before using it anywhere; run slim_recipes.py to apply a
+# shorter list to recipes already stored.
+STORED_RECIPE_KEYS: Final[tuple[str, ...]] = (
+    *REQUIRED_RECIPE_KEYS,
+    "canonical_url",
+    "yields",
+    "keywords",
+    "parser",
+    "oven_use",
+    "seasonality",
+    "seasonality_stamp",
+    "protein",
+    "has_veggies",
+    "feature_hash",
+)
+
+# Build recipes straight from a page's schema.org Recipe JSON-LD when it has all
+# REQUIRED_RECIPE_KEYS, skipping the much heavier recipe_scrapers parse.
+JSONLD_FAST_PATH: Final[bool] = True
+
 # URL CLEANUP PATTERNS
 # URLs containing these patterns will be filtered out
 URL_EXCLUSION_PATTERNS: Final[tuple[tuple[str, ...], ...]] = (
@@ -196,6 +300,23 @@ VEGGIES: Final[tuple[str, ...]] = (
 # How often (in scraped URLs) to flush recipe progress to disk during scraping.
 SCRAPE_FLUSH_INTERVAL: Final[int] = 100
 
+# Flushes append only the new records to a "<file>.journal" next to the JSON
+# snapshot; once a journal grows past this size it is compacted into the snapshot.
+JOURNAL_COMPACT_BYTES: Final[int] = 8 * 1024 * 1024
+# Queued recipes tagged (one model pass) and journaled per batch.
+TAGGING_BATCH_SIZE: Final[int] = 256
+
+# Recipe pages fetched + scraped concurrently. Also the cap on pages held in
+# memory at once; 1 restores the strictly serial one-page-at-a-time stream.
+SCRAPE_WORKERS: Final[int] = 4
+# Connections kept open per host: one per worker, so concurrent fetches to one
+# site never open throwaway sockets.
+HTTP_POOL_MAXSIZE: Final[int] = SCRAPE_WORKERS
+
+# Parser processes that turn fetched HTML into recipe dicts (CPU-bound lxml /
+# schema.org parsing), one per core by default. 0 parses in the fetch threads.
+SCRAPE_PARSE_WORKERS: Final[int] = os.cpu_count() or 1
+
 # SEASONAL AI SELECTION SETTINGS
 # Ollama endpoint + model for seasonal scoring (small local model on the Pi 4).
 OLLAMA_HOST: Final[str] = os.getenv("OLLAMA_HOST", "http://localhost:11434")
@@ -221,3 +342,13 @@ WINTER_CENTER: Final[int] = 355  # ~Dec 21
 # teacher label file used to train it (desktop-only).
 SEASONAL_MODEL_FILENAME: Final[str] = "seasonal_model.json"
 SEASONAL_LABELS_FILENAME: Final[str] = "seasonal_labels.json"
+# Student featurizer used when training (desktop-only; the Pi reads the choice
+# from the artifact): "vocabulary" stores the trained token -> column mapping,
+# "hashing" hashes each token into SEASONAL_HASH_FEATURES columns instead.
+SEASONAL_FEATURIZER: Final[str] = os.getenv("SEASONAL_FEATURIZER", "vocabulary")
+SEASONAL_HASH_FEATURES: Final[int] = 4096
+# Training only: store the binary model weights as "float16" or "int8" (per-column
+# scale) instead of float64 ("" = full precision), but refuse to export if that
+# worsens holdout MAE by more than SEASONAL_QUANTIZATION_MAX_MAE_DELTA.
+SEASONAL_QUANTIZATION: Final[str] = os.getenv("SEASONAL_QUANTIZATION", "")
+SEASONAL_QUANTIZATION_MAX_MAE_DELTA: Final[float] = 0.005
@@ -2,23 +2,82 @@
 
 This module provides functions for saving and loading JSON files,
 as well as checking file age for cache invalidation.
+
+A JSON file may have an append-only journal beside it ("<name>.journal", one
+JSON record per line) holding changes made since the file was last saved in
+full. load_json replays it over the snapshot; save_json writes a fresh snapshot
+and drops the journal (compaction).
+
+Snapshots are written crash-safely: to a temp file that is fsynced, then
+renamed over the target, with the previous snapshot kept as "<name>.bak".
+load_json falls back to the backup if the file is missing or unreadable.
+save_snapshots groups files written by any SnapshotWriter (a JSON file, a
+recipe corpus) so they are replaced together.
+
+Encoding goes through a pluggable JsonCodec (see get_codec): orjson when it is
+installed, else the standard library. Files named in COMPACT_JSON_FILES are
+machine-only and written without indentation.
+
+A name ending in ".gz" (gzip) or ".zst" (zstd, needs zstandard) is compressed
+as it is written. Loading a compressed file that doesn't exist yet converts the
+plain JSON file of the same name, if there is one.
 """
 
 from __future__ import annotations
 
+import gzip
 import json
 import logging
+import os
+import shutil
 import time
+import zlib
+from collections.abc import Callable
+from contextlib import nullcontext
+from functools import cache
 from pathlib import Path
-from typing import Any, TypeAlias
-
-__all__ = ["save_json", "load_json", "is_file_old", "FileLoadResult"]
+from typing import IO, TYPE_CHECKING, Any, Protocol, TypeAlias
+
+from config import COMPACT_JSON_FILES, JSON_CODEC
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Mapping
+
+__all__ = [
+    "save_json",
+    "save_json_many",
+    "save_snapshots",
+    "json_writer",
+    "SnapshotWriter",
+    "load_json",
+    "backup_path",
+    "replace_with_backup",
+    "append_journal",
+    "journal_path",
+    "replay_journal",
+    "is_file_old",
+    "FileLoadResult",
+    "JsonCodec",
+    "StdlibCodec",
+    "OrjsonCodec",
+    "get_codec",
+    "COMPRESSED_SUFFIXES",
+    "plain_path",
+]
 
 # Type alias for clarity
 FileLoadResult: TypeAlias = tuple[dict[str, Any], bool]
+# Writes one complete snapshot into the open (temp) file it is handed.
+SnapshotWriter: TypeAlias = Callable[[IO[bytes]], None]
 
 logger = logging.getLogger(__name__)
 
+# File name suffixes that mark a compressed snapshot.
+COMPRESSED_SUFFIXES = (".gz", ".zst")
+
+# Characters of encoded JSON StdlibCodec.dump gathers per write.
+_DUMP_BATCH_CHARS = 64 * 1024
+
 
 class FileOperationError(Exception):
     """Raised when a file operation fails."""
@@ -26,9 +85,163 @@ class FileOperationError(Exception):
     pass
 
 
+class JsonCodec(Protocol):
+    """Encoder/decoder pair used for every JSON file this module touches."""
+
+    name: str
+
+    def dumps(self, data: Any, compact: bool = False) -> bytes:
+        """Encode data as UTF-8 JSON; indented unless compact."""
+        ...
+
+    def dump(self, data: Any, fp: IO[bytes], compact: bool = False) -> None:
+        """Write data to fp as UTF-8 JSON, without building the whole text first."""
+        ...
+
+    def loads(self, raw: bytes | str) -> Any:
+        """Decode UTF-8 JSON."""
+        ...
+
+
+class StdlibCodec:
+    """The standard library json module (always available)."""
+
+    name = "stdlib"
+
+    def dumps(self, data: Any, compact: bool = False) -> bytes:
+        """Encode data as UTF-8 JSON; indented unless compact."""
+        return self._encoder(compact).encode(data).encode("utf-8")
+
+    def dump(self, data: Any, fp: IO[bytes], compact: bool = False) -> None:
+        """Write data to fp as UTF-8 JSON, encoded a batch of chunks at a time."""
+        batch: list[str] = []
+        size = 0
+        for chunk in self._encoder(compact).iterencode(data):
+            batch.append(chunk)
+            size += len(chunk)
+            if size >= _DUMP_BATCH_CHARS:
+                fp.write("".join(batch).encode("utf-8"))
+                batch.clear()
+                size = 0
+        fp.write("".join(batch).encode("utf-8"))
+
+    @staticmethod
+    def _encoder(compact: bool) -> json.JSONEncoder:
+        """Return an encoder for the compact or indented layout."""
+        if compact:
+            return json.JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+        return json.JSONEncoder(ensure_ascii=False, indent=2)
+
+    def loads(self, raw: bytes | str) -> Any:
+        """Decode UTF-8 JSON."""
+        return json.loads(raw)
+
+
+class OrjsonCodec:
+    """orjson, several times faster than json (raises ImportError if absent)."""
+
+    name = "orjson"
+
+    def __init__(self) -> None:
+        """Import orjson."""
+        import orjson
+
+        self._orjson = orjson
+
+    def dumps(self, data: Any, compact: bool = False) -> bytes:
+        """Encode data as UTF-8 JSON; indented unless compact."""
+        option = self._orjson.OPT_NON_STR_KEYS
+        if not compact:
+            option |= self._orjson.OPT_INDENT_2
+        return self._orjson.dumps(data, option=option)
+
+    def dump(self, data: Any, fp: IO[bytes], compact: bool = False) -> None:
+        """Write data to fp as UTF-8 JSON (orjson encodes straight to bytes)."""
+        fp.write(self.dumps(data, compact=compact))
+
+    def loads(self, raw: bytes | str) -> Any:
+        """Decode UTF-8 JSON (orjson's errors subclass json.JSONDecodeError)."""
+        return self._orjson.loads(raw)
+
+
+@cache
+def get_codec(name: str = JSON_CODEC) -> JsonCodec:
+    """Return the codec called name: "stdlib", "orjson" or "auto".
+
+    Defaults to the configured JSON_CODEC.
+
+    "auto" picks orjson when it is installed. Asking for orjson without it
+    installed logs a warning and falls back to the standard library.
+    """
+    if name in ("auto", "orjson"):
+        try:
+            return OrjsonCodec()
+        except ImportError:
+            if name == "orjson":
+                logger.warning("orjson is not installed; using the stdlib codec")
+    return StdlibCodec()
+
+
+def _is_compact(filepath: Path) -> bool:
+    """True if filepath is a machine-only file written without indentation."""
+    return filepath.name in COMPACT_JSON_FILES
+
+
+def plain_path(filepath: str | Path) -> Path:
+    """Return filepath without its compression suffix, if it has one."""
+    filepath = Path(filepath)
+    if filepath.suffix in COMPRESSED_SUFFIXES:
+        return filepath.with_suffix("")
+    return filepath
+
+
+def _compressed(filepath: Path, raw: IO[bytes], mode: str) -> Any:
+    """Wrap the open file raw in the stream filepath's suffix calls for.
+
+    Compression streams in chunks, so the encoded JSON is never held twice.
+    """
+    if filepath.suffix == ".gz":
+        return gzip.GzipFile(fileobj=raw, mode=mode, compresslevel=6, mtime=0)
+    if filepath.suffix == ".zst":
+        import zstandard
+
+        if mode == "wb":
+            return zstandard.ZstdCompressor().stream_writer(raw, closefd=False)
+        return zstandard.ZstdDecompressor().stream_reader(raw, closefd=False)
+    return nullcontext(raw)
+
+
+def _read_snapshot(filepath: Path, source: Path | None = None) -> Any:
+    """Decompress and decode a snapshot of filepath read from source.
+
+    source defaults to filepath; compression follows filepath's name either
+    way, so backups decode like the file they back up.
+
+    Raises:
+        OSError: If source can't be read
+        ValueError: If it isn't valid (compressed) JSON
+    """
+    corrupt: tuple[type[Exception], ...] = (EOFError, zlib.error, gzip.BadGzipFile)
+    if filepath.suffix == ".zst":
+        import zstandard
+
+        corrupt += (zstandard.ZstdError,)
+    with (source or filepath).open("rb") as raw:
+        try:
+            with _compressed(filepath, raw, "rb") as f:
+                encoded = f.read()
+        except corrupt as e:
+            raise ValueError(f"corrupt compressed data: {e}") from e
+    return get_codec().loads(encoded)
+
+
 def save_json(filepath: str | Path, data: dict[str, Any]) -> None:
     """Save dictionary data to a JSON file with pretty formatting.
 
+    Crash-safe: see save_snapshots. The file's journal, if any, is deleted:
+    the snapshot now holds everything it recorded. Files listed in
+    COMPACT_JSON_FILES are written without indentation.
+
     Args:
         filepath: Path to the file where data should be saved
         data: Dictionary to serialize to JSON
@@ -39,20 +252,222 @@ def save_json(filepath: str | Path, data: dict[str, Any]) -> None:
     Example:
         >>> save_json("recipes.json", {"recipe1": {"title": "Pasta"}})
     """
+    save_json_many({filepath: data})
+
+
+def save_json_many(files: Mapping[str | Path, dict[str, Any]]) -> None:
+    """Save several JSON files as one crash-safe group (see save_snapshots).
+
+    Args:
+        files: Mapping of path to the dictionary to save there
+
+    Raises:
+        FileOperationError: If any file cannot be written
+    """
+    save_snapshots({path: json_writer(path, data) for path, data in files.items()})
+    for path, data in files.items():
+        logger.debug(f"Saved {len(data)} items to {path}")
+
+
+def json_writer(filepath: str | Path, data: dict[str, Any]) -> SnapshotWriter:
+    """Return a SnapshotWriter that writes data as filepath's JSON snapshot.
+
+    Compression and layout follow filepath's name, as with save_json.
+    """
+    filepath = Path(filepath)
+
+    def write(f: IO[bytes]) -> None:
+        with _compressed(filepath, f, "wb") as out:
+            get_codec().dump(data, out, compact=_is_compact(filepath))
+
+    return write
+
+
+def save_snapshots(writers: Mapping[str | Path, SnapshotWriter]) -> None:
+    """Save several files, each produced by its writer, as one crash-safe group.
+
+    Every file is first written to a temp file and fsynced; only once all of
+    them are safely on disk is each renamed over its target (keeping the old
+    snapshot as "<name>.bak"), followed by one fsync per directory. Journals
+    are dropped last. A failure while writing leaves every target untouched,
+    and a crash at any point leaves each file either old with its journal, or
+    new (at worst with a journal it already contains).
+
+    Args:
+        writers: Mapping of path to the SnapshotWriter for its new contents
+
+    Raises:
+        FileOperationError: If any file cannot be written
+    """
+    written: list[tuple[Path, Path]] = []
+    for filepath, writer in writers.items():
+        target = Path(filepath)
+        try:
+            written.append((target, _write_temp(target, writer)))
+        except (OSError, TypeError, ValueError) as e:
+            for _, tmp in written:
+                tmp.unlink(missing_ok=True)
+            _temp_path(target).unlink(missing_ok=True)
+            logger.error(f"Failed to save {target}: {e}")
+            raise FileOperationError(f"Could not save to {target}") from e
+
+    try:
+        for target, tmp in written:
+            replace_with_backup(tmp, target)
+        for directory in {target.parent for target, _ in written}:
+            _fsync_directory(directory)
+        # Everything in the journals is in the new snapshots, and replaying one
+        # over a later snapshot could resurrect deletions, so drop them -- but
+        # only now: until the snapshots are durable, the journals still hold
+        # progress the old snapshots lack.
+        for target, _ in written:
+            journal_path(target).unlink(missing_ok=True)
+    except OSError as e:
+        logger.error(f"Failed to save {target}: {e}")
+        raise FileOperationError(f"Could not save to {target}") from e
+
+
+def replace_with_backup(tmp: Path, target: Path) -> None:
+    """Atomically rename tmp over target, keeping the old target as its backup.
+
+    The backup is a hard link to the old snapshot (a copy where links aren't
+    supported), so target exists at every instant of the swap.
+    """
+    if target.exists():
+        backup = backup_path(target)
+        backup.unlink(missing_ok=True)
+        try:
+            os.link(target, backup)
+        except OSError:
+            shutil.copy2(target, backup)
+    os.replace(tmp, target)
+
+
+def _temp_path(filepath: Path) -> Path:
+    """Return the temp file a new snapshot of filepath is written to."""
+    return filepath.with_name(f"{filepath.name}.tmp")
+
+
+def _write_temp(filepath: Path, writer: SnapshotWriter) -> Path:
+    """Run writer on filepath's temp sibling and fsync it; return the temp path."""
+    tmp = _temp_path(filepath)
+    with tmp.open("wb") as f:
+        writer(f)
+        f.flush()
+        os.fsync(f.fileno())
+    return tmp
+
+
+def _fsync_directory(directory: Path) -> None:
+    """Persist renames in directory; a no-op where directories can't be synced."""
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def backup_path(filepath: str | Path) -> Path:
+    """Return the path of the previous snapshot kept beside filepath."""
+    filepath = Path(filepath)
+    return filepath.with_name(f"{filepath.name}.bak")
+
+
+def journal_path(filepath: str | Path) -> Path:
+    """Return the path of the append-only journal kept beside filepath."""
     filepath = Path(filepath)
+    return filepath.with_name(f"{filepath.name}.journal")
+
+
+def append_journal(
+    filepath: str | Path,
+    updates: Mapping[str, Any],
+    removals: Iterable[str] = (),
+) -> int:
+    """Append changed and removed keys to filepath's journal.
 
+    Costs O(len(updates)) regardless of the file's size, unlike save_json.
+    Records are replayed in order by load_json, so appending the same key twice
+    is harmless (last write wins).
+
+    Args:
+        filepath: Path to the JSON file the journal belongs to
+        updates: Keys set or replaced since the last flush
+        removals: Keys deleted since the last flush
+
+    Returns:
+        The journal's size in bytes after appending, so callers can decide
+        when to compact it with save_json
+
+    Raises:
+        FileOperationError: If the journal cannot be written
+    """
+    path = journal_path(filepath)
+    codec = get_codec()
     try:
-        with filepath.open("w", encoding="utf-8") as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
-        logger.debug(f"Saved {len(data)} items to {filepath}")
+        lines = [
+            codec.dumps({"op": "set", "key": key, "value": value}, compact=True)
+            for key, value in updates.items()
+        ]
+        lines += [
+            codec.dumps({"op": "del", "key": key}, compact=True) for key in removals
+        ]
+        with path.open("ab") as f:
+            if lines:
+                f.write(b"\n".join(lines) + b"\n")
+                f.flush()
+                os.fsync(f.fileno())
+            size = f.tell()
+        logger.debug(f"Journaled {len(lines)} records to {path}")
+        return size
     except (OSError, TypeError) as e:
-        logger.error(f"Failed to save JSON to {filepath}: {e}")
-        raise FileOperationError(f"Could not save to {filepath}") from e
+        logger.error(f"Failed to append to journal {path}: {e}")
+        raise FileOperationError(f"Could not append to {path}") from e
+
+
+def replay_journal(filepath: str | Path, data: dict[str, Any]) -> int:
+    """Apply filepath's journal records to data in place; return records applied.
+
+    A torn final line (from a crash mid-append) is skipped with a warning.
+    """
+    path = journal_path(filepath)
+    codec = get_codec()
+    applied = 0
+    try:
+        with path.open("rb") as f:
+            for line_number, line in enumerate(f, start=1):
+                try:
+                    record = codec.loads(line)
+                    if record["op"] == "set":
+                        data[record["key"]] = record["value"]
+                    elif record["op"] == "del":
+                        data.pop(record["key"], None)
+                    else:
+                        raise ValueError(record["op"])
+                except (ValueError, KeyError, TypeError):
+                    logger.warning(f"Skipping bad record {path}:{line_number}")
+                    continue
+                applied += 1
+    except FileNotFoundError:
+        return 0
+    except OSError as e:
+        logger.error(f"Error reading journal {path}: {e}")
+    if applied:
+        logger.debug(f"Replayed {applied} journal records onto {filepath}")
+    return applied
 
 
 def load_json(filepath: str | Path) -> FileLoadResult:
     """Load dictionary from a JSON file, creating it if it doesn't exist.
 
+    Any records in the file's journal are replayed on top of the snapshot, so
+    callers see the same dict whether changes were journaled or saved in full.
+
     Args:
         filepath: Path to the JSON file to load
 
@@ -69,28 +484,82 @@ def load_json(filepath: str | Path) -> FileLoadResult:
     filepath = Path(filepath)
 
     try:
-        with filepath.open("r", encoding="utf-8") as f:
-            data = json.load(f)
+        data = _read_snapshot(filepath)
+        replay_journal(filepath, data)
         logger.debug(f"Loaded {len(data)} items from {filepath}")
         return data, False
 
     except FileNotFoundError:
+        recovered = _recover(filepath)
+        if recovered is None:
+            recovered = _convert_plain(filepath)
+        if recovered is not None:
+            return recovered, False
         logger.info(f"File {filepath} not found, creating it...")
         save_json(filepath, {})
         return {}, True
 
-    except json.JSONDecodeError:
-        logger.warning(f"File {filepath} contains invalid JSON, reinitializing...")
+    except ValueError:
+        logger.warning(f"File {filepath} contains invalid JSON")
+        recovered = _recover(filepath)
+        if recovered is not None:
+            return recovered, False
+        logger.warning(f"No backup of {filepath}, reinitializing...")
         save_json(filepath, {})
         return {}, True
 
     except OSError as e:
         logger.error(f"Error reading {filepath}: {e}")
+        recovered = _recover(filepath)
+        if recovered is not None:
+            return recovered, False
         # Still create the file for consistency
         save_json(filepath, {})
         return {}, True
 
 
+def _recover(filepath: Path) -> dict[str, Any] | None:
+    """Rebuild a missing or unreadable file from its backup and/or journal.
+
+    Restores the result as the file's snapshot and returns it, or returns None
+    if there is nothing to recover from.
+    """
+    data: dict[str, Any] = {}
+    source = None
+    try:
+        data = _read_snapshot(filepath, backup_path(filepath))
+        source = "backup"
+    except (OSError, ValueError):
+        data = {}
+    if replay_journal(filepath, data):
+        source = "journal" if source is None else "backup + journal"
+    if source is None:
+        return None
+
+    logger.warning(f"Recovered {len(data)} items for {filepath} from {source}")
+    # Remove the bad file first so saving doesn't rotate it over the backup.
+    filepath.unlink(missing_ok=True)
+    save_json(filepath, data)
+    return data
+
+
+def _convert_plain(filepath: Path) -> dict[str, Any] | None:
+    """Compress the plain JSON file filepath replaces, if there is one.
+
+    The plain file is kept as its own backup ("<plain>.bak") and its journal is
+    dropped once its contents are saved. Returns None if there is none.
+    """
+    plain = plain_path(filepath)
+    if plain == filepath or not plain.exists():
+        return None
+    data, _ = load_json(plain)
+    save_json(filepath, data)
+    os.replace(plain, backup_path(plain))
+    journal_path(plain).unlink(missing_ok=True)
+    logger.info(f"Converted {plain} to {filepath} ({len(data)} items)")
+    return data
+
+
 def is_file_old(filepath: str | Path, threshold_hours: int = 12) -> bool:
     """Check if a file is older than a specified age in hours.
 
@@ -114,6 +583,10 @@ def is_file_old(filepath: str | Path, threshold_hours: int = 12) -> bool:
 
     try:
         modification_time = filepath.stat().st_mtime
+        # A journaled flush counts as a write to the file it belongs to.
+        journal = journal_path(filepath)
+        if journal.exists():
+            modification_time = max(modification_time, journal.stat().st_mtime)
         age_seconds = time.time() - modification_time
         age_hours = int(age_seconds / 3600)
 
@@ -0,0 +1,159 @@
+"""Per-host politeness for concurrent fetching: rate limits + connection caps.
+
+Every HTTP fetch takes a slot from the shared HostScheduler first. Each host has
+its own token bucket (a requests-per-second budget with a small burst) and its
+own cap on simultaneous connections, so parallel scraping stays gentle on any
+single site while other hosts keep the worker pool busy. Limits default to the
+config values and can be overridden per site in websites.WEBSITES.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any
+from urllib.parse import urlsplit
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator, Mapping
+
+__all__ = [
+    "HostLimit",
+    "TokenBucket",
+    "HostScheduler",
+    "host_of",
+    "limits_from_websites",
+    "interleave_by_host",
+]
+
+
+@dataclass(frozen=True)
+class HostLimit:
+    """Politeness budget for one host."""
+
+    requests_per_second: float
+    max_connections: int
+    burst: int = 1
+
+
+def host_of(url: str) -> str:
+    """Normalize a URL's host so www.example.com and example.com share limits."""
+    host = urlsplit(url).netloc.lower()
+    return host.removeprefix("www.")
+
+
+class TokenBucket:
+    """Thread-safe token bucket refilled at `rate` tokens/second up to `capacity`.
+
+    acquire() reserves a token immediately (the balance may go negative) and
+    sleeps off any debt outside the lock, so waiters are served in arrival order
+    without holding up callers for other hosts.
+    """
+
+    def __init__(self, rate: float, capacity: int) -> None:
+        """Start full, so the first `capacity` requests go out immediately."""
+        self.rate = rate
+        self.capacity = float(max(capacity, 1))
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """Take one token, sleeping until it is available. Returns seconds waited."""
+        with self._lock:
+            now = time.monotonic()
+            refill = (now - self._updated) * self.rate
+            self._tokens = min(self.capacity, self._tokens + refill)
+            self._updated = now
+            self._tokens -= 1.0
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+
+class HostScheduler:
+    """Gate fetches per host by a token bucket plus a connection semaphore."""
+
+    def __init__(
+        self, default: HostLimit, overrides: Mapping[str, HostLimit] | None = None
+    ) -> None:
+        """Use `default` for every host not listed in `overrides`."""
+        self.default = default
+        self.overrides = dict(overrides or {})
+        self._hosts: dict[str, tuple[threading.BoundedSemaphore, TokenBucket]] = {}
+        self._lock = threading.Lock()
+
+    def limit_for(self, host: str) -> HostLimit:
+        """Return the politeness budget that applies to host."""
+        return self.overrides.get(host, self.default)
+
+    def _state(self, host: str) -> tuple[threading.BoundedSemaphore, TokenBucket]:
+        """Return (connection semaphore, token bucket) for host, creating them."""
+        with self._lock:
+            if host not in self._hosts:
+                limit = self.limit_for(host)
+                self._hosts[host] = (
+                    threading.BoundedSemaphore(limit.max_connections),
+                    TokenBucket(limit.requests_per_second, limit.burst),
+                )
+            return self._hosts[host]
+
+    @contextmanager
+    def slot(self, url: str) -> Iterator[None]:
+        """Hold one of url's host connections, after waiting for a rate token."""
+        connections, bucket = self._state(host_of(url))
+        with connections:
+            bucket.acquire()
+            yield
+
+
+def limits_from_websites(
+    websites: Mapping[str, Mapping[str, Any]], default: HostLimit
+) -> dict[str, HostLimit]:
+    """Collect per-host overrides from WEBSITES entries.
+
+    An entry may set "requests_per_second" and/or "max_connections"; the
+    override applies to the host of each of its listing URLs, falling back to
+    `default` for whichever field it leaves out.
+    """
+    overrides: dict[str, HostLimit] = {}
+    for site in websites.values():
+        if "requests_per_second" not in site and "max_connections" not in site:
+            continue
+        limit = HostLimit(
+            requests_per_second=float(
+                site.get("requests_per_second", default.requests_per_second)
+            ),
+            max_connections=int(site.get("max_connections", default.max_connections)),
+            burst=default.burst,
+        )
+        for course in ("main course", "side dish"):
+            url = site.get(course)
+            if isinstance(url, str):
+                overrides[host_of(url)] = limit
+    return overrides
+
+
+def interleave_by_host(urls: list[str]) -> list[str]:
+    """Reorder urls round-robin across hosts, keeping each host's own order.
+
+    Feeding the worker pool a-b-c-a-b-c instead of a-a-a-b-b-b keeps workers
+    spread over many hosts, so one host's rate limit never stalls the pool.
+    """
+    by_host: dict[str, list[str]] = {}
+    for url in urls:
+        by_host.setdefault(host_of(url), []).append(url)
+    queues = [iter(group) for group in by_host.values()]
+    interleaved: list[str] = []
+    while queues:
+        remaining = []
+        for queue in queues:
+            next_url = next(queue, None)
+            if next_url is not None:
+                interleaved.append(next_url)
+                remaining.append(queue)
+        queues = remaining
+    return interleaved
@@ -0,0 +1,170 @@
+"""On-disk conditional-GET cache for fetched pages (ETag / Last-Modified).
+
+Stores each cacheable response body with its validators, one JSON file per URL.
+Later fetches of the same URL send If-None-Match / If-Modified-Since; a 304 is
+answered from the stored body instead of re-downloading the page. Entries older
+than the TTL are dropped, and the directory is kept under a byte budget by
+evicting least-recently-used entries (file mtime is bumped on every hit).
+"""
+
+from __future__ import annotations
+
+import contextlib
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Mapping
+
+logger = logging.getLogger(__name__)
+
+__all__ = ["CacheEntry", "HttpCache"]
+
+
+@dataclass(frozen=True)
+class CacheEntry:
+    """A cached response body plus the validators needed to revalidate it."""
+
+    url: str
+    body: str
+    etag: str | None
+    last_modified: str | None
+    stored_at: float
+
+    def validators(self) -> dict[str, str]:
+        """Return the conditional-request headers for revalidating this entry."""
+        headers: dict[str, str] = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class HttpCache:
+    """Size-bounded LRU cache of validated response bodies in `directory`.
+
+    Safe to share between fetch threads: entries are written atomically via a
+    temp file + rename, and the running size total is guarded by a lock. The
+    directory is only created once the first entry is stored.
+    """
+
+    def __init__(self, directory: str | Path, max_bytes: int, ttl_seconds: int):
+        """Configure the cache; nothing touches the disk until first use."""
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._total_bytes: int | None = None  # lazily measured on first store
+
+    def _path(self, url: str) -> Path:
+        """Map a URL to its entry file."""
+        digest = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        return self.directory / f"{digest}.json"
+
+    def lookup(self, url: str) -> CacheEntry | None:
+        """Return the live entry for url, or None if absent, expired or corrupt."""
+        path = self._path(url)
+        try:
+            with path.open("r", encoding="utf-8") as f:
+                raw = json.load(f)
+            entry = CacheEntry(**raw)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, TypeError) as e:
+            logger.warning(f"Dropping unreadable cache entry for {url}: {e}")
+            self._remove(path)
+            return None
+
+        if entry.url != url or time.time() - entry.stored_at > self.ttl_seconds:
+            self._remove(path)
+            return None
+        return entry
+
+    def touch(self, url: str) -> None:
+        """Mark url's entry as just used, so LRU eviction keeps it longest."""
+        with contextlib.suppress(OSError):
+            os.utime(self._path(url))
+
+    def store(self, url: str, body: str, headers: Mapping[str, str]) -> None:
+        """Cache body if the response carried an ETag or Last-Modified validator.
+
+        Responses without validators can never be answered by a 304, so they
+        are not stored. Never raises: a cache write failure only loses caching.
+        """
+        etag = headers.get("ETag") or headers.get("etag")
+        last_modified = headers.get("Last-Modified") or headers.get("last-modified")
+        if not (etag or last_modified):
+            return
+
+        entry = {
+            "url": url,
+            "body": body,
+            "etag": etag,
+            "last_modified": last_modified,
+            "stored_at": time.time(),
+        }
+        path = self._path(url)
+        tmp = path.with_suffix(f".{threading.get_ident()}.tmp")
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            old_size = path.stat().st_size if path.exists() else 0
+            with tmp.open("w", encoding="utf-8") as f:
+                json.dump(entry, f, ensure_ascii=False)
+            os.replace(tmp, path)
+            new_size = path.stat().st_size
+        except OSError as e:
+            logger.warning(f"Could not cache {url}: {e}")
+            self._remove(tmp)
+            return
+
+        with self._lock:
+            if self._total_bytes is None:
+                self._total_bytes = self._measure()
+            else:
+                self._total_bytes += new_size - old_size
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+
+    def _entries(self) -> list[tuple[float, int, Path]]:
+        """List (mtime, size, path) for every entry file, oldest first."""
+        entries = []
+        for path in self.directory.glob("*.json"):
+            try:
+                st = path.stat()
+            except OSError:
+                continue  # removed by a concurrent lookup
+            entries.append((st.st_mtime, st.st_size, path))
+        return sorted(entries)
+
+    def _measure(self) -> int:
+        """Sum the size of every entry file currently on disk."""
+        return sum(size for _, size, _ in self._entries())
+
+    def _evict(self) -> None:
+        """Delete least-recently-used entries until back under max_bytes.
+
+        Caller must hold self._lock.
+        """
+        entries = self._entries()
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            self._remove(path)
+            total -= size
+        self._total_bytes = total
+        logger.debug(f"HTTP cache evicted down to {total} bytes")
+
+    @staticmethod
+    def _remove(path: Path) -> None:
+        """Delete a file, ignoring it already being gone."""
+        with contextlib.suppress(OSError):
+            path.unlink()
@@ -0,0 +1,116 @@
+"""Multi-keyword matching: which keyword groups occur in a text, in one pass.
+
+A KeywordMatcher compiles a keyword set once into a single regex shaped like a
+trie (keywords sharing a prefix share its branch), so the regex engine walks
+each text once, trying only the branches that match the next character, instead
+of running one substring search per keyword. At every position it reports the
+longest keyword starting there; every other keyword starting there is a prefix
+of it, so each keyword carries the groups of all its prefixes too. That keeps
+the answer identical to checking `keyword in text` for every keyword.
+
+Matching is case-sensitive; callers lowercase the text, as the keywords are.
+"""
+
+from __future__ import annotations
+
+import re
+from functools import cache
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator, Mapping, Sequence
+
+__all__ = ["KeywordMatcher", "any_keyword_matcher"]
+
+
+class KeywordMatcher:
+    """Finds which named keyword groups occur in a text."""
+
+    def __init__(self, groups: Mapping[str, Iterable[str]]) -> None:
+        """Compile a matcher for {group name: keywords}.
+
+        Empty keywords are ignored (they would match everywhere).
+        """
+        self.group_names = tuple(groups)
+        own: dict[str, set[str]] = {}
+        for name, keywords in groups.items():
+            for keyword in keywords:
+                if keyword:
+                    own.setdefault(keyword, set()).add(name)
+        # Each keyword also reports the groups of the keywords that prefix it.
+        self._groups_of = {
+            keyword: frozenset().union(
+                *(names for other, names in own.items() if keyword.startswith(other))
+            )
+            for keyword in own
+        }
+        self._pattern = re.compile(_trie_regex(own)) if own else None
+
+    def _matches(self, text: str) -> Iterator[str]:
+        """Yield the longest keyword starting at each position that has one."""
+        if self._pattern is None:
+            return
+        search = self._pattern.search
+        match = search(text)
+        while match is not None:
+            yield match.group()
+            match = search(text, match.start() + 1)
+
+    def groups_in(self, text: str) -> set[str]:
+        """Return the names of the groups with a keyword occurring in text."""
+        found: set[str] = set()
+        for keyword in self._matches(text):
+            found |= self._groups_of[keyword]
+            if len(found) == len(self.group_names):
+                break
+        return found
+
+    def first_group(self, text: str, priority: Sequence[str]) -> str | None:
+        """Return the first group in priority that occurs in text, or None.
+
+        Stops scanning as soon as priority[0] is seen.
+        """
+        found: set[str] = set()
+        for keyword in self._matches(text):
+            found |= self._groups_of[keyword]
+            if priority[0] in found:
+                break
+        return next((name for name in priority if name in found), None)
+
+    def search(self, text: str) -> bool:
+        """True if any keyword of any group occurs in text."""
+        return self._pattern is not None and self._pattern.search(text) is not None
+
+
+def _trie_regex(keywords: Iterable[str]) -> str:
+    """Return a regex matching the longest of keywords, branching like a trie."""
+    trie: dict[str, dict] = {}
+    for keyword in keywords:
+        node = trie
+        for char in keyword:
+            node = node.setdefault(char, {})
+        node[""] = {}  # end of a keyword
+
+    def branch(node: dict[str, dict]) -> str:
+        alternatives = [
+            re.escape(char) + branch(child)
+            for char, child in sorted(node.items())
+            if char
+        ]
+        if not alternatives:
+            return ""
+        body = (
+            alternatives[0]
+            if len(alternatives) == 1
+            else f"(?:{'|'.join(alternatives)})"
+        )
+        # A keyword ending here makes the longer continuations optional.
+        return f"(?:{body})?" if "" in node else body
+
+    return branch(trie)
+
+
+@cache
+def any_keyword_matcher(keywords: tuple[str, ...]) -> KeywordMatcher:
+    """Return the (cached) single-group matcher for a tuple of keywords."""
+    return KeywordMatcher({"any": keywords})
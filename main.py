@@ -13,17 +13,23 @@ import os
 import sys
 import time
 import traceback
+from contextlib import nullcontext
 from datetime import date, datetime
 from logging.handlers import RotatingFileHandler
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
 from config import (
     FAILED_FILENAME,
     FILE_AGE_THRESHOLD,
     HEALTH_SUBJECT,
+    JOURNAL_COMPACT_BYTES,
     PUBLISH_PAGE_FILENAME,
+    RECIPE_DB_FILENAME,
+    RECIPE_STORE,
     SITE_HEALTH_FILENAME,
     SUBJECT,
+    TAGGING_BATCH_SIZE,
+    TAGGING_QUEUE_FILENAME,
     UNUSED_MAINS_FILENAME,
     UNUSED_SIDES_FILENAME,
     USED_FILENAME,
@@ -31,12 +37,26 @@ from config import (
 )
 from debug_utils import is_debug_mode, select_website_interactively
 from email_sender import send_email
-from file_utils import is_file_old, load_json, save_json
+from file_utils import (
+    append_journal,
+    is_file_old,
+    json_writer,
+    load_json,
+    save_json,
+    save_snapshots,
+)
 from html_generator import generate_html_email
+from recipe_corpus import corpus_path, corpus_writer, load_corpus
+from recipe_db import RecipeTable, open_recipe_db
 from recipe_processor import fetch_fresh_recipes
-from recipe_selector import ensure_veggies, select_random_proteins
+from recipe_selector import (
+    FEATURE_HASH,
+    CandidatePool,
+    ensure_veggies,
+    select_random_proteins,
+)
 from seasonal_selection import final_score, season_fit
-from seasonal_tagging import ensure_recipe_tagged
+from seasonal_tagging import ensure_recipes_tagged
 from site_health import (
     WINDOW_SIZE,
     build_report,
@@ -47,42 +67,59 @@ from site_health import (
 from website_publisher import write_publish_page
 from websites import WEBSITES
 
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from file_utils import SnapshotWriter
+
 __all__ = ["main"]
 
-# Configure logging. recipe_emailer.log keeps one file per run, retaining the
-# last WINDOW_SIZE runs -- the same span the site-health email reports -- so it
-# can never grow without bound. maxBytes=0 disables size-based rotation;
-# _start_run_log() rotates it once at the top of each run instead. backupCount is
+# recipe_emailer.log keeps one file per run, retaining the last WINDOW_SIZE
+# runs -- the same span the site-health email reports -- so it can never grow
+# without bound. maxBytes=0 disables size-based rotation; _start_run_log()
+# rotates it once at the top of each run instead. backupCount is
 # WINDOW_SIZE - 1 because the live file is the current (WINDOW_SIZE-th) run.
 _LOG_PATH = "recipe_emailer.log"
-_run_log_handler = RotatingFileHandler(
-    _LOG_PATH, maxBytes=0, backupCount=WINDOW_SIZE - 1
-)
-
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-    handlers=[_run_log_handler, logging.StreamHandler(sys.stdout)],
-)
 
 logger = logging.getLogger(__name__)
 
+# Reserved tagging-queue key: the FEATURE_HASH of the last completed tag pass.
+_QUEUE_STAMP_KEY = "#feature_hash"
+
+# The JSON file behind each state dict in the context (JSON store only).
+_STATE_FILES = {
+    "unused_mains": UNUSED_MAINS_FILENAME,
+    "unused_sides": UNUSED_SIDES_FILENAME,
+    "failed_recipes": FAILED_FILENAME,
+    "used_recipes": USED_FILENAME,
+}
+
 
 def _start_run_log() -> None:
-    """Rotate recipe_emailer.log so this run starts a fresh file.
+    """Configure logging and rotate recipe_emailer.log so this run starts fresh.
 
     Retains the last WINDOW_SIZE runs (matching the site-health window). Skips
     rotation when the log is absent/empty so the first run leaves no blank
-    backup.
+    backup. Called from main() rather than at import: spawned parse workers
+    re-import __main__, and must not open (or rotate) the run log themselves.
     """
-    if os.path.exists(_LOG_PATH) and os.path.getsize(_LOG_PATH) > 0:
-        _run_log_handler.doRollover()
+    run_log_handler = RotatingFileHandler(
+        _LOG_PATH, maxBytes=0, backupCount=WINDOW_SIZE - 1
+    )
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+        handlers=[run_log_handler, logging.StreamHandler(sys.stdout)],
+    )
+    if os.path.getsize(_LOG_PATH) > 0:
+        run_log_handler.doRollover()
 
 
 def main() -> None:
     """Main execution function with comprehensive error handling."""
     _start_run_log()
     start_time = time.time()
+    context: dict[str, Any] = {}
 
     try:
         logger.info("=" * 70)
@@ -132,6 +169,10 @@ def main() -> None:
         _send_error_notification(e)
         sys.exit(1)
 
+    finally:
+        if "recipe_db" in context:
+            context["recipe_db"].close()
+
 
 def _initialize_context(debug_mode: bool) -> dict[str, Any]:
     """Initialize application context with configuration and data."""
@@ -148,10 +189,13 @@ def _initialize_context(debug_mode: bool) -> dict[str, Any]:
             "needs_fresh_data": True,
         }
 
+    if RECIPE_STORE == "sqlite":
+        return _initialize_db_context()
+
     # Normal mode: load existing data
     logger.info("Loading existing recipe data")
-    unused_mains, mains_created = load_json(UNUSED_MAINS_FILENAME)
-    unused_sides, sides_created = load_json(UNUSED_SIDES_FILENAME)
+    unused_mains, mains_created = _load_recipes(UNUSED_MAINS_FILENAME)
+    unused_sides, sides_created = _load_recipes(UNUSED_SIDES_FILENAME)
     failed_recipes, _ = load_json(FAILED_FILENAME)
     used_recipes, _ = load_json(USED_FILENAME)
 
@@ -159,7 +203,7 @@ def _initialize_context(debug_mode: bool) -> dict[str, Any]:
     needs_fresh = (
         mains_created
         or sides_created
-        or is_file_old(UNUSED_MAINS_FILENAME, FILE_AGE_THRESHOLD)
+        or is_file_old(_recipes_path(UNUSED_MAINS_FILENAME), FILE_AGE_THRESHOLD)
     )
 
     if needs_fresh:
@@ -180,6 +224,70 @@ def _initialize_context(debug_mode: bool) -> dict[str, Any]:
     }
 
 
+def _recipes_path(filename: str) -> str | Path:
+    """Return the file actually holding a recipe JSON file's data."""
+    return corpus_path(filename) if RECIPE_STORE == "corpus" else filename
+
+
+def _load_recipes(filename: str) -> tuple[dict[str, Any], bool]:
+    """Load unused mains or sides from the configured store (JSON or corpus)."""
+    if RECIPE_STORE == "corpus":
+        return load_corpus(corpus_path(filename), migrate_from=filename)
+    return load_json(filename)
+
+
+def _initialize_db_context() -> dict[str, Any]:
+    """Initialize the context from the SQLite store (RECIPE_STORE == "sqlite").
+
+    The state dicts are live views of the database, so nothing is loaded up
+    front and every change is written as it is made.
+    """
+    logger.info(f"Opening recipe database {RECIPE_DB_FILENAME}")
+    db = open_recipe_db(
+        RECIPE_DB_FILENAME,
+        UNUSED_MAINS_FILENAME,
+        UNUSED_SIDES_FILENAME,
+        FAILED_FILENAME,
+        USED_FILENAME,
+    )
+    empty = len(db.mains) == 0 or len(db.sides) == 0
+    needs_fresh = empty or db.is_stale(FILE_AGE_THRESHOLD)
+    if needs_fresh:
+        reason = (
+            "no recipes stored" if empty else f"data older than {FILE_AGE_THRESHOLD}h"
+        )
+        logger.info(f"Fresh data needed: {reason}")
+
+    return {
+        "websites": WEBSITES,
+        "unused_mains": db.mains,
+        "unused_sides": db.sides,
+        "failed_recipes": db.failed,
+        "used_recipes": db.used,
+        "needs_fresh_data": needs_fresh,
+        "recipe_db": db,
+    }
+
+
+def _save_state(context: dict[str, Any], *keys: str) -> None:
+    """Persist the named state dicts to their JSON (or corpus) files.
+
+    All of them are saved as one crash-safe group (save_snapshots), corpus
+    files included, so a recipe never ends up in both used and unused.
+    No-op with the SQLite store, whose views already wrote every change.
+    """
+    if "recipe_db" in context:
+        return
+    writers: dict[str | Path, SnapshotWriter] = {}
+    for key in keys:
+        filename = _STATE_FILES[key]
+        if RECIPE_STORE == "corpus" and key in ("unused_mains", "unused_sides"):
+            writers[corpus_path(filename)] = corpus_writer(context[key])
+        else:
+            writers[filename] = json_writer(filename, context[key])
+    save_snapshots(writers)
+
+
 def _fetch_and_update_recipes(context: dict[str, Any], debug_mode: bool) -> None:
     """Fetch fresh recipes and update context."""
     logger.info("Fetching fresh recipe data...")
@@ -199,8 +307,9 @@ def _fetch_and_update_recipes(context: dict[str, Any], debug_mode: bool) -> None
 
     # Save updated data (skip in debug mode)
     if not debug_mode:
-        save_json(UNUSED_MAINS_FILENAME, updated_mains)
-        save_json(UNUSED_SIDES_FILENAME, updated_sides)
+        _save_state(context, "unused_mains", "unused_sides")
+        if "recipe_db" in context:
+            context["recipe_db"].mark_scraped()
         logger.info("Saved updated recipe data")
 
 
@@ -237,31 +346,94 @@ def _monitor_site_health(context: dict[str, Any]) -> None:
 
 
 def _tag_new_recipes(context: dict[str, Any]) -> None:
-    """Add seasonal/oven tags to every untagged recipe. Never raises.
-
-    Seasonal inference is now instant (pure-numpy student model), so every
-    untagged recipe across mains+sides is tagged in a single run. Saves only
-    the files it changed. A tagging failure logs and is swallowed so it cannot
+    """Add seasonal/oven tags to newly-scraped recipes. Never raises.
+
+    The JSON and corpus stores drain the tagging queue the scraper fills
+    (TAGGING_QUEUE_FILENAME), so the cost follows the number of new recipes,
+    not the corpus size. Until a pass has completed with the current
+    FEATURE_HASH (first run, a failed run, or edited keyword lists) every
+    recipe is rescanned instead. Each batch of TAGGING_BATCH_SIZE recipes is
+    scored in one model pass and only its changed records are journaled. The
+    SQLite store asks its tag table instead (RecipeTable.untagged) and writes
+    rows as they change. A tagging failure logs and is swallowed so it cannot
     break the recipe run.
     """
     try:
+        queue, full_scan = _load_tagging_queue(context)
         tagged = 0
-        for context_key, filename in (
-            ("unused_mains", UNUSED_MAINS_FILENAME),
-            ("unused_sides", UNUSED_SIDES_FILENAME),
-        ):
-            changed = False
-            for recipe in context[context_key].values():
-                if ensure_recipe_tagged(recipe):
-                    tagged += 1
-                    changed = True
-            if changed:
-                save_json(filename, context[context_key])
+        for context_key in ("unused_mains", "unused_sides"):
+            recipes = context[context_key]
+            if full_scan:
+                items = _untagged_items(recipes)
+            else:
+                filename = _STATE_FILES[context_key]
+                items = [
+                    (url, recipes[url])
+                    for url, source in queue.items()
+                    if source == filename and url in recipes
+                ]
+            for start in range(0, len(items), TAGGING_BATCH_SIZE):
+                batch = items[start : start + TAGGING_BATCH_SIZE]
+                flags = ensure_recipes_tagged([recipe for _, recipe in batch])
+                changed = {
+                    url: recipe
+                    for (url, recipe), recipe_changed in zip(batch, flags, strict=True)
+                    if recipe_changed
+                }
+                for url, recipe in changed.items():
+                    recipes[url] = recipe
+                _journal_recipes(context, context_key, changed)
+                tagged += len(changed)
+        # Only a completed pass empties the queue and stamps it as current.
+        if "recipe_db" not in context and (queue or full_scan):
+            save_json(TAGGING_QUEUE_FILENAME, {_QUEUE_STAMP_KEY: FEATURE_HASH})
         logger.info(f"Seasonal tagging: tagged {tagged} new recipe(s)")
     except Exception as e:
         logger.exception(f"Seasonal tagging failed: {e}")
 
 
+def _load_tagging_queue(context: dict[str, Any]) -> tuple[dict[str, str], bool]:
+    """Return the tagging queue and whether a full scan must replace it.
+
+    The scraper only ever appends to the queue's journal; the snapshot is
+    written, stamped with FEATURE_HASH, only once a tag pass has finished. A
+    queue without the current stamp may be missing URLs or sit on recipes whose
+    cached features are stale, so it is replaced by a full scan. Never writes
+    the snapshot itself.
+    """
+    if "recipe_db" in context or not os.path.exists(TAGGING_QUEUE_FILENAME):
+        return {}, True
+    queue, _ = load_json(TAGGING_QUEUE_FILENAME)
+    return queue, queue.pop(_QUEUE_STAMP_KEY, None) != FEATURE_HASH
+
+
+def _journal_recipes(
+    context: dict[str, Any], context_key: str, changed: dict[str, Any]
+) -> None:
+    """Persist just the changed recipes of an unused mains/sides dict.
+
+    Appends them to the file's journal (compacting it past JOURNAL_COMPACT_BYTES)
+    as plain dicts, so corpus LazyRecipes encode too. No-op with the SQLite
+    store, whose views already wrote every change.
+    """
+    if not changed or "recipe_db" in context:
+        return
+    path = _recipes_path(_STATE_FILES[context_key])
+    records = {url: dict(recipe) for url, recipe in changed.items()}
+    if append_journal(path, records) > JOURNAL_COMPACT_BYTES:
+        _save_state(context, context_key)
+
+
+def _untagged_items(recipes: dict[str, Any]) -> list[tuple[str, Any]]:
+    """Return (url, recipe) pairs that may need tagging.
+
+    The SQLite store answers from its tag table; a JSON dict is scanned whole.
+    """
+    if isinstance(recipes, RecipeTable):
+        return recipes.untagged()
+    return list(recipes.items())
+
+
 def _select_and_prepare_meals(context: dict[str, Any]) -> list[dict[str, Any]]:
     """Select seasonally-weighted meals and ensure they have vegetables."""
     today = datetime.now().date()
@@ -270,9 +442,10 @@ def _select_and_prepare_meals(context: dict[str, Any]) -> list[dict[str, Any]]:
     selected_meals = select_random_proteins(context["unused_mains"], today)
 
     logger.info("Ensuring meals have adequate vegetables")
+    side_pool = CandidatePool.from_recipes(context["unused_sides"], today)
     prepared_meals = ensure_veggies(
         selected_meals,
-        context["unused_sides"],
+        side_pool,
         VEGGIES,
         today,
     )
@@ -328,27 +501,28 @@ def _generate_and_send_email(
 def _update_tracking_data(context: dict[str, Any], meals: list[dict[str, Any]]) -> None:
     """Update used recipes and remove them from unused lists."""
     date_str = datetime.now().strftime("%Y-%m-%d")
-
-    for meal_item in meals:
-        meal_obj = meal_item["obj"]
-        url = next(iter(meal_obj))
-
-        # Mark as used
-        context["used_recipes"][url] = date_str
-
-        # Remove from unused lists
-        if url in context["unused_mains"]:
-            del context["unused_mains"][url]
-        elif url in context["unused_sides"]:
-            del context["unused_sides"][url]
-        else:
-            logger.warning(f"URL {url} not found in unused lists")
+    # With the SQLite store every write below commits on its own; group them
+    # so the moves land together (and in one fsync).
+    db = context.get("recipe_db")
+
+    with db.transaction() if db is not None else nullcontext():
+        for meal_item in meals:
+            meal_obj = meal_item["obj"]
+            url = next(iter(meal_obj))
+
+            # Mark as used
+            context["used_recipes"][url] = date_str
+
+            # Remove from unused lists
+            if url in context["unused_mains"]:
+                del context["unused_mains"][url]
+            elif url in context["unused_sides"]:
+                del context["unused_sides"][url]
+            else:
+                logger.warning(f"URL {url} not found in unused lists")
 
     # Save updated tracking data
-    save_json(UNUSED_MAINS_FILENAME, context["unused_mains"])
-    save_json(UNUSED_SIDES_FILENAME, context["unused_sides"])
-    save_json(FAILED_FILENAME, context["failed_recipes"])
-    save_json(USED_FILENAME, context["used_recipes"])
+    _save_state(context, *_STATE_FILES)
 
     logger.info(
         f"Updated tracking: {len(context['unused_mains'])} mains, "
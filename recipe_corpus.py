@@ -0,0 +1,246 @@
+"""Compact recipe corpus with lazily decoded bodies (RECIPE_STORE == "corpus").
+
+A corpus file stores one course's {url: recipe} dict so that a run can load it
+without parsing every recipe in full. Each recipe is split in two:
+
+- its selection fields (SELECTION_FIELDS: what tagging, protein/veggie checks
+  and seasonal scoring read, cached features included), kept in an index that
+  is parsed eagerly;
+- the rest of its body (title, image, ingredient_groups, nutrients, ...),
+  stored as a JSON blob at a recorded offset and decoded from a memory-mapped
+  view only when something reads one of those keys.
+
+Layout: MAGIC, the bodies back to back, the JSON index
+{"entries": [[url, offset, length, fields], ...]}, then the index's offset as
+an 8-byte little-endian integer. Bodies that were never decoded are copied
+byte-for-byte when the corpus is rewritten.
+
+Like the JSON files, a corpus may have a journal beside it (file_utils
+append_journal) that load_corpus replays and save_corpus compacts.
+"""
+
+from __future__ import annotations
+
+import logging
+import mmap
+import struct
+from collections.abc import MutableMapping
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from file_utils import (
+    FileLoadResult,
+    SnapshotWriter,
+    backup_path,
+    get_codec,
+    load_json,
+    plain_path,
+    replay_journal,
+    save_snapshots,
+)
+from recipe_selector import FEATURE_KEYS
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator, Mapping
+    from typing import IO
+
+__all__ = [
+    "SELECTION_FIELDS",
+    "LazyRecipe",
+    "corpus_path",
+    "load_corpus",
+    "save_corpus",
+    "corpus_writer",
+]
+
+logger = logging.getLogger(__name__)
+
+# Recipe keys kept in the eagerly loaded index.
+SELECTION_FIELDS = frozenset(
+    {"ingredients", "instructions", "seasonality", "oven_use", *FEATURE_KEYS}
+)
+
+_MAGIC = b"RCORPUS1\n"
+_FOOTER = struct.Struct("<Q")
+
+
+def corpus_path(json_filename: str | Path) -> Path:
+    """Return the corpus file that stands in for a recipe JSON file."""
+    return plain_path(json_filename).with_suffix(".corpus")
+
+
+class LazyRecipe(MutableMapping[str, Any]):
+    """A recipe whose selection fields are in memory and body is decoded on use.
+
+    Reading or writing any key outside SELECTION_FIELDS decodes the body from
+    the corpus mapping (once). A missing selection field is simply absent; it
+    never forces a decode.
+    """
+
+    __slots__ = ("_fields", "_body", "_view", "_offset", "_length")
+
+    def __init__(
+        self, fields: dict[str, Any], view: mmap.mmap, offset: int, length: int
+    ) -> None:
+        """Wrap one index entry of the corpus mapped at view."""
+        self._fields = fields
+        self._body: dict[str, Any] | None = None
+        self._view = view
+        self._offset = offset
+        self._length = length
+
+    def _load_body(self) -> dict[str, Any]:
+        """Decode (once) and return the non-selection part of the recipe."""
+        if self._body is None:
+            raw = self._view[self._offset : self._offset + self._length]
+            self._body = get_codec().loads(raw)
+        return self._body
+
+    def raw_body(self) -> bytes | None:
+        """Return the stored body bytes, or None once the body was decoded."""
+        if self._body is not None:
+            return None
+        return self._view[self._offset : self._offset + self._length]
+
+    @property
+    def body_loaded(self) -> bool:
+        """True once the body has been decoded."""
+        return self._body is not None
+
+    def __getitem__(self, key: str) -> Any:
+        if key in SELECTION_FIELDS:
+            return self._fields[key]
+        return self._load_body()[key]
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        if key in SELECTION_FIELDS:
+            self._fields[key] = value
+        else:
+            self._load_body()[key] = value
+
+    def __delitem__(self, key: str) -> None:
+        if key in SELECTION_FIELDS:
+            del self._fields[key]
+        else:
+            del self._load_body()[key]
+
+    def __contains__(self, key: object) -> bool:
+        if key in SELECTION_FIELDS:
+            return key in self._fields
+        return key in self._load_body()
+
+    def __iter__(self) -> Iterator[str]:
+        yield from self._fields
+        yield from self._load_body()
+
+    def __len__(self) -> int:
+        return len(self._fields) + len(self._load_body())
+
+    def __repr__(self) -> str:
+        return f"LazyRecipe({dict(self)!r})"
+
+
+def _split(recipe: Mapping[str, Any]) -> tuple[dict[str, Any], bytes]:
+    """Split a recipe into (selection fields, encoded body)."""
+    if isinstance(recipe, LazyRecipe):
+        fields = dict(recipe._fields)
+        raw = recipe.raw_body()
+        if raw is not None:
+            return fields, raw
+        body = recipe._load_body()
+    else:
+        fields = {k: v for k, v in recipe.items() if k in SELECTION_FIELDS}
+        body = {k: v for k, v in recipe.items() if k not in SELECTION_FIELDS}
+    return fields, get_codec().dumps(body, compact=True)
+
+
+def save_corpus(filepath: str | Path, recipes: Mapping[str, Mapping[str, Any]]) -> None:
+    """Write recipes as a corpus file and drop its journal.
+
+    Crash-safe like file_utils.save_json: written to an fsynced temp file,
+    then renamed into place with the previous corpus kept as the backup.
+
+    Raises:
+        FileOperationError: If the file cannot be written
+    """
+    save_snapshots({filepath: corpus_writer(recipes)})
+    logger.debug(f"Saved {len(recipes)} recipes to corpus {filepath}")
+
+
+def corpus_writer(recipes: Mapping[str, Mapping[str, Any]]) -> SnapshotWriter:
+    """Return a SnapshotWriter that writes recipes in the corpus layout.
+
+    Lets file_utils.save_snapshots save a corpus in one group with JSON files.
+    """
+
+    def write(f: IO[bytes]) -> None:
+        f.write(_MAGIC)
+        offset = len(_MAGIC)
+        entries = []
+        for url, recipe in recipes.items():
+            fields, body = _split(recipe)
+            f.write(body)
+            entries.append([url, offset, len(body), fields])
+            offset += len(body)
+        get_codec().dump({"entries": entries}, f, compact=True)
+        f.write(_FOOTER.pack(offset))
+
+    return write
+
+
+def _read_corpus(filepath: Path) -> dict[str, Any]:
+    """Map a corpus file and build its {url: LazyRecipe} dict."""
+    with filepath.open("rb") as f:
+        view = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    if view[: len(_MAGIC)] != _MAGIC or len(view) < len(_MAGIC) + _FOOTER.size:
+        raise ValueError("not a recipe corpus")
+    (index_offset,) = _FOOTER.unpack(view[-_FOOTER.size :])
+    index = get_codec().loads(view[index_offset : -_FOOTER.size])
+    return {
+        url: LazyRecipe(fields, view, offset, length)
+        for url, offset, length, fields in index["entries"]
+    }
+
+
+def load_corpus(
+    filepath: str | Path, migrate_from: str | Path | None = None
+) -> FileLoadResult:
+    """Load a corpus (plus its journal), mirroring file_utils.load_json.
+
+    Args:
+        filepath: Path to the corpus file
+        migrate_from: JSON recipe file to convert if the corpus doesn't exist
+            yet; it is left in place
+
+    Returns:
+        Tuple of (data dictionary, was_created boolean), as load_json
+    """
+    filepath = Path(filepath)
+    try:
+        data = _read_corpus(filepath)
+    except FileNotFoundError:
+        data = {}
+        if migrate_from is not None and Path(migrate_from).exists():
+            data, _ = load_json(migrate_from)
+            logger.info(f"Converting {migrate_from} into corpus {filepath}")
+        replayed = replay_journal(filepath, data)
+        save_corpus(filepath, data)
+        created = not (data or replayed)
+        return (_read_corpus(filepath) if data else {}), created
+    except (OSError, ValueError, KeyError) as e:
+        logger.warning(f"Corpus {filepath} is unreadable ({e})")
+        try:
+            data = _read_corpus(backup_path(filepath))
+        except (OSError, ValueError, KeyError):
+            logger.warning(f"No usable backup of {filepath}, reinitializing...")
+            save_corpus(filepath, {})
+            return {}, True
+        logger.warning(f"Recovered {len(data)} recipes for {filepath} from backup")
+        replay_journal(filepath, data)
+        filepath.unlink(missing_ok=True)  # don't rotate the bad file over the backup
+        save_corpus(filepath, data)
+        return _read_corpus(filepath), False
+
+    replay_journal(filepath, data)
+    logger.debug(f"Loaded {len(data)} recipes from corpus {filepath}")
+    return data, False
@@ -0,0 +1,435 @@
+"""SQLite-backed recipe database (an alternative to the four JSON state files).
+
+One WAL-mode SQLite file holds the unused main/side recipes, the used-recipe
+history and the failed-URL skip-list, plus each recipe's seasonal tags in a
+table of their own. Writes commit as they happen, so nothing is rewritten in
+bulk at the end of a run, and the indexes on course, host and protein let
+callers ask for "untagged" or "seafood mains" without loading the corpus.
+
+RecipeTable and StringTable are MutableMapping adapters with the same
+{url: value} shape as the JSON dicts, so recipe_processor, recipe_selector and
+seasonal_tagging work against either store unchanged. Note that a recipe dict
+read from a RecipeTable is a copy: changes must be written back with
+table[url] = recipe to persist.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import sqlite3
+import time
+from collections.abc import ItemsView, MutableMapping, ValuesView
+from contextlib import contextmanager
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from file_utils import journal_path, load_json
+from host_scheduler import host_of
+from recipe_selector import FEATURE_HASH, protein_of
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+__all__ = [
+    "COURSE_MAIN",
+    "COURSE_SIDE",
+    "RecipeDB",
+    "RecipeTable",
+    "StringTable",
+    "migrate_from_json",
+    "open_recipe_db",
+]
+
+logger = logging.getLogger(__name__)
+
+COURSE_MAIN = "main"
+COURSE_SIDE = "side"
+
+# Recipe keys stored in recipe_tags rather than in the recipe's JSON blob.
+_TAG_KEYS = ("oven_use", "seasonality")
+
+# meta keys
+_META_MIGRATED = "migrated_from_json"
+_META_SCRAPED_AT = "scraped_at"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS recipes (
+    course  TEXT NOT NULL,
+    url     TEXT NOT NULL,
+    host    TEXT NOT NULL,
+    protein TEXT,
+    data    TEXT NOT NULL,
+    PRIMARY KEY (course, url)
+);
+CREATE INDEX IF NOT EXISTS recipes_url ON recipes (url);
+CREATE INDEX IF NOT EXISTS recipes_host ON recipes (host);
+CREATE INDEX IF NOT EXISTS recipes_course_protein ON recipes (course, protein);
+
+CREATE TABLE IF NOT EXISTS recipe_tags (
+    course      TEXT NOT NULL,
+    url         TEXT NOT NULL,
+    oven_use    REAL,
+    seasonality TEXT,
+    PRIMARY KEY (course, url),
+    FOREIGN KEY (course, url) REFERENCES recipes (course, url) ON DELETE CASCADE
+);
+
+CREATE TABLE IF NOT EXISTS used (
+    url     TEXT PRIMARY KEY,
+    used_on TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS failures (
+    url    TEXT PRIMARY KEY,
+    reason TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+
+class RecipeDB:
+    """A connection to the recipe database, with one adapter per state dict.
+
+    The connection runs in autocommit mode: every adapter write is its own
+    (cheap, WAL-mode) transaction unless grouped with transaction(). Use from
+    one thread only.
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        """Open (creating if needed) the database at path."""
+        self.path = Path(path)
+        self.conn = sqlite3.connect(self.path, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("PRAGMA foreign_keys=ON")
+        self.conn.executescript(_SCHEMA)
+        self.mains = RecipeTable(self, COURSE_MAIN)
+        self.sides = RecipeTable(self, COURSE_SIDE)
+        self.used = StringTable(self, "used", "used_on")
+        self.failed = StringTable(self, "failures", "reason")
+
+    def close(self) -> None:
+        """Close the connection."""
+        self.conn.close()
+
+    @contextmanager
+    def transaction(self) -> Iterator[None]:
+        """Group the writes made inside the block into one atomic transaction.
+
+        Nested blocks join the enclosing transaction.
+        """
+        if self.conn.in_transaction:
+            yield
+            return
+        self.conn.execute("BEGIN")
+        try:
+            yield
+        except BaseException:
+            self.conn.execute("ROLLBACK")
+            raise
+        self.conn.execute("COMMIT")
+
+    def get_meta(self, key: str) -> str | None:
+        """Return a meta value, or None if unset."""
+        row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,))
+        found = row.fetchone()
+        return found[0] if found else None
+
+    def set_meta(self, key: str, value: str) -> None:
+        """Set a meta value."""
+        self.conn.execute(
+            "INSERT INTO meta (key, value) VALUES (?, ?) "
+            "ON CONFLICT (key) DO UPDATE SET value = excluded.value",
+            (key, value),
+        )
+
+    def mark_scraped(self, when: float | None = None) -> None:
+        """Record that the recipe pool was just refreshed (see is_stale)."""
+        self.set_meta(_META_SCRAPED_AT, str(time.time() if when is None else when))
+
+    def is_stale(self, threshold_hours: int) -> bool:
+        """True if the pool was never scraped or is at least threshold_hours old.
+
+        The database counterpart of file_utils.is_file_old on the mains file.
+        """
+        scraped_at = self.get_meta(_META_SCRAPED_AT)
+        if scraped_at is None:
+            return True
+        age_hours = int((time.time() - float(scraped_at)) / 3600)
+        return age_hours >= threshold_hours
+
+
+class RecipeTable(MutableMapping[str, dict[str, Any]]):
+    """{url: recipe} view of one course's recipes, with tags merged in."""
+
+    def __init__(self, db: RecipeDB, course: str) -> None:
+        """Bind the adapter to db's recipes of the given course."""
+        self.db = db
+        self.course = course
+
+    @staticmethod
+    def _row_to_recipe(
+        data: str, oven_use: float | None, seasonality: str | None
+    ) -> dict[str, Any]:
+        """Rebuild a recipe dict from its stored columns."""
+        recipe: dict[str, Any] = json.loads(data)
+        if oven_use is not None:
+            recipe["oven_use"] = oven_use
+        if seasonality is not None:
+            recipe["seasonality"] = json.loads(seasonality)
+        return recipe
+
+    def _select(self, where: str = "", params: tuple = ()) -> list[tuple]:
+        """Fetch (url, data, oven_use, seasonality) rows of this course."""
+        return self.db.conn.execute(
+            "SELECT r.url, r.data, t.oven_use, t.seasonality FROM recipes r "
+            "LEFT JOIN recipe_tags t ON t.course = r.course AND t.url = r.url "
+            f"WHERE r.course = ? {where} ORDER BY r.rowid",
+            (self.course, *params),
+        ).fetchall()
+
+    def _items(self, where: str = "", params: tuple = ()) -> list[tuple[str, dict]]:
+        """Return (url, recipe) pairs matching an extra WHERE clause."""
+        return [
+            (url, self._row_to_recipe(data, oven_use, seasonality))
+            for url, data, oven_use, seasonality in self._select(where, params)
+        ]
+
+    def __getitem__(self, url: str) -> dict[str, Any]:
+        rows = self._select("AND r.url = ?", (url,))
+        if not rows:
+            raise KeyError(url)
+        _, data, oven_use, seasonality = rows[0]
+        return self._row_to_recipe(data, oven_use, seasonality)
+
+    def __setitem__(self, url: str, recipe: dict[str, Any]) -> None:
+        body = {key: value for key, value in recipe.items() if key not in _TAG_KEYS}
+        protein = protein_of(recipe)
+        oven_use = recipe.get("oven_use")
+        seasonality = recipe.get("seasonality")
+        with self.db.transaction():
+            self.db.conn.execute(
+                "INSERT INTO recipes (course, url, host, protein, data) "
+                "VALUES (?, ?, ?, ?, ?) ON CONFLICT (course, url) DO UPDATE SET "
+                "host = excluded.host, protein = excluded.protein, "
+                "data = excluded.data",
+                (
+                    self.course,
+                    url,
+                    host_of(url),
+                    protein,
+                    json.dumps(body, ensure_ascii=False),
+                ),
+            )
+            self.db.conn.execute(
+                "DELETE FROM recipe_tags WHERE course = ? AND url = ?",
+                (self.course, url),
+            )
+            if oven_use is not None or seasonality is not None:
+                self.db.conn.execute(
+                    "INSERT INTO recipe_tags (course, url, oven_use, seasonality) "
+                    "VALUES (?, ?, ?, ?)",
+                    (
+                        self.course,
+                        url,
+                        oven_use,
+                        None if seasonality is None else json.dumps(seasonality),
+                    ),
+                )
+
+    def __delitem__(self, url: str) -> None:
+        cursor = self.db.conn.execute(
+            "DELETE FROM recipes WHERE course = ? AND url = ?", (self.course, url)
+        )
+        if cursor.rowcount == 0:
+            raise KeyError(url)
+
+    def __contains__(self, url: object) -> bool:
+        return (
+            self.db.conn.execute(
+                "SELECT 1 FROM recipes WHERE course = ? AND url = ?",
+                (self.course, url),
+            ).fetchone()
+            is not None
+        )
+
+    def __iter__(self) -> Iterator[str]:
+        rows = self.db.conn.execute(
+            "SELECT url FROM recipes WHERE course = ? ORDER BY rowid", (self.course,)
+        ).fetchall()
+        return (url for (url,) in rows)
+
+    def __len__(self) -> int:
+        (count,) = self.db.conn.execute(
+            "SELECT COUNT(*) FROM recipes WHERE course = ?", (self.course,)
+        ).fetchone()
+        return int(count)
+
+    def items(self) -> ItemsView[str, dict[str, Any]]:
+        """Like dict.items(), but read in one query instead of one per key."""
+        return _RecipeItemsView(self)
+
+    def values(self) -> ValuesView[dict[str, Any]]:
+        """Like dict.values(), but read in one query instead of one per key."""
+        return _RecipeValuesView(self)
+
+    def untagged(self) -> list[tuple[str, dict[str, Any]]]:
+        """Return (url, recipe) pairs missing a tag or current features.
+
+        Features (recipe_selector.ensure_features) count as missing when their
+        stamp isn't the current FEATURE_HASH.
+        """
+        return self._items(
+            "AND (t.oven_use IS NULL OR t.seasonality IS NULL "
+            "OR json_extract(r.data, '$.feature_hash') IS NOT ?)",
+            (FEATURE_HASH,),
+        )
+
+    def by_protein(self, protein: str | None) -> list[tuple[str, dict[str, Any]]]:
+        """Return (url, recipe) pairs whose protein category is `protein`.
+
+        Categories are recipe_selector's ("seafood", "landfood" or None),
+        computed from the ingredients when the recipe is written.
+        """
+        if protein is None:
+            return self._items("AND r.protein IS NULL")
+        return self._items("AND r.protein = ?", (protein,))
+
+    def by_host(self, host: str) -> list[tuple[str, dict[str, Any]]]:
+        """Return (url, recipe) pairs scraped from host."""
+        return self._items("AND r.host = ?", (host,))
+
+
+class _RecipeItemsView(ItemsView[str, dict[str, Any]]):
+    """items() view of a RecipeTable that iterates with a single query."""
+
+    _mapping: RecipeTable
+
+    def __iter__(self) -> Iterator[tuple[str, dict[str, Any]]]:
+        return iter(self._mapping._items())
+
+
+class _RecipeValuesView(ValuesView[dict[str, Any]]):
+    """values() view of a RecipeTable that iterates with a single query."""
+
+    _mapping: RecipeTable
+
+    def __iter__(self) -> Iterator[dict[str, Any]]:
+        return (recipe for _, recipe in self._mapping._items())
+
+
+class StringTable(MutableMapping[str, str]):
+    """{url: text} view of a two-column table (used history, failures)."""
+
+    def __init__(self, db: RecipeDB, table: str, column: str) -> None:
+        """Bind the adapter to db's `table`, whose value column is `column`."""
+        self.db = db
+        self.table = table
+        self.column = column
+
+    def __getitem__(self, url: str) -> str:
+        row = self.db.conn.execute(
+            f"SELECT {self.column} FROM {self.table} WHERE url = ?", (url,)
+        ).fetchone()
+        if row is None:
+            raise KeyError(url)
+        return str(row[0])
+
+    def __setitem__(self, url: str, value: str) -> None:
+        self.db.conn.execute(
+            f"INSERT INTO {self.table} (url, {self.column}) VALUES (?, ?) "
+            f"ON CONFLICT (url) DO UPDATE SET {self.column} = excluded.{self.column}",
+            (url, value),
+        )
+
+    def __delitem__(self, url: str) -> None:
+        cursor = self.db.conn.execute(f"DELETE FROM {self.table} WHERE url = ?", (url,))
+        if cursor.rowcount == 0:
+            raise KeyError(url)
+
+    def __contains__(self, url: object) -> bool:
+        return (
+            self.db.conn.execute(
+                f"SELECT 1 FROM {self.table} WHERE url = ?", (url,)
+            ).fetchone()
+            is not None
+        )
+
+    def __iter__(self) -> Iterator[str]:
+        rows = self.db.conn.execute(
+            f"SELECT url FROM {self.table} ORDER BY rowid"
+        ).fetchall()
+        return (url for (url,) in rows)
+
+    def __len__(self) -> int:
+        (count,) = self.db.conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()
+        return int(count)
+
+
+def _json_state(filepath: str) -> dict[str, Any]:
+    """Load a JSON state file (with its journal) if either exists, else {}."""
+    if not (Path(filepath).exists() or journal_path(filepath).exists()):
+        return {}
+    data, _ = load_json(filepath)
+    return data
+
+
+def migrate_from_json(
+    db: RecipeDB,
+    mains_filename: str,
+    sides_filename: str,
+    failed_filename: str,
+    used_filename: str,
+) -> bool:
+    """Copy the JSON state files into db, once.
+
+    The JSON files are left untouched. The mains file's mtime carries over as
+    the last-scrape time, so migrating doesn't force a fresh scrape.
+
+    Returns:
+        True if a migration ran, False if db had already been migrated
+    """
+    if db.get_meta(_META_MIGRATED) is not None:
+        return False
+
+    mains = _json_state(mains_filename)
+    sides = _json_state(sides_filename)
+    failed = _json_state(failed_filename)
+    used = _json_state(used_filename)
+    with db.transaction():
+        for recipe_table, recipes in ((db.mains, mains), (db.sides, sides)):
+            for url, recipe in recipes.items():
+                recipe_table[url] = recipe
+        for string_table, values in ((db.failed, failed), (db.used, used)):
+            for url, value in values.items():
+                string_table[url] = value
+        if os.path.exists(mains_filename):
+            db.mark_scraped(os.path.getmtime(mains_filename))
+        db.set_meta(_META_MIGRATED, str(time.time()))
+
+    logger.info(
+        f"Migrated {len(mains)} mains, {len(sides)} sides, {len(failed)} failed "
+        f"and {len(used)} used entries into {db.path}"
+    )
+    return True
+
+
+def open_recipe_db(
+    path: str | Path,
+    mains_filename: str,
+    sides_filename: str,
+    failed_filename: str,
+    used_filename: str,
+) -> RecipeDB:
+    """Open the database at path, migrating the JSON state files on first use."""
+    db = RecipeDB(path)
+    migrate_from_json(
+        db, mains_filename, sides_filename, failed_filename, used_filename
+    )
+    return db
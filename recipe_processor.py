@@ -1,32 +1,143 @@
 """Recipe processing and data fetching logic."""
 
+import multiprocessing
+from collections import Counter, deque
+from collections.abc import Iterator, Mapping
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import nullcontext
+from itertools import groupby, islice
+from typing import TypeAlias
+
 from tqdm import tqdm
 
 from config import (
     FAILED_FILENAME,
+    JOURNAL_COMPACT_BYTES,
+    RECIPE_STORE,
     SCRAPE_FLUSH_INTERVAL,
+    SCRAPE_PARSE_WORKERS,
+    SCRAPE_WORKERS,
+    TAGGING_QUEUE_FILENAME,
     UNUSED_MAINS_FILENAME,
     UNUSED_SIDES_FILENAME,
 )
-from file_utils import save_json
+from file_utils import append_journal, save_json
+from host_scheduler import interleave_by_host
+from recipe_corpus import corpus_path, save_corpus
 from site_health import RunOutcome
-from web_scraper import get_html, get_recipe_urls, scraper
+from web_scraper import (
+    fetch_listing_pages,
+    get_html,
+    get_recipe_urls,
+    parse_recipe,
+    scraper,
+)
+from websites import SiteInfo
+
+# (recipe or None, failures recorded while scraping it) for a single URL.
+_ScrapeResult: TypeAlias = tuple[dict | None, dict[str, str]]
 
 
 def _flush_scrape_progress(
     target_filename: str,
     target_recipes: dict[str, dict],
     failed_recipes: dict[str, str],
+    new_recipes: dict[str, dict],
+    new_failures: dict[str, str],
     debug_mode: bool,
 ) -> None:
-    """Persist the active stream's recipes + the failed-recipes skip-list.
+    """Persist the active stream's new recipes + new failed-recipes entries.
+
+    Only the entries added since the last flush are appended to each file's
+    journal, so a flush costs the same however large the files have grown. A
+    journal past JOURNAL_COMPACT_BYTES is compacted by saving the full dict.
+    The new recipes' URLs are also queued for tagging (TAGGING_QUEUE_FILENAME).
+    No-op in debug mode (debug must never write the database files), and with
+    the SQLite store, whose views commit each entry as it is added.
+    """
+    if debug_mode or RECIPE_STORE == "sqlite":
+        return
+    if RECIPE_STORE == "corpus":
+        corpus = corpus_path(target_filename)
+        if append_journal(corpus, new_recipes) > JOURNAL_COMPACT_BYTES:
+            save_corpus(corpus, target_recipes)
+    elif append_journal(target_filename, new_recipes) > JOURNAL_COMPACT_BYTES:
+        save_json(target_filename, target_recipes)
+    if append_journal(FAILED_FILENAME, new_failures) > JOURNAL_COMPACT_BYTES:
+        save_json(FAILED_FILENAME, failed_recipes)
+    if new_recipes:
+        append_journal(
+            TAGGING_QUEUE_FILENAME, dict.fromkeys(new_recipes, target_filename)
+        )
+
 
-    No-op in debug mode (debug must never write the database files).
+def _fetch_and_scrape(
+    url: str, debug_mode: bool, parse_pool: Executor | None = None
+) -> _ScrapeResult:
+    """Fetch + scrape a single URL, returning (recipe or None, its failures).
+
+    Failures are collected in a per-URL dict rather than the shared
+    failed_recipes, so worker threads never mutate shared state; the caller
+    merges them in input order. With a parse_pool, the fetched HTML is parsed
+    in a worker process while this thread waits, so each fetch thread has at
+    most one page in the parse stage. Never raises.
+    """
+    try:
+        html = get_html(url, debug_mode)
+        if parse_pool is None:
+            failures: dict[str, str] = {}
+            recipe = scraper(html, url, failures)
+            return recipe, failures
+        parsed = parse_pool.submit(parse_recipe, html, url)
+        del html  # the worker process has its own copy
+        return parsed.result()
+    # Unattended on the Pi: one bad URL (e.g. a network error escaping
+    # get_html, or a crashed parser process) must not abort the whole stream
+    # or lose flushed progress.
+    except Exception as exc:
+        print(f"Error scraping {url}: {exc}. Skipping.")
+        return None, {url: f"FAILS due to: {exc}"}
+
+
+def _iter_scrape_results(
+    urls: list[str],
+    debug_mode: bool,
+    workers: int,
+    parse_pool: Executor | None = None,
+) -> Iterator[tuple[str, dict | None, dict[str, str]]]:
+    """Yield (url, recipe, failures) for each URL, in input order.
+
+    With workers > 1, up to `workers` URLs are fetched + scraped concurrently
+    in a sliding window: a new URL is only submitted once the oldest in-flight
+    one is collected, so at most `workers` pages are ever held in memory. The
+    same window is the parse stage's backpressure: each in-flight URL has at
+    most one page queued for or inside parse_pool.
     """
-    if debug_mode:
+    if workers <= 1:
+        for url in urls:
+            yield (url, *_fetch_and_scrape(url, debug_mode, parse_pool))
         return
-    save_json(target_filename, target_recipes)
-    save_json(FAILED_FILENAME, failed_recipes)
+
+    pending = iter(urls)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        in_flight: deque[tuple[str, Future[_ScrapeResult]]] = deque(
+            (url, pool.submit(_fetch_and_scrape, url, debug_mode, parse_pool))
+            for url in islice(pending, workers)
+        )
+        while in_flight:
+            url, future = in_flight.popleft()
+            recipe, failures = future.result()
+            next_url = next(pending, None)
+            if next_url is not None:
+                in_flight.append(
+                    (
+                        next_url,
+                        pool.submit(
+                            _fetch_and_scrape, next_url, debug_mode, parse_pool
+                        ),
+                    )
+                )
+            yield url, recipe, failures
 
 
 def _scrape_urls_streaming(
@@ -36,34 +147,74 @@ def _scrape_urls_streaming(
     failed_recipes: dict[str, str],
     debug_mode: bool,
     flush_interval: int = SCRAPE_FLUSH_INTERVAL,
+    workers: int = SCRAPE_WORKERS,
+    parse_pool: Executor | None = None,
 ) -> None:
-    """Fetch + scrape one page at a time, routing results and flushing periodically.
+    """Fetch + scrape pages with a bounded worker pool, flushing periodically.
 
-    Never holds more than one page's HTML in memory. Mutates target_recipes and
-    failed_recipes in place. Flushes to disk every `flush_interval` processed URLs
-    (and once at the end), except in debug mode.
+    Never holds more than `workers` pages' HTML in memory (one with
+    workers=1). Results are routed in input order regardless of which fetch
+    finishes first, so target_recipes and failed_recipes end up identical to
+    a serial run. Mutates both in place. Parsing runs in parse_pool's worker
+    processes when given, else in the fetch threads. Journals the new entries
+    every `flush_interval` processed URLs (and once at the end), except in
+    debug mode; the caller's full save_json compacts them. Ends by printing
+    how many recipes each parser path produced, per host.
     """
-    for processed, url in enumerate(tqdm(urls), start=1):
-        try:
-            html = get_html(url, debug_mode)
-            recipe = scraper(html, url, failed_recipes)
-            del html  # free immediately — peak memory is one page, not all pages
-            if recipe is not None:
-                target_recipes[url] = recipe
-        # Unattended on the Pi: one bad URL (e.g. a network error escaping
-        # get_html) must not abort the whole stream or lose flushed progress.
-        except Exception as exc:
-            print(f"Error scraping {url}: {exc}. Skipping.")
-            failed_recipes[url] = f"FAILS due to: {exc}"
+    parsers: Counter[tuple[str, str]] = Counter()
+    new_recipes: dict[str, dict] = {}
+    new_failures: dict[str, str] = {}
+
+    def flush() -> None:
+        _flush_scrape_progress(
+            target_filename,
+            target_recipes,
+            failed_recipes,
+            new_recipes,
+            new_failures,
+            debug_mode,
+        )
+        new_recipes.clear()
+        new_failures.clear()
+
+    results = _iter_scrape_results(urls, debug_mode, workers, parse_pool)
+    for processed, (url, recipe, failures) in enumerate(
+        tqdm(results, total=len(urls)), start=1
+    ):
+        failed_recipes.update(failures)
+        new_failures.update(failures)
+        if recipe is not None:
+            target_recipes[url] = recipe
+            new_recipes[url] = recipe
+            host = recipe.get("host") or "unknown"
+            parsers[host, recipe.get("parser", "unknown")] += 1
         if processed % flush_interval == 0:
-            _flush_scrape_progress(
-                target_filename, target_recipes, failed_recipes, debug_mode
-            )
-    _flush_scrape_progress(target_filename, target_recipes, failed_recipes, debug_mode)
+            flush()
+    flush()
+    if parsers:
+        print("Parsed by:")
+        by_host = groupby(sorted(parsers.items()), key=lambda item: item[0][0])
+        for host, counts in by_host:
+            parsed = ", ".join(f"{parser} {n}" for (_, parser), n in counts)
+            print(f"  {host}: {parsed}")
+
+
+def _parse_pool(urls_to_scrape: int) -> ProcessPoolExecutor | nullcontext[None]:
+    """Return a parser process pool, or a no-op context if it isn't needed.
+
+    Uses the spawn start method: the pool's processes are started lazily from
+    fetch threads, and forking a multi-threaded process is unsafe.
+    """
+    if SCRAPE_PARSE_WORKERS <= 0 or urls_to_scrape == 0:
+        return nullcontext()
+    return ProcessPoolExecutor(
+        max_workers=SCRAPE_PARSE_WORKERS,
+        mp_context=multiprocessing.get_context("spawn"),
+    )
 
 
 def fetch_fresh_recipes(
-    websites: dict[str, dict[str, str]],
+    websites: Mapping[str, SiteInfo],
     unused_main_recipes: dict,
     unused_side_recipes: dict,
     used_recipes: dict,
@@ -77,9 +228,10 @@ def fetch_fresh_recipes(
     main_urls, side_urls = [], []
     run_outcomes: list[RunOutcome] = []
     print("Getting website HTML")
+    pages = fetch_listing_pages(websites, debug_mode)
     for site_name, site_info in tqdm(websites.items()):
         fresh_main_urls, fresh_side_urls, statuses = get_recipe_urls(
-            site_info, debug_mode
+            site_info, debug_mode, pages
         )
         main_urls.extend(fresh_main_urls)
         side_urls.extend(fresh_side_urls)
@@ -91,6 +243,9 @@ def fetch_fresh_recipes(
                     url_count=url_count,
                 )
             )
+    # The listing HTML is only needed for URL discovery; free it before
+    # scraping starts.
+    del pages
 
     # REMOVE DUPLICATES
     print("Removing duplicate URLs")
@@ -113,23 +268,32 @@ def fetch_fresh_recipes(
     side_urls = [url for url in side_urls if url not in failed_recipes]
     print(f"main {len(main_urls)} new\nside {len(side_urls)} new")
 
-    # STREAM: fetch + scrape one page at a time, flushing progress to disk.
-    print(f"Scraping {len(main_urls)} main dish recipe pages")
-    _scrape_urls_streaming(
-        main_urls,
-        unused_main_recipes,
-        UNUSED_MAINS_FILENAME,
-        failed_recipes,
-        debug_mode,
-    )
-    print(f"Scraping {len(side_urls)} side dish recipe pages")
-    _scrape_urls_streaming(
-        side_urls,
-        unused_side_recipes,
-        UNUSED_SIDES_FILENAME,
-        failed_recipes,
-        debug_mode,
-    )
+    # Spread consecutive URLs across sites so per-host rate limits overlap
+    # instead of stalling the worker pool on one site at a time.
+    main_urls = interleave_by_host(main_urls)
+    side_urls = interleave_by_host(side_urls)
+
+    # STREAM: fetch pages in threads, parse them in worker processes, and
+    # flush progress to disk as results come back in order.
+    with _parse_pool(len(main_urls) + len(side_urls)) as parse_pool:
+        print(f"Scraping {len(main_urls)} main dish recipe pages")
+        _scrape_urls_streaming(
+            main_urls,
+            unused_main_recipes,
+            UNUSED_MAINS_FILENAME,
+            failed_recipes,
+            debug_mode,
+            parse_pool=parse_pool,
+        )
+        print(f"Scraping {len(side_urls)} side dish recipe pages")
+        _scrape_urls_streaming(
+            side_urls,
+            unused_side_recipes,
+            UNUSED_SIDES_FILENAME,
+            failed_recipes,
+            debug_mode,
+            parse_pool=parse_pool,
+        )
     print(
         f"main {len(unused_main_recipes)} new total, "
         f"side {len(unused_side_recipes)} new total"
@@ -2,11 +2,22 @@
 
 This module handles selecting recipes based on protein type and
 ensuring adequate vegetable content.
+
+Each recipe's protein category and veggie flag are cached on it at tag time
+(ensure_features), stamped with FEATURE_HASH, a hash of the keyword lists they
+were computed from. Selection reads the cached values and only rescans the
+ingredients of recipes whose stamp is missing or stale.
+
+Candidates are drawn from a CandidatePool: the {url: recipe} items and their
+sampling weights, built once and shared by every draw in a run.
 """
 
 from __future__ import annotations
 
+import hashlib
+import json
 import logging
+import random
 from typing import TYPE_CHECKING, Any, TypeAlias
 
 from config import (
@@ -16,13 +27,25 @@ from config import (
     SEAFOOD_COUNT,
     SEAFOOD_PROTEINS,
     SELECTION_SHARPNESS,
+    VEGGIES,
 )
-from seasonal_selection import final_score, weighted_sample
+from keyword_matcher import KeywordMatcher, any_keyword_matcher
+from seasonal_selection import WeightedSampler, final_scores
 
 if TYPE_CHECKING:
+    from collections.abc import Mapping, MutableMapping
     from datetime import date as _date
 
-__all__ = ["select_random_proteins", "ensure_veggies", "InsufficientRecipesError"]
+__all__ = [
+    "CandidatePool",
+    "select_random_proteins",
+    "ensure_veggies",
+    "ensure_features",
+    "protein_of",
+    "FEATURE_HASH",
+    "FEATURE_KEYS",
+    "InsufficientRecipesError",
+]
 
 logger = logging.getLogger(__name__)
 
@@ -32,14 +55,128 @@ RecipeItem: TypeAlias = dict[str, RecipeDict]
 MealItem: TypeAlias = dict[str, str | RecipeItem]
 
 
+# Stamp of the keyword lists the cached features were computed from.
+FEATURE_HASH = hashlib.sha256(
+    json.dumps([SEAFOOD_PROTEINS, LANDFOOD_PROTEINS, VEGGIES]).encode()
+).hexdigest()[:16]
+
+# Recipe keys written by ensure_features.
+FEATURE_KEYS = ("protein", "has_veggies", "feature_hash")
+
+_PROTEIN_MATCHER = KeywordMatcher(
+    {"seafood": SEAFOOD_PROTEINS, "landfood": LANDFOOD_PROTEINS}
+)
+
+
 class InsufficientRecipesError(Exception):
     """Raised when there aren't enough recipes to fulfill requirements."""
 
     pass
 
 
+class CandidatePool:
+    """Recipes to draw from, weighted once, drawn without replacement.
+
+    The items and their seasonal weights are built on first use, so a pool
+    nobody draws from costs nothing to create.
+    """
+
+    def __init__(self, items: list[RecipeItem], today: _date, rng: Any = None) -> None:
+        """Wrap a list of {url: recipe} items, weighted for today.
+
+        rng is a random.Random for reproducible draws (default: the random
+        module).
+        """
+        self.items = items
+        self.today = today
+        self._rng = random if rng is None else rng
+        self._weights: list[float] | None = None
+        self._sampler: WeightedSampler | None = None
+        self._drawn: set[int] = set()
+
+    @classmethod
+    def from_recipes(
+        cls, recipes: Mapping[str, RecipeDict], today: _date, rng: Any = None
+    ) -> CandidatePool:
+        """Build a pool over every recipe in a {url: recipe} mapping."""
+        return cls([{url: data} for url, data in recipes.items()], today, rng)
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    @property
+    def weights(self) -> list[float]:
+        """Sampling weights for items (sharpened final_score), computed once."""
+        if self._weights is None:
+            self._weights = _weights(self.items, self.today)
+        return self._weights
+
+    def draw(self) -> RecipeItem:
+        """Draw one item by weight, never repeating one until all were drawn.
+
+        Zero-weight items come (uniformly) after the positive ones run out.
+
+        Raises:
+            ValueError: If the pool is empty
+        """
+        if not self.items:
+            raise ValueError("cannot draw from an empty pool")
+        if self._sampler is None or len(self._drawn) == len(self.items):
+            if self._drawn:
+                logger.warning(
+                    f"All {len(self.items)} candidates drawn; allowing repeats"
+                )
+            self._sampler = WeightedSampler(self.weights, self._rng)
+            self._drawn = set()
+        if self._sampler.total:
+            index = self._sampler.draw()
+        else:
+            rest = [i for i in range(len(self.items)) if i not in self._drawn]
+            index = self._rng.choice(rest)  # nosec B311
+        self._sampler.remove(index)
+        self._drawn.add(index)
+        return self.items[index]
+
+
+def ensure_features(recipe: MutableMapping[str, Any]) -> bool:
+    """Cache the protein category and veggie flag on a recipe in place.
+
+    Returns True if the recipe was modified (its features were missing or
+    computed from different keyword lists).
+    """
+    if recipe.get("feature_hash") == FEATURE_HASH:
+        return False
+    ingredients = recipe.get("ingredients", [])
+    if not isinstance(ingredients, list):
+        return False
+    recipe["protein"] = _categorize_by_protein(ingredients)
+    recipe["has_veggies"] = _mentions_any(ingredients, VEGGIES)
+    recipe["feature_hash"] = FEATURE_HASH
+    return True
+
+
+def _has_features(recipe_data: Mapping[str, Any]) -> bool:
+    """True if recipe_data carries features computed from the current keywords."""
+    return recipe_data.get("feature_hash") == FEATURE_HASH
+
+
+def protein_of(recipe: Mapping[str, Any]) -> str | None:
+    """Return a recipe's protein category: the cached one if current, else computed.
+
+    Returns "seafood", "landfood", or None if no protein (or no ingredient
+    list) is found.
+    """
+    if _has_features(recipe):
+        cached: str | None = recipe["protein"]
+        return cached
+    ingredients = recipe.get("ingredients")
+    if not isinstance(ingredients, list):
+        return None
+    return _categorize_by_protein(ingredients)
+
+
 def select_random_proteins(
-    recipes: dict[str, RecipeDict], today: _date | None = None
+    recipes: dict[str, RecipeDict], today: _date | None = None, rng: Any = None
 ) -> list[RecipeItem]:
     """Select recipes randomly based on protein categorization.
 
@@ -48,6 +185,8 @@ def select_random_proteins(
 
     Args:
         recipes: Dictionary mapping URLs to recipe data
+        today: Date used for seasonal weighting (defaults to today)
+        rng: A seeded random.Random for reproducible draws (optional)
 
     Returns:
         List of selected recipe items, each a dict with URL as key
@@ -75,12 +214,16 @@ def select_random_proteins(
     # Categorize recipes by protein type
     for url, recipe_data in recipes.items():
         try:
-            ingredients = recipe_data.get("ingredients", [])
-            if not isinstance(ingredients, list):
-                logger.warning(f"Recipe {url} has invalid ingredients: {ingredients}")
-                continue
-
-            protein_type = _categorize_by_protein(ingredients)
+            if _has_features(recipe_data):
+                protein_type = recipe_data["protein"]
+            else:
+                ingredients = recipe_data.get("ingredients", [])
+                if not isinstance(ingredients, list):
+                    logger.warning(
+                        f"Recipe {url} has invalid ingredients: {ingredients}"
+                    )
+                    continue
+                protein_type = _categorize_by_protein(ingredients)
             recipe_item = {url: recipe_data}
 
             if protein_type == "seafood":
@@ -93,12 +236,15 @@ def select_random_proteins(
             continue
 
     # Select appropriate mix using weighted-random by seasonal score
-    selected = _select_meal_mix(seafood_recipes, landfood_recipes, today)
+    selected = _select_meal_mix(
+        CandidatePool(seafood_recipes, today, rng),
+        CandidatePool(landfood_recipes, today, rng),
+    )
 
+    seafood_count = sum(1 for r in selected if _has_seafood_protein(r))
     logger.info(
         f"Selected {len(selected)} recipes: "
-        f"{sum(1 for r in selected if _has_seafood_protein(r))} seafood, "
-        f"{len(selected) - sum(1 for r in selected if _has_seafood_protein(r))} landfood"
+        f"{seafood_count} seafood, {len(selected) - seafood_count} landfood"
     )
 
     return selected
@@ -114,28 +260,32 @@ def _categorize_by_protein(ingredients: list[str]) -> str | None:
         "seafood", "landfood", or None if no protein found
     """
     for ingredient in ingredients:
-        ingredient_lower = ingredient.lower()
-
         # Seafood takes precedence
-        if any(protein in ingredient_lower for protein in SEAFOOD_PROTEINS):
-            return "seafood"
-
-        if any(protein in ingredient_lower for protein in LANDFOOD_PROTEINS):
-            return "landfood"
+        protein = _PROTEIN_MATCHER.first_group(
+            ingredient.lower(), ("seafood", "landfood")
+        )
+        if protein is not None:
+            return protein
 
     return None
 
 
+def _mentions_any(ingredients: list[str], keywords: tuple[str, ...]) -> bool:
+    """True if any ingredient string contains any of the keywords."""
+    # Newlines keep a keyword from matching across two ingredients.
+    matcher = any_keyword_matcher(tuple(keywords))
+    return matcher.search("\n".join(ingredients).lower())
+
+
 def _has_seafood_protein(recipe_item: RecipeItem) -> bool:
     """Check if a recipe item contains seafood protein."""
     for recipe_data in recipe_item.values():
-        ingredients = recipe_data.get("ingredients", [])
-        return _categorize_by_protein(ingredients) == "seafood"
+        return protein_of(recipe_data) == "seafood"
     return False
 
 
 def _select_meal_mix(
-    seafood: list[RecipeItem], landfood: list[RecipeItem], today: _date
+    seafood: CandidatePool, landfood: CandidatePool
 ) -> list[RecipeItem]:
     """Select a seasonally-weighted mix of seafood and landfood meals.
 
@@ -147,13 +297,13 @@ def _select_meal_mix(
     """
     # Case 1: Sufficient meals of both types
     if len(landfood) >= LANDFOOD_COUNT_WITH_SEAFOOD and len(seafood) >= SEAFOOD_COUNT:
-        land_pick = _pick(landfood, LANDFOOD_COUNT_WITH_SEAFOOD, today)
-        sea_pick = _pick(seafood, SEAFOOD_COUNT, today)
+        land_pick = _pick(landfood, LANDFOOD_COUNT_WITH_SEAFOOD)
+        sea_pick = _pick(seafood, SEAFOOD_COUNT)
         return land_pick + sea_pick
 
     # Case 2: Sufficient landfood, no seafood
     if len(landfood) >= LANDFOOD_COUNT_NO_SEAFOOD and len(seafood) == 0:
-        return _pick(landfood, LANDFOOD_COUNT_NO_SEAFOOD, today)
+        return _pick(landfood, LANDFOOD_COUNT_NO_SEAFOOD)
 
     # Case 3: Insufficient recipes
     error_msg = (
@@ -175,19 +325,24 @@ def _url_of(recipe_item: RecipeItem) -> str:
     return next(iter(recipe_item))
 
 
-def _weight(recipe_item: RecipeItem, today: _date) -> float:
-    """Sampling weight: the seasonal final_score sharpened by SELECTION_SHARPNESS."""
-    return float(final_score(_recipe_of(recipe_item), today) ** SELECTION_SHARPNESS)
+def _weights(items: list[RecipeItem], today: _date) -> list[float]:
+    """Sampling weights: the seasonal final_score sharpened by SELECTION_SHARPNESS.
+
+    Scored in one batch (final_scores), not recipe by recipe.
+    """
+    scores = final_scores([_recipe_of(item) for item in items], today)
+    weights: list[float] = (scores**SELECTION_SHARPNESS).tolist()
+    return weights
 
 
-def _pick(items: list[RecipeItem], k: int, today: _date) -> list[RecipeItem]:
-    """Draw k items by seasonally-weighted sampling (sharpened final_score)."""
-    return weighted_sample(items, [_weight(item, today) for item in items], k)
+def _pick(pool: CandidatePool, k: int) -> list[RecipeItem]:
+    """Draw k distinct items from pool (fewer if it is smaller)."""
+    return [pool.draw() for _ in range(min(k, len(pool)))]
 
 
 def ensure_veggies(
     meals: list[RecipeItem],
-    side_dishes: dict[str, RecipeDict],
+    side_dishes: dict[str, RecipeDict] | CandidatePool,
     required_veggies: tuple[str, ...],
     today: _date | None = None,
 ) -> list[MealItem]:
@@ -195,7 +350,8 @@ def ensure_veggies(
 
     Args:
         meals: List of selected main dish recipe items
-        side_dishes: Dictionary of available side dish recipes
+        side_dishes: Dictionary of available side dish recipes, or a
+            CandidatePool over them built once for the run
         required_veggies: Tuple of vegetable keywords to check for
         today: Date used for seasonal side weighting (defaults to today)
 
@@ -207,6 +363,7 @@ def ensure_veggies(
 
     Sides are drawn by the same seasonally-weighted sampling as mains, so a
     side's season/oven fit biases how likely it is to be paired with a meal.
+    No side is repeated within one call until every side has been used.
 
     Example:
         >>> meals = [{"url": {"ingredients": ["chicken"]}}]
@@ -221,6 +378,11 @@ def ensure_veggies(
 
         today = datetime.now().date()
 
+    side_pool = (
+        side_dishes
+        if isinstance(side_dishes, CandidatePool)
+        else CandidatePool.from_recipes(side_dishes, today)
+    )
     processed_meals: list[MealItem] = []
 
     for meal_item in meals:
@@ -229,15 +391,12 @@ def ensure_veggies(
             logger.debug(f"Meal has sufficient veggies: {list(meal_item.keys())[0]}")
         else:
             # Add a seasonally-weighted side dish
-            if not side_dishes:
+            if not side_pool:
                 logger.warning("No side dishes available to add veggies")
                 processed_meals.append({"type": "single_main", "obj": meal_item})
                 continue
 
-            side_items: list[RecipeItem] = [
-                {url: data} for url, data in side_dishes.items()
-            ]
-            side_item = _pick(side_items, 1, today)[0]
+            side_item = side_pool.draw()
             side_url = _url_of(side_item)
 
             processed_meals.append({"type": "combo_main", "obj": meal_item})
@@ -262,11 +421,10 @@ def _has_sufficient_veggies(
         True if meal contains at least one required veggie
     """
     for recipe_data in meal_item.values():
-        ingredients = recipe_data.get("ingredients", [])
-
-        for ingredient in ingredients:
-            ingredient_lower = ingredient.lower()
-            if any(veggie in ingredient_lower for veggie in required_veggies):
+        if required_veggies == VEGGIES and _has_features(recipe_data):
+            if recipe_data["has_veggies"]:
                 return True
+        elif _mentions_any(recipe_data.get("ingredients", []), required_veggies):
+            return True
 
     return False
@@ -4,18 +4,44 @@ Loads the TF-IDF + ridge artifact produced by train_seasonal_model.py and scores
 a recipe's per-season fit using only numpy (no scikit-learn, no Ollama). The
 tokenizer and text-blob builder here are imported by the training script so that
 train-time and inference-time featurization are byte-for-byte identical.
+
+SeasonalModel converts a loaded artifact to NumPy arrays once. Its predict_many
+scores a batch of recipes together: the TF-IDF rows are built as a CSR-style
+sparse matrix (only the tokens present) and multiplied by the coefficients in
+one pass, instead of one dense vocabulary-wide vector per recipe.
+
+The trainer also writes a binary copy of the artifact beside the JSON (see
+binary_paths): the idf and coefficients as one .npy array, memory-mapped on load
+(no parsing, no copy), plus a small JSON index of the vocabulary tokens. It is
+preferred when present and current; the JSON stays the fallback. The binary
+weights may be quantized (float16, or int8 with a per-column scale); only the
+rows a batch touches are dequantized, as they are gathered.
+
+Two featurizers are supported, chosen at training time and recorded in the
+artifact: "vocabulary" (the trained token -> column mapping, stored in the
+artifact) and "hashing" (columns are a seed-stable hash of the token, so there
+is no vocabulary to store and no token is out of vocabulary).
 """
 
 from __future__ import annotations
 
-import json
+import contextlib
+import hashlib
 import logging
 import re
+import zlib
+from collections import Counter
 from functools import lru_cache
-from typing import Any
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
 
 import numpy as np
 
+from file_utils import get_codec
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable, Sequence
+
 _TOKEN_RE = re.compile(r"\b\w\w+\b", re.UNICODE)
 
 SEASONS = ("spring", "summer", "fall", "winter")
@@ -24,12 +50,48 @@ logger = logging.getLogger(__name__)
 
 _NEUTRAL = 0.5
 
+# Reduced-precision formats for the binary weights (see quantize_weights).
+QUANTIZATIONS = ("float16", "int8")
+
 
 def tokenize(text: str) -> list[str]:
     """Lowercase + split text into word tokens of length >= 2 (sklearn default)."""
     return _TOKEN_RE.findall(text.lower())
 
 
+def hash_feature(token: str, n_features: int) -> int:
+    """Return the hashing featurizer's column for a token.
+
+    crc32, not hash(): str hashes are salted per process, this must match
+    between training and every later run.
+    """
+    return zlib.crc32(token.encode("utf-8")) % n_features
+
+
+def token_counts(
+    texts: Iterable[str], index_of: Callable[[str], int | None]
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Count each text's tokens by column, as CSR (counts, indices, indptr).
+
+    index_of maps a token to its column, or None to drop it.
+    """
+    indices: list[int] = []
+    counts: list[int] = []
+    indptr = [0]
+    for text in texts:
+        row = Counter(
+            idx for token in tokenize(text) if (idx := index_of(token)) is not None
+        )
+        indices.extend(row)
+        counts.extend(row.values())
+        indptr.append(len(indices))
+    return (
+        np.asarray(counts, dtype=float),
+        np.asarray(indices, dtype=np.intp),
+        np.asarray(indptr, dtype=np.intp),
+    )
+
+
 def recipe_text(recipe: dict[str, Any]) -> str:
     """Build the TF-IDF input blob from a recipe's title, ingredients, keywords."""
     parts: list[str] = [str(recipe.get("title", "") or "")]
@@ -49,8 +111,29 @@ def load_model(path: str) -> dict[str, Any]:
     Cached: the artifact is read+parsed from disk only once per path, so tagging
     a whole corpus doesn't re-parse the ~330KB file per recipe.
     """
-    with open(path, encoding="utf-8") as f:
-        return dict(json.load(f))
+    return dict(get_codec().loads(Path(path).read_bytes()))
+
+
+@lru_cache(maxsize=1)
+def model_hash(path: str) -> str | None:
+    """Return a short hash of the model at path, or None if it is missing.
+
+    Identifies the model that produced a score. It covers the JSON artifact and
+    the binary copy's index (quantization and scales) when there is one, so
+    retraining and re-exporting the binary weights both change it.
+    """
+    try:
+        digest = hashlib.sha256(Path(path).read_bytes())
+    except OSError:
+        return None
+    with contextlib.suppress(OSError):  # no binary copy
+        digest.update(binary_paths(path)[1].read_bytes())
+    return digest.hexdigest()[:16]
+
+
+def _source_hash(path: str | Path) -> str:
+    """Return a short sha256 of the file at path (uncached)."""
+    return hashlib.sha256(Path(path).read_bytes()).hexdigest()[:16]
 
 
 def _neutral() -> dict[str, float]:
@@ -58,23 +141,242 @@ def _neutral() -> dict[str, float]:
     return dict.fromkeys(SEASONS, _NEUTRAL)
 
 
-def predict_seasons(text: str, model: dict[str, Any]) -> dict[str, float]:
+def is_neutral(scores: dict[str, float]) -> bool:
+    """True if scores is the neutral fallback (0.5 for every season)."""
+    return scores == _neutral()
+
+
+class SeasonalModel:
+    """A loaded artifact with its arrays converted once, for batch scoring."""
+
+    def __init__(
+        self,
+        seasons: Sequence[str],
+        vocabulary: dict[str, int] | None,
+        idf: np.ndarray,
+        coef_t: np.ndarray,
+        intercept: np.ndarray,
+        scales: np.ndarray | None = None,
+    ) -> None:
+        """Wrap the model arrays; coef_t is (features, seasons), coef transposed.
+
+        vocabulary None selects the hashing featurizer over len(idf) columns.
+        The arrays are used as given, so memory-mapped ones stay zero-copy.
+        scales (idf's, then each season's) dequantize quantized idf / coef_t.
+        """
+        self.seasons = tuple(seasons)
+        self.vocabulary = vocabulary
+        self.n_features = len(idf)
+        self.idf = idf
+        # (vocab, seasons): a CSR row's tokens pick out rows of this matrix.
+        self.coef_t = coef_t
+        self.intercept = intercept
+        if scales is None:
+            scales = np.ones(1 + len(self.seasons))
+        self.idf_scale = float(scales[0])
+        self.coef_scales = np.asarray(scales[1:], dtype=float)
+
+    @classmethod
+    def from_artifact(cls, artifact: dict[str, Any]) -> SeasonalModel:
+        """Convert an artifact dict (see load_model) to NumPy arrays."""
+        hashing = artifact.get("featurizer", "vocabulary") == "hashing"
+        return cls(
+            artifact["seasons"],
+            None if hashing else artifact["vocabulary"],
+            np.asarray(artifact["idf"], dtype=float),
+            np.ascontiguousarray(np.asarray(artifact["coef"], dtype=float).T),
+            np.asarray(artifact["intercept"], dtype=float),
+        )
+
+    def transform(
+        self, texts: Iterable[str]
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Return texts' l2-normalized TF-IDF rows as CSR (data, indices, indptr)."""
+        counts, indices, indptr = token_counts(texts, self.feature_index)
+        data = counts * (self.idf[indices] * self.idf_scale)
+        rows = np.repeat(np.arange(len(indptr) - 1), np.diff(indptr))
+        norms = np.sqrt(np.bincount(rows, weights=data**2, minlength=len(indptr) - 1))
+        data /= np.where(norms > 0.0, norms, 1.0)[rows]
+        return data, indices, indptr
+
+    def feature_index(self, token: str) -> int | None:
+        """Return a token's column, or None if it is out of vocabulary."""
+        if self.vocabulary is None:
+            return hash_feature(token, self.n_features)
+        return self.vocabulary.get(token)
+
+    def score_texts(self, texts: Sequence[str]) -> np.ndarray:
+        """Per-season scores for every text, shape (len(texts), seasons), in [0,1]."""
+        data, indices, indptr = self.transform(texts)
+        rows = np.repeat(np.arange(len(texts)), np.diff(indptr))
+        # Sparse @ dense: each stored entry adds data * its coefficient row.
+        contributions = data[:, None] * (self.coef_t[indices] * self.coef_scales)
+        scores = np.column_stack(
+            [
+                np.bincount(rows, weights=contributions[:, j], minlength=len(texts))
+                for j in range(len(self.seasons))
+            ]
+        )
+        clipped: np.ndarray = np.clip(
+            scores.reshape(len(texts), -1) + self.intercept, 0.0, 1.0
+        )
+        return clipped
+
+    def quantized(self, quantization: str) -> SeasonalModel:
+        """Return this model with its weights quantized (see quantize_weights)."""
+        weights, scales = quantize_weights(
+            np.column_stack(
+                [self.idf * self.idf_scale, self.coef_t * self.coef_scales]
+            ),
+            quantization,
+        )
+        return SeasonalModel(
+            self.seasons,
+            self.vocabulary,
+            weights[:, 0],
+            weights[:, 1:],
+            self.intercept,
+            scales,
+        )
+
+    def predict(self, text: str) -> dict[str, float]:
+        """Score one text blob; see score_texts."""
+        return dict(
+            zip(self.seasons, self.score_texts([text])[0].tolist(), strict=True)
+        )
+
+    def predict_many(self, recipes: Sequence[dict[str, Any]]) -> list[dict[str, float]]:
+        """Score recipes in one batch; recipes with no text get the neutral 0.5."""
+        texts = [recipe_text(recipe) for recipe in recipes]
+        scored = [i for i, text in enumerate(texts) if text.strip()]
+        results = [_neutral() for _ in recipes]
+        if scored:
+            scores = self.score_texts([texts[i] for i in scored]).tolist()
+            for i, row in zip(scored, scores, strict=True):
+                results[i] = dict(zip(self.seasons, row, strict=True))
+        return results
+
+
+def quantize_weights(
+    weights: np.ndarray, quantization: str
+) -> tuple[np.ndarray, np.ndarray]:
+    """Quantize a (features, columns) weights array; return it and its scales.
+
+    "float16" halves the precision (scales are all 1). "int8" maps each column
+    to [-127, 127] by its own scale, max |column| / 127. Dequantized weights
+    are quantized * scales.
+
+    Raises:
+        ValueError: If quantization is not one of QUANTIZATIONS
+    """
+    if quantization == "float16":
+        return weights.astype("<f2"), np.ones(weights.shape[1])
+    if quantization == "int8":
+        scales = np.abs(weights).max(axis=0, initial=0.0) / 127.0
+        scales[scales == 0.0] = 1.0
+        return np.rint(weights / scales).astype(np.int8), scales
+    raise ValueError(f"Unknown quantization: {quantization!r}")
+
+
+def binary_paths(path: str | Path) -> tuple[Path, Path]:
+    """Return the (.npy weights, .index.json) paths beside a JSON model path."""
+    json_path = Path(path)
+    return json_path.with_suffix(".npy"), json_path.with_suffix(".index.json")
+
+
+def save_binary_model(
+    artifact: dict[str, Any], path: str | Path, quantization: str = ""
+) -> None:
+    """Write the binary copy of the artifact saved as JSON at path.
+
+    The weights array is (features, 1 + seasons): idf, then the coefficients
+    transposed, float64 or quantized (see quantize_weights). The index holds
+    the seasons, intercepts, the quantization and its scales, the vocabulary as
+    a token list in column order (null for the hashing featurizer), and a hash
+    of the JSON file, so a binary copy left behind by an older JSON is
+    recognized as stale.
+    """
+    weights_path, index_path = binary_paths(path)
+    tokens: list[str] | None = None
+    if artifact.get("featurizer", "vocabulary") != "hashing":
+        tokens = [""] * len(artifact["vocabulary"])
+        for token, idx in artifact["vocabulary"].items():
+            tokens[idx] = token
+    weights = np.column_stack(
+        [
+            np.asarray(artifact["idf"], dtype="<f8"),
+            np.asarray(artifact["coef"], dtype="<f8").T,
+        ]
+    )
+    scales = np.ones(weights.shape[1])
+    if quantization:
+        weights, scales = quantize_weights(weights, quantization)
+    np.save(weights_path, np.ascontiguousarray(weights))
+    index = {
+        "version": artifact.get("version", 1),
+        "seasons": list(artifact["seasons"]),
+        "intercept": [float(x) for x in artifact["intercept"]],
+        "quantization": quantization,
+        "scales": scales.tolist(),
+        "tokens": tokens,
+        "source_hash": _source_hash(path),
+    }
+    index_path.write_bytes(get_codec().dumps(index, compact=True))
+
+
+def load_binary_model(path: str | Path) -> SeasonalModel | None:
+    """Load the binary copy of the JSON model at path, memory-mapped.
+
+    Returns None if there is no binary copy, or it is stale (the JSON beside it
+    has different contents).
+
+    Raises:
+        OSError, ValueError, KeyError: If the binary copy is unreadable
+    """
+    weights_path, index_path = binary_paths(path)
+    if not (weights_path.exists() and index_path.exists()):
+        return None
+    index = get_codec().loads(index_path.read_bytes())
+    json_path = Path(path)
+    if json_path.exists() and _source_hash(json_path) != index.get("source_hash"):
+        logger.warning(f"{weights_path} is older than {json_path}; using the JSON")
+        return None
+    weights = np.load(weights_path, mmap_mode="r")
+    tokens, seasons = index["tokens"], index["seasons"]
+    width = weights.shape[0] if tokens is None else len(tokens)
+    if weights.shape != (width, 1 + len(seasons)):
+        raise ValueError(f"{weights_path} has shape {weights.shape}")
+    return SeasonalModel(
+        seasons,
+        None if tokens is None else dict(zip(tokens, range(width), strict=True)),
+        weights[:, 0],
+        weights[:, 1:],
+        np.asarray(index["intercept"], dtype=float),
+        np.asarray(index["scales"], dtype=float) if "scales" in index else None,
+    )
+
+
+@lru_cache(maxsize=1)
+def load_compiled_model(path: str) -> SeasonalModel:
+    """Load the model at path as a SeasonalModel (cached, like load_model).
+
+    Prefers the memory-mapped binary copy; falls back to parsing the JSON.
+    """
+    try:
+        model = load_binary_model(path)
+    except (OSError, ValueError, KeyError) as e:
+        logger.warning(f"Binary seasonal model unreadable, using the JSON: {e}")
+        model = None
+    return model if model is not None else SeasonalModel.from_artifact(load_model(path))
+
+
+def predict_seasons(
+    text: str, model: dict[str, Any] | SeasonalModel
+) -> dict[str, float]:
     """Score a text blob's per-season fit via TF-IDF (l2) + ridge, clamped [0,1]."""
-    vocab: dict[str, int] = model["vocabulary"]
-    idf = np.asarray(model["idf"], dtype=float)
-    vec = np.zeros(len(idf), dtype=float)
-    for token in tokenize(text):
-        idx = vocab.get(token)
-        if idx is not None:
-            vec[idx] += 1.0
-    vec *= idf
-    norm = float(np.linalg.norm(vec))
-    if norm > 0.0:
-        vec /= norm
-    coef = np.asarray(model["coef"], dtype=float)
-    intercept = np.asarray(model["intercept"], dtype=float)
-    scores = np.clip(coef @ vec + intercept, 0.0, 1.0)
-    return {s: float(x) for s, x in zip(model["seasons"], scores, strict=True)}
+    if not isinstance(model, SeasonalModel):
+        model = SeasonalModel.from_artifact(model)
+    return model.predict(text)
 
 
 def predict_for_recipe(recipe: dict[str, Any], model_path: str) -> dict[str, float]:
@@ -83,7 +385,18 @@ def predict_for_recipe(recipe: dict[str, Any], model_path: str) -> dict[str, flo
         text = recipe_text(recipe)
         if not text.strip():
             return _neutral()
-        return predict_seasons(text, load_model(model_path))
+        return load_compiled_model(model_path).predict(text)
     except Exception as e:  # best-effort: must not break the recipe run
         logger.warning(f"Seasonal student prediction failed: {e}")
         return _neutral()
+
+
+def predict_for_recipes(
+    recipes: Sequence[dict[str, Any]], model_path: str
+) -> list[dict[str, float]]:
+    """Score a batch of recipes; never raises (neutral 0.5 for all on failure)."""
+    try:
+        return load_compiled_model(model_path).predict_many(recipes)
+    except Exception as e:  # best-effort: must not break the recipe run
+        logger.warning(f"Seasonal student batch prediction failed: {e}")
+        return [_neutral() for _ in recipes]
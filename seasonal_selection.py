@@ -2,14 +2,18 @@
 
 Turns today's date into per-season blend weights and a continuous winter↔summer
 heat preference, then scores already-tagged recipes for the weekly pick.
+final_scores scores a whole list of recipes at once with NumPy.
 """
 
 from __future__ import annotations
 
 import random
+from collections.abc import Sequence  # noqa: TC003
 from datetime import date  # noqa: TC003
 from typing import Any
 
+import numpy as np
+
 from config import (
     FALL_CENTER,
     HEAT_WEIGHT,
@@ -24,7 +28,9 @@ __all__ = [
     "season_fit",
     "heat_preference",
     "final_score",
+    "final_scores",
     "weighted_sample",
+    "WeightedSampler",
 ]
 
 _YEAR_DAYS = 365
@@ -102,30 +108,129 @@ def final_score(recipe: dict[str, Any], today: date) -> float:
     return max(score, MIN_SCORE)
 
 
-def weighted_sample(items: list[Any], weights: list[float], k: int) -> list[Any]:
+class WeightedSampler:
+    """Weighted draws over item indices, backed by a Fenwick (sum) tree.
+
+    Construction is O(n); each draw and each removal is O(log n). Non-positive
+    weights are never drawn.
+    """
+
+    def __init__(self, weights: list[float], rng: Any = None) -> None:
+        """Build the tree; rng is a random.Random (default: the random module)."""
+        self._rng = random if rng is None else rng
+        self._weights = [w if w > 0 else 0.0 for w in weights]
+        self._live = sum(1 for w in self._weights if w > 0)
+        n = len(self._weights)
+        self._tree = [0.0] + self._weights
+        for i in range(1, n + 1):
+            parent = i + (i & -i)
+            if parent <= n:
+                self._tree[parent] += self._tree[i]
+        self._top = 1 << (n.bit_length() - 1) if n else 0
+
+    def __len__(self) -> int:
+        return len(self._weights)
+
+    @property
+    def total(self) -> float:
+        """Sum of the weights not yet removed."""
+        if not self._live:
+            return 0.0  # not a float residue from the removals
+        total = 0.0
+        i = len(self._weights)
+        while i > 0:
+            total += self._tree[i]
+            i -= i & -i
+        return total
+
+    def draw(self) -> int:
+        """Return an index with probability proportional to its weight.
+
+        Raises:
+            ValueError: If no positive weight remains
+        """
+        if not self._live:
+            raise ValueError("no positive weight left to draw from")
+        r = self._rng.uniform(0, self.total)  # nosec B311
+        # Descend to the first index whose prefix sum exceeds r.
+        pos = 0
+        step = self._top
+        while step:
+            nxt = pos + step
+            if nxt <= len(self._weights) and self._tree[nxt] <= r:
+                pos = nxt
+                r -= self._tree[nxt]
+            step >>= 1
+        if pos >= len(self._weights) or self._weights[pos] <= 0:
+            # Floating-point edge (r at the very top): take the last live index.
+            pos = max(i for i, w in enumerate(self._weights) if w > 0)
+        return pos
+
+    def remove(self, index: int) -> None:
+        """Take index out of later draws."""
+        delta = -self._weights[index]
+        if delta:
+            self._live -= 1
+        self._weights[index] = 0.0
+        i = index + 1
+        while i <= len(self._weights):
+            self._tree[i] += delta
+            i += i & -i
+
+
+def final_scores(recipes: Sequence[Any], today: date) -> np.ndarray:
+    """final_score for every recipe, as one array (same values, same order).
+
+    The date math (season_blend, heat_preference) runs once; the recipes'
+    seasonality vectors and oven_use are packed into arrays and scored in one
+    vectorized expression.
+    """
+    blend = season_blend(today)
+    names = list(blend)
+    blend_weights = np.array([blend[name] for name in names])
+    heat = float(blend_weights @ np.array([_SEASON_HEAT[name] for name in names]))
+
+    count = len(recipes)
+    seasons = np.zeros((count, len(names)))
+    tagged = np.zeros(count, dtype=bool)
+    oven = np.empty(count)
+    for i, recipe in enumerate(recipes):
+        seasonality = recipe.get("seasonality")
+        if isinstance(seasonality, dict):
+            seasons[i] = [float(seasonality.get(name, 0.0)) for name in names]
+            tagged[i] = True
+        oven[i] = float(recipe.get("oven_use", 0.5))
+
+    fit = np.where(tagged, seasons @ blend_weights, 0.5)
+    return np.maximum(fit + HEAT_WEIGHT * heat * oven, MIN_SCORE)
+
+
+def weighted_sample(
+    items: list[Any], weights: list[float], k: int, rng: Any = None
+) -> list[Any]:
     """Draw k distinct items without replacement, prob. proportional to weight.
 
-    Falls back to uniform sampling if all weights are non-positive.
+    Falls back to uniform sampling if all weights are non-positive; items with
+    non-positive weight are only drawn (uniformly) once the positive ones run
+    out. O(n + k log n). Pass a seeded random.Random as rng for reproducible
+    draws.
     """
+    rng = random if rng is None else rng
     k = min(k, len(items))
     if k <= 0:
         return []
     if sum(w for w in weights if w > 0) <= 0:
-        return random.sample(items, k)  # nosec B311
-
-    pool = list(zip(items, weights, strict=False))
-    chosen: list[Any] = []
-    for _ in range(k):
-        total = sum(w for _, w in pool)
-        r = random.uniform(0, total)  # nosec B311
-        upto = 0.0
-        for idx, (item, w) in enumerate(pool):
-            upto += w
-            if upto >= r:
-                chosen.append(item)
-                pool.pop(idx)
-                break
-        else:
-            # Floating-point edge: take the last remaining item.
-            chosen.append(pool.pop()[0])
-    return chosen
+        uniform: list[Any] = rng.sample(items, k)  # nosec B311
+        return uniform
+
+    sampler = WeightedSampler(weights, rng)
+    chosen: list[int] = []
+    while len(chosen) < k and sampler.total:
+        index = sampler.draw()
+        sampler.remove(index)
+        chosen.append(index)
+    if len(chosen) < k:
+        taken = set(chosen)
+        rest = [i for i in range(len(items)) if i not in taken]
+        chosen += rng.sample(rest, k - len(chosen))  # nosec B311
+    return [items[i] for i in chosen]
@@ -2,24 +2,50 @@
 
 oven_use is rule-based (deterministic keyword scan). seasonality is produced by
 a small local numpy "student" model (see seasonal_model.predict_for_recipe);
-there is no network or Ollama dependency at runtime. Scoring never raises:
+there is no network or Ollama dependency at runtime. The selection features
+(protein category, veggie flag) are cached alongside them, see
+recipe_selector.ensure_features. Scoring never raises:
 callers get a neutral 0.5 fallback / unchanged recipes rather than exceptions.
+ensure_recipes_tagged tags a batch, scoring all its seasonality in one model pass.
+
+Each model score is stamped (seasonality_stamp) with the model's hash and a
+fingerprint of the recipe text it scored. A stamp that no longer matches (the
+model was retrained or re-exported, or the recipe's text changed) marks the
+score stale; retag_recipes rescores just those. Neutral fallbacks from a failed
+prediction, and scores from before stamping, are unstamped and so stale too.
 """
 
 from __future__ import annotations
 
+import hashlib
 import logging
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
 from config import SEASONAL_MODEL_FILENAME
-from seasonal_model import predict_for_recipe
+from keyword_matcher import KeywordMatcher
+from recipe_selector import ensure_features
+from seasonal_model import (
+    is_neutral,
+    model_hash,
+    predict_for_recipe,
+    predict_for_recipes,
+    recipe_text,
+)
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
 
 logger = logging.getLogger(__name__)
 
 __all__ = [
     "score_oven_use",
     "score_seasons",
+    "score_seasons_many",
     "ensure_recipe_tagged",
+    "ensure_recipes_tagged",
+    "is_stale",
+    "retag_recipes",
+    "seasonality_stamp",
 ]
 
 # Keyword groups for oven_use, checked in priority order: oven > grill/no-cook > stovetop.
@@ -58,6 +84,13 @@ _STOVETOP_KEYWORDS = (
     "pan-fry",
     "boil",
 )
+_OVEN_USE_MATCHER = KeywordMatcher(
+    {
+        "oven": _OVEN_KEYWORDS,
+        "no_oven": _NO_OVEN_KEYWORDS,
+        "stovetop": _STOVETOP_KEYWORDS,
+    }
+)
 
 
 def score_oven_use(instructions: str) -> float:
@@ -65,12 +98,14 @@ def score_oven_use(instructions: str) -> float:
 
     1.0 = oven-heavy (heats the house), 0.5 = stovetop, 0.0 = grill / no-cook.
     """
-    text = (instructions or "").lower()
-    if any(kw in text for kw in _OVEN_KEYWORDS):
+    group = _OVEN_USE_MATCHER.first_group(
+        (instructions or "").lower(), ("oven", "no_oven", "stovetop")
+    )
+    if group == "oven":
         return 1.0
-    if any(kw in text for kw in _NO_OVEN_KEYWORDS):
+    if group == "no_oven":
         return 0.0
-    if any(kw in text for kw in _STOVETOP_KEYWORDS):
+    if group == "stovetop":
         return 0.5
     return 0.5
 
@@ -84,11 +119,55 @@ def score_seasons(recipe: dict[str, Any]) -> dict[str, float]:
     return predict_for_recipe(recipe, SEASONAL_MODEL_FILENAME)
 
 
+def score_seasons_many(recipes: Sequence[dict[str, Any]]) -> list[dict[str, float]]:
+    """Score a batch of recipes with the student model in one pass.
+
+    Same per-recipe results as score_seasons.
+    """
+    return predict_for_recipes(recipes, SEASONAL_MODEL_FILENAME)
+
+
+def seasonality_stamp(recipe: dict[str, Any]) -> str | None:
+    """Return "<model hash>:<recipe text fingerprint>", or None without a model."""
+    model = model_hash(SEASONAL_MODEL_FILENAME)
+    if model is None:
+        return None
+    text = hashlib.sha256(recipe_text(recipe).encode("utf-8")).hexdigest()[:16]
+    return f"{model}:{text}"
+
+
+def _set_seasonality(recipe: dict[str, Any], seasons: dict[str, float]) -> None:
+    """Store a model score on a recipe along with its stamp (if there is a model).
+
+    The neutral fallback for a recipe that has text means the prediction
+    failed; it is left unstamped so a retag retries it.
+    """
+    recipe["seasonality"] = seasons
+    stamp = seasonality_stamp(recipe)
+    if stamp is None or (is_neutral(seasons) and recipe_text(recipe).strip()):
+        recipe.pop("seasonality_stamp", None)
+    else:
+        recipe["seasonality_stamp"] = stamp
+
+
+def is_stale(recipe: dict[str, Any]) -> bool:
+    """True if the recipe's seasonality is missing or its stamp doesn't match.
+
+    Scores only go stale when there is a model to rescore them with; then an
+    unstamped score (a fallback, or from before stamping) is stale too.
+    """
+    if "seasonality" not in recipe:
+        return True
+    stamp = seasonality_stamp(recipe)
+    return stamp is not None and recipe.get("seasonality_stamp") != stamp
+
+
 def ensure_recipe_tagged(recipe: dict[str, Any]) -> bool:
-    """Add missing oven_use / seasonality tags to a recipe in place.
+    """Add missing oven_use / seasonality tags and selection features in place.
 
     oven_use is derived from rules; seasonality comes from the local numpy
-    student model. Returns True if the recipe dict was modified.
+    student model; stale or missing features are recomputed. Returns True if
+    the recipe dict was modified.
     """
     changed = False
 
@@ -97,7 +176,38 @@ def ensure_recipe_tagged(recipe: dict[str, Any]) -> bool:
         changed = True
 
     if "seasonality" not in recipe:
-        recipe["seasonality"] = score_seasons(recipe)
+        _set_seasonality(recipe, score_seasons(recipe))
+        changed = True
+
+    if ensure_features(recipe):
         changed = True
 
     return changed
+
+
+def ensure_recipes_tagged(recipes: Sequence[dict[str, Any]]) -> list[bool]:
+    """Tag a batch of recipes in place; see ensure_recipe_tagged.
+
+    Every missing seasonality in the batch is scored in one model pass. Returns
+    one changed flag per recipe, in order.
+    """
+    missing = [recipe for recipe in recipes if "seasonality" not in recipe]
+    for recipe, seasons in zip(missing, score_seasons_many(missing), strict=True):
+        _set_seasonality(recipe, seasons)
+    scored = {id(recipe) for recipe in missing}
+    return [ensure_recipe_tagged(recipe) or id(recipe) in scored for recipe in recipes]
+
+
+def retag_recipes(recipes: Sequence[dict[str, Any]]) -> list[bool]:
+    """Rescore, in one model pass, the recipes whose seasonality is stale.
+
+    Also adds any other missing tags (see ensure_recipe_tagged). Returns one
+    changed flag per recipe, in order.
+    """
+    stale = [recipe for recipe in recipes if is_stale(recipe)]
+    for recipe, seasons in zip(stale, score_seasons_many(stale), strict=True):
+        _set_seasonality(recipe, seasons)
+    rescored = {id(recipe) for recipe in stale}
+    return [
+        ensure_recipe_tagged(recipe) or id(recipe) in rescored for recipe in recipes
+    ]
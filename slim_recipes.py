@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""One-off script: drop stored recipe fields the pipeline never reads.
+
+New recipes are trimmed to STORED_RECIPE_KEYS as they are scraped; this applies
+the same projection to the recipes already stored, in whichever RECIPE_STORE is
+configured. Run by hand:
+
+    python slim_recipes.py
+
+Safe to re-run: recipes that are already slim are left alone.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+from typing import TYPE_CHECKING, Any
+
+from config import (
+    FAILED_FILENAME,
+    RECIPE_DB_FILENAME,
+    RECIPE_STORE,
+    UNUSED_MAINS_FILENAME,
+    UNUSED_SIDES_FILENAME,
+    USED_FILENAME,
+)
+from file_utils import load_json, save_json
+from recipe_corpus import corpus_path, load_corpus, save_corpus
+from recipe_db import open_recipe_db
+from web_scraper import trim_recipe
+
+if TYPE_CHECKING:
+    from collections.abc import MutableMapping
+    from pathlib import Path
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def slim_recipes(recipes: MutableMapping[str, Any]) -> int:
+    """Trim every recipe in `recipes` in place.
+
+    Returns the number of recipes that lost fields.
+    """
+    slimmed = 0
+    for url, recipe in list(recipes.items()):
+        trimmed = trim_recipe(recipe)
+        if len(trimmed) < len(recipe):
+            recipes[url] = trimmed
+            slimmed += 1
+    return slimmed
+
+
+def _slim_files() -> int:
+    """Slim the unused mains/sides JSON (or corpus) files."""
+    total = 0
+    for filename in (UNUSED_MAINS_FILENAME, UNUSED_SIDES_FILENAME):
+        path: str | Path
+        if RECIPE_STORE == "corpus":
+            path = corpus_path(filename)
+            recipes, _ = load_corpus(path, migrate_from=filename)
+        else:
+            path = filename
+            recipes, _ = load_json(path)
+        before = os.path.getsize(path)
+        slimmed = slim_recipes(recipes)
+        if slimmed:
+            if RECIPE_STORE == "corpus":
+                save_corpus(path, recipes)
+            else:
+                save_json(path, recipes)
+        logger.info(
+            f"{path}: slimmed {slimmed} of {len(recipes)} recipes, "
+            f"{before // 1024} KB -> {os.path.getsize(path) // 1024} KB"
+        )
+        total += slimmed
+    return total
+
+
+def _slim_database() -> int:
+    """Slim unused mains/sides in the SQLite store and reclaim the space."""
+    db = open_recipe_db(
+        RECIPE_DB_FILENAME,
+        UNUSED_MAINS_FILENAME,
+        UNUSED_SIDES_FILENAME,
+        FAILED_FILENAME,
+        USED_FILENAME,
+    )
+    try:
+        with db.transaction():
+            total = slim_recipes(db.mains) + slim_recipes(db.sides)
+        db.conn.execute("VACUUM")
+    finally:
+        db.close()
+    logger.info(f"{RECIPE_DB_FILENAME}: slimmed {total} recipes")
+    return total
+
+
+def main() -> None:
+    """Slim the configured recipe store and print a summary."""
+    total = _slim_database() if RECIPE_STORE == "sqlite" else _slim_files()
+    logger.info(f"Slimming complete: {total} recipe(s) trimmed.")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,37 +4,160 @@ import sys
 from pathlib import Path
 from unittest.mock import patch
 
+import pytest
+
 sys.path.insert(0, str(Path(__file__).parent.parent))
 import backfill_seasonality
+from config import UNUSED_MAINS_FILENAME, UNUSED_SIDES_FILENAME
+from file_utils import journal_path, load_json, save_json
+from recipe_corpus import corpus_path, load_corpus, save_corpus
+from recipe_db import open_recipe_db
+
+
+def _tag_all(batch):
+    """Stand-in for ensure_recipes_tagged: tag every recipe in the batch."""
+    for recipe in batch:
+        recipe["seasonality"] = {"summer": 1.0}
+    return [True] * len(batch)
 
 
 class TestBackfillFile:
     """Tests for backfill file."""
 
+    @patch("backfill_seasonality.append_journal", return_value=0)
     @patch("backfill_seasonality.save_json")
-    @patch("backfill_seasonality.ensure_recipe_tagged")
-    def test_tags_all_untagged_in_a_file(self, mock_tag, mock_save):
+    @patch("backfill_seasonality.ensure_recipes_tagged")
+    def test_tags_all_untagged_in_a_file(self, mock_tag, mock_save, mock_journal):
         """Tags all untagged in a file."""
-        mock_tag.return_value = True
+        mock_tag.side_effect = lambda batch: [True] * len(batch)
         recipes = {"u1": {"title": "A"}, "u2": {"title": "B"}, "u3": {"title": "C"}}
 
         tagged = backfill_seasonality.backfill_file(
-            "some_file.json", recipes, save_every=2
+            "some_file.json", recipes, save_every=2, batch_size=2
         )
 
-        assert mock_tag.call_count == 3
+        assert [len(call.args[0]) for call in mock_tag.call_args_list] == [2, 1]
         assert tagged == 3
-        # save_every=2 -> a save at recipe 2, plus a final save = 2 saves
-        assert mock_save.call_count == 2
+        # save_every=2 -> a checkpoint at recipe 2, plus a final one; then one
+        # full save compacts the journal
+        assert [list(call.args[1]) for call in mock_journal.call_args_list] == [
+            ["u1", "u2"],
+            ["u3"],
+        ]
+        mock_save.assert_called_once_with("some_file.json", recipes)
+
+    @patch("backfill_seasonality.append_journal", return_value=0)
+    @patch("backfill_seasonality.save_json")
+    @patch("backfill_seasonality.ensure_recipes_tagged")
+    def test_checkpoints_span_batches(self, mock_tag, mock_save, mock_journal):
+        """Changes are journaled once save_every accumulate, not every batch."""
+        mock_tag.side_effect = lambda batch: [True] * len(batch)
+        recipes = {f"u{i}": {"title": str(i)} for i in range(5)}
+
+        backfill_seasonality.backfill_file(
+            "f.json", recipes, save_every=3, batch_size=2
+        )
+
+        assert [len(call.args[1]) for call in mock_journal.call_args_list] == [4, 1]
+        mock_save.assert_called_once()
 
+    @patch("backfill_seasonality.append_journal", return_value=0)
     @patch("backfill_seasonality.save_json")
-    @patch("backfill_seasonality.ensure_recipe_tagged")
-    def test_no_save_when_nothing_changed(self, mock_tag, mock_save):
+    @patch("backfill_seasonality.ensure_recipes_tagged")
+    def test_no_save_when_nothing_changed(self, mock_tag, mock_save, mock_journal):
         """No save when nothing changed."""
-        mock_tag.return_value = False
+        mock_tag.return_value = [False]
         recipes = {"u1": {"title": "A"}}
 
         tagged = backfill_seasonality.backfill_file("f.json", recipes, save_every=25)
 
         assert tagged == 0
+        mock_journal.assert_not_called()
+        mock_save.assert_not_called()
+
+    @patch("backfill_seasonality.ensure_recipes_tagged", side_effect=_tag_all)
+    def test_interrupted_run_keeps_checkpoints(self, _tag, tmp_path):
+        """Journaled checkpoints survive a crash before the final compaction."""
+        filepath = str(tmp_path / "recipes.json")
+        save_json(filepath, {"u1": {"title": "A"}, "u2": {"title": "B"}})
+        recipes, _ = load_json(filepath)
+
+        with (
+            patch("backfill_seasonality.save_json", side_effect=OSError("killed")),
+            pytest.raises(OSError),
+        ):
+            backfill_seasonality.backfill_file(filepath, recipes, save_every=1)
+
+        reloaded, _ = load_json(filepath)
+        assert reloaded["u2"]["seasonality"] == {"summer": 1.0}
+
+        backfill_seasonality.backfill_file(filepath, reloaded)
+        assert not journal_path(filepath).exists()
+
+
+class TestRetagFile:
+    """Tests for the --retag mode."""
+
+    @patch("backfill_seasonality.append_journal", return_value=0)
+    @patch("backfill_seasonality.save_json")
+    @patch("backfill_seasonality.retag_recipes")
+    @patch("backfill_seasonality.is_stale")
+    def test_batches_only_stale_recipes(
+        self, mock_stale, mock_retag, mock_save, mock_journal
+    ):
+        """Only stale recipes are rescored, batch_size at a time."""
+        mock_stale.side_effect = lambda recipe: recipe["title"] != "fresh"
+        mock_retag.side_effect = lambda batch: [True] * len(batch)
+        recipes = {
+            "u1": {"title": "A"},
+            "u2": {"title": "fresh"},
+            "u3": {"title": "B"},
+            "u4": {"title": "C"},
+        }
+
+        tagged = backfill_seasonality.backfill_file(
+            "f.json", recipes, retag=True, batch_size=2
+        )
+
+        batches = [call.args[0] for call in mock_retag.call_args_list]
+        assert batches == [[recipes["u1"], recipes["u3"]], [recipes["u4"]]]
+        assert tagged == 3
+        assert mock_journal.call_count == 1
+        assert mock_save.call_count == 1
+
+
+@patch("backfill_seasonality.ensure_recipes_tagged", side_effect=_tag_all)
+class TestRecipeStores:
+    """main() backfills whichever RECIPE_STORE is configured."""
+
+    def test_corpus_store(self, _tag, tmp_path, monkeypatch):
+        """Corpus recipes are tagged and saved back to the corpus."""
+        monkeypatch.chdir(tmp_path)
+        for filename in (UNUSED_MAINS_FILENAME, UNUSED_SIDES_FILENAME):
+            save_corpus(corpus_path(filename), {filename: {"title": "A"}})
+
+        with patch("backfill_seasonality.RECIPE_STORE", "corpus"):
+            backfill_seasonality.main()
+
+        mains, _ = load_corpus(corpus_path(UNUSED_MAINS_FILENAME))
+        assert mains[UNUSED_MAINS_FILENAME]["seasonality"] == {"summer": 1.0}
+
+    def test_sqlite_store(self, _tag, tmp_path, monkeypatch):
+        """Database rows are written back through the table views."""
+        monkeypatch.chdir(tmp_path)
+        save_json(UNUSED_MAINS_FILENAME, {"u1": {"title": "A"}})
+        db_path = tmp_path / "recipes.db"
+
+        with (
+            patch("backfill_seasonality.RECIPE_STORE", "sqlite"),
+            patch("backfill_seasonality.RECIPE_DB_FILENAME", db_path),
+            patch("backfill_seasonality.save_json") as mock_save,
+        ):
+            backfill_seasonality.main()
+
         mock_save.assert_not_called()
+        db = open_recipe_db(db_path, "none", "none", "none", "none")
+        try:
+            assert db.mains["u1"]["seasonality"] == {"summer": 1.0}
+        finally:
+            db.close()
@@ -0,0 +1,25 @@
+"""Tests for the JSON codec benchmark script."""
+
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from benchmark_json_codecs import available_codecs, benchmark_file
+
+
+def test_benchmark_file_reports_both_modes(tmp_path):
+    """Each codec yields an indented and a compact row; compact is smaller."""
+    data_file = tmp_path / "recipes.json"
+    data_file.write_text(json.dumps({f"u{i}": {"n": [i] * 5} for i in range(50)}))
+    out_dir = tmp_path / "out"
+    out_dir.mkdir()
+
+    for codec in available_codecs():
+        indent, compact = benchmark_file(data_file, codec, out_dir, repeat=1)
+
+        assert (indent["mode"], compact["mode"]) == ("indent", "compact")
+        assert compact["size_kb"] < indent["size_kb"]
+        assert indent["load_ms"] >= 0 and indent["save_ms"] >= 0
+    assert data_file.read_text().startswith('{"u0"')
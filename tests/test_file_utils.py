@@ -1,5 +1,6 @@
 """Comprehensive tests for refactored file_utils module."""
 
+import io
 import json
 import os
 import sys
@@ -10,11 +11,19 @@ import pytest
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+import file_utils
 from file_utils import (
     FileOperationError,
+    OrjsonCodec,
+    StdlibCodec,
+    append_journal,
+    backup_path,
+    get_codec,
     is_file_old,
+    journal_path,
     load_json,
     save_json,
+    save_json_many,
 )
 
 
@@ -149,6 +158,283 @@ class TestLoadJson:
         assert isinstance(loaded["boolean"], bool)
 
 
+class TestJournal:
+    """Test the append-only journal kept beside a JSON snapshot."""
+
+    def test_load_replays_journal_over_snapshot(self, tmp_path):
+        """Journaled sets and deletes show up in load_json's dict."""
+        filepath = tmp_path / "recipes.json"
+        save_json(filepath, {"a": 1, "b": 2})
+        append_journal(filepath, {"c": 3})
+        append_journal(filepath, {"a": 10}, removals=["b"])
+
+        data, created = load_json(filepath)
+
+        assert data == {"a": 10, "c": 3}
+        assert created is False
+
+    def test_append_returns_journal_size(self, tmp_path):
+        """The returned size grows with each append."""
+        filepath = tmp_path / "recipes.json"
+        first = append_journal(filepath, {"a": 1})
+        second = append_journal(filepath, {"b": 2})
+
+        assert 0 < first < second
+        assert journal_path(filepath).stat().st_size == second
+
+    def test_append_leaves_snapshot_untouched(self, tmp_path):
+        """Appending never rewrites the snapshot file."""
+        filepath = tmp_path / "recipes.json"
+        save_json(filepath, {"a": 1})
+        before = filepath.read_bytes()
+
+        append_journal(filepath, {"b": 2})
+
+        assert filepath.read_bytes() == before
+
+    def test_save_compacts_journal(self, tmp_path):
+        """save_json writes the full snapshot and removes the journal."""
+        filepath = tmp_path / "recipes.json"
+        save_json(filepath, {"a": 1})
+        append_journal(filepath, {"b": 2})
+        data, _ = load_json(filepath)
+
+        save_json(filepath, data)
+
+        assert not journal_path(filepath).exists()
+        assert json.loads(filepath.read_text()) == {"a": 1, "b": 2}
+
+    def test_torn_last_record_is_skipped(self, tmp_path):
+        """A partial line from a crash mid-append doesn't lose earlier records."""
+        filepath = tmp_path / "recipes.json"
+        save_json(filepath, {})
+        append_journal(filepath, {"a": 1})
+        with journal_path(filepath).open("a") as f:
+            f.write('{"op": "set", "key": "b", "val')
+
+        data, _ = load_json(filepath)
+
+        assert data == {"a": 1}
+
+    def test_journal_without_snapshot(self, tmp_path):
+        """A journal whose snapshot was never written still loads."""
+        filepath = tmp_path / "recipes.json"
+        append_journal(filepath, {"a": 1})
+
+        data, created = load_json(filepath)
+
+        assert data == {"a": 1}
+        assert created is False
+        assert json.loads(filepath.read_text()) == {"a": 1}
+
+    def test_journal_write_counts_for_file_age(self, tmp_path):
+        """is_file_old treats a recent journal append as a write."""
+        filepath = tmp_path / "recipes.json"
+        save_json(filepath, {})
+        old_time = time.time() - (24 * 3600)
+        os.utime(filepath, (old_time, old_time))
+
+        append_journal(filepath, {"a": 1})
+
+        assert is_file_old(filepath, threshold_hours=12) is False
+
+
+class TestCrashSafeWrites:
+    """Test atomic snapshots, backups and recovery."""
+
+    def test_save_keeps_previous_snapshot_as_backup(self, tmp_path):
+        """Each save moves the previous snapshot to the .bak file."""
+        filepath = tmp_path / "recipes.json"
+        save_json(filepath, {"v": 1})
+        save_json(filepath, {"v": 2})
+
+        assert json.loads(filepath.read_text()) == {"v": 2}
+        assert json.loads(backup_path(filepath).read_text()) == {"v": 1}
+        assert sorted(p.name for p in tmp_path.iterdir()) == [
+            "recipes.json",
+            "recipes.json.bak",
+        ]
+
+    def test_failed_save_leaves_file_untouched(self, tmp_path):
+        """A write error never truncates the existing snapshot."""
+        filepath = tmp_path / "recipes.json"
+        save_json(filepath, {"v": 1})
+
+        with pytest.raises(FileOperationError):
+            save_json(filepath, {"v": object()})
+
+        assert json.loads(filepath.read_text()) == {"v": 1}
+        assert not (tmp_path / "recipes.json.tmp").exists()
+
+    def test_group_save_is_all_or_nothing(self, tmp_path):
+        """If one file of a group can't be written, none are replaced."""
+        first, second = tmp_path / "a.json", tmp_path / "b.json"
+        save_json_many({first: {"v": 1}, second: {"v": 1}})
+
+        with pytest.raises(FileOperationError):
+            save_json_many({first: {"v": 2}, second: {"v": object()}})
+
+        assert json.loads(first.read_text()) == {"v": 1}
+        assert json.loads(second.read_text()) == {"v": 1}
+        assert not list(tmp_path.glob("*.tmp"))
+
+    def test_group_save_writes_every_file(self, tmp_path):
+        """A successful group save updates every file."""
+        first, second = tmp_path / "a.json", tmp_path / "b.json"
+        save_json_many({first: {"a": 1}, str(second): {"b": 2}})
+
+        assert load_json(first) == ({"a": 1}, False)
+        assert load_json(second) == ({"b": 2}, False)
+
+    def test_corrupt_file_recovers_from_backup(self, tmp_path):
+        """A torn snapshot is replaced by the backup instead of reset to {}."""
+        filepath = tmp_path / "recipes.json"
+        save_json(filepath, {"v": 1})
+        save_json(filepath, {"v": 2})
+        filepath.write_text('{"v": ')
+
+        data, created = load_json(filepath)
+
+        assert (data, created) == ({"v": 1}, False)
+        assert json.loads(filepath.read_text()) == {"v": 1}
+        assert json.loads(backup_path(filepath).read_text()) == {"v": 1}
+
+    def test_missing_file_recovers_backup_plus_journal(self, tmp_path):
+        """A crash between renames loses nothing: backup + journal are replayed."""
+        filepath = tmp_path / "recipes.json"
+        save_json(filepath, {"a": 1})
+        save_json(filepath, {"a": 1})
+        append_journal(filepath, {"b": 2})
+        filepath.unlink()
+
+        data, created = load_json(filepath)
+
+        assert (data, created) == ({"a": 1, "b": 2}, False)
+
+    def test_save_drops_journal_so_deletes_stick(self, tmp_path):
+        """A key journaled then deleted doesn't come back after a save."""
+        filepath = tmp_path / "recipes.json"
+        append_journal(filepath, {"used": 1})
+        data, _ = load_json(filepath)
+        del data["used"]
+
+        save_json(filepath, data)
+
+        assert load_json(filepath) == ({}, False)
+
+    def test_failed_rename_keeps_journal(self, tmp_path, monkeypatch):
+        """If the new snapshot can't be moved in, the journal is kept with it."""
+        filepath = tmp_path / "recipes.json"
+        save_json(filepath, {"a": 1})
+        append_journal(filepath, {"b": 2})
+
+        def fail(*args):
+            raise OSError("disk gone")
+
+        monkeypatch.setattr(file_utils.os, "replace", fail)
+        with pytest.raises(FileOperationError):
+            save_json(filepath, {"a": 1, "b": 2, "c": 3})
+        monkeypatch.undo()
+
+        assert load_json(filepath) == ({"a": 1, "b": 2}, False)
+
+    def test_target_never_missing_during_swap(self, tmp_path, monkeypatch):
+        """The old snapshot stays in place until the new one replaces it."""
+        filepath = tmp_path / "recipes.json"
+        save_json(filepath, {"v": 1})
+        real_replace = os.replace
+        seen = []
+
+        def replace(src, dst):
+            seen.append(json.loads(Path(dst).read_text()))
+            real_replace(src, dst)
+
+        monkeypatch.setattr(file_utils.os, "replace", replace)
+        save_json(filepath, {"v": 2})
+
+        assert seen == [{"v": 1}]
+        assert json.loads(backup_path(filepath).read_text()) == {"v": 1}
+
+
+class TestJsonCodecs:
+    """Test the pluggable codecs and compact files."""
+
+    DATA = {"u": {"title": "Crème brûlée", "ingredients": ["1 egg"], "n": 1.5}}
+
+    @pytest.fixture
+    def orjson_codec(self):
+        """The orjson codec; skips the test if orjson isn't installed."""
+        pytest.importorskip("orjson")
+        return OrjsonCodec()
+
+    @pytest.mark.parametrize("name", ["stdlib", "orjson"])
+    def test_roundtrip(self, name, request):
+        """Both codecs roundtrip indented and compact, non-ASCII included."""
+        codec = (
+            StdlibCodec()
+            if name == "stdlib"
+            else request.getfixturevalue("orjson_codec")
+        )
+        for compact in (False, True):
+            raw = codec.dumps(self.DATA, compact=compact)
+            assert codec.loads(raw) == self.DATA
+            assert "Crème".encode() in raw
+            assert (b"\n" in raw) is not compact
+
+    @pytest.mark.parametrize("name", ["stdlib", "orjson"])
+    def test_dump_streams_same_bytes_as_dumps(self, name, request, monkeypatch):
+        """dump() writes exactly what dumps() returns, across several batches."""
+        codec = (
+            StdlibCodec()
+            if name == "stdlib"
+            else request.getfixturevalue("orjson_codec")
+        )
+        monkeypatch.setattr(file_utils, "_DUMP_BATCH_CHARS", 16)
+        data = {f"u{i}": self.DATA["u"] for i in range(20)}
+        for compact in (False, True):
+            out = io.BytesIO()
+            codec.dump(data, out, compact=compact)
+            assert out.getvalue() == codec.dumps(data, compact=compact)
+
+    def test_codecs_read_each_other(self, orjson_codec):
+        """Files written by one codec load with the other."""
+        for writer, reader in [
+            (StdlibCodec(), orjson_codec),
+            (orjson_codec, StdlibCodec()),
+        ]:
+            assert reader.loads(writer.dumps(self.DATA)) == self.DATA
+
+    def test_falls_back_to_stdlib_without_orjson(self, monkeypatch):
+        """Without orjson installed, every codec name resolves to stdlib."""
+        monkeypatch.setitem(sys.modules, "orjson", None)
+        get_codec.cache_clear()
+        try:
+            assert get_codec("auto").name == "stdlib"
+            assert get_codec("orjson").name == "stdlib"
+        finally:
+            get_codec.cache_clear()
+
+    def test_compact_files_chosen_by_name(self, tmp_path, monkeypatch):
+        """Files named in COMPACT_JSON_FILES are written without indentation."""
+        monkeypatch.setattr(file_utils, "COMPACT_JSON_FILES", ("machine.json",))
+        save_json_many(
+            {tmp_path / "machine.json": self.DATA, tmp_path / "human.json": self.DATA}
+        )
+
+        assert b"\n" not in (tmp_path / "machine.json").read_bytes()
+        assert b"\n" in (tmp_path / "human.json").read_bytes()
+        assert load_json(tmp_path / "machine.json")[0] == self.DATA
+
+    def test_corrupt_file_detected_by_any_codec(self, tmp_path):
+        """A torn file still triggers backup recovery whichever codec loads it."""
+        filepath = tmp_path / "data.json"
+        save_json(filepath, self.DATA)
+        save_json(filepath, {})
+        filepath.write_bytes(b'{"u": {"title"')
+
+        assert load_json(filepath) == (self.DATA, False)
+
+
 class TestIsFileOld:
     """Test is_file_old function with various conditions."""
 
@@ -241,3 +527,62 @@ class TestEdgeCases:
 
         assert len(loaded) == 1000
         assert loaded == large_data
+
+
+class TestCompressedFiles:
+    """Test snapshots compressed by file extension."""
+
+    DATA = {f"https://a.com/{i}": {"title": "Stew", "n": i} for i in range(50)}
+
+    @pytest.fixture(params=[".gz", ".zst"])
+    def suffix(self, request):
+        """Each compressed suffix; .zst skips if zstandard isn't installed."""
+        if request.param == ".zst":
+            pytest.importorskip("zstandard")
+        return request.param
+
+    def test_roundtrip_is_compressed(self, tmp_path, suffix):
+        """Compressed files load back equal and are smaller than plain JSON."""
+        plain = tmp_path / "recipes.json"
+        compressed = tmp_path / f"recipes.json{suffix}"
+        save_json(plain, self.DATA)
+        save_json(compressed, self.DATA)
+
+        assert load_json(compressed) == (self.DATA, False)
+        assert compressed.stat().st_size < plain.stat().st_size / 4
+        assert not compressed.read_bytes().startswith(b"{")
+
+    def test_journal_replayed_over_compressed_file(self, tmp_path, suffix):
+        """Journals stay plain and replay over a compressed snapshot."""
+        filepath = tmp_path / f"recipes.json{suffix}"
+        save_json(filepath, self.DATA)
+        append_journal(filepath, {"new": {"n": -1}}, removals=["https://a.com/0"])
+
+        data, _ = load_json(filepath)
+
+        assert data["new"] == {"n": -1}
+        assert "https://a.com/0" not in data
+
+    def test_converts_existing_plain_file(self, tmp_path, suffix):
+        """A plain file (plus journal) is converted and kept as a backup."""
+        plain = tmp_path / "recipes.json"
+        save_json(plain, self.DATA)
+        append_journal(plain, {"new": {"n": -1}})
+
+        data, created = load_json(tmp_path / f"recipes.json{suffix}")
+
+        assert created is False
+        assert data == {**self.DATA, "new": {"n": -1}}
+        assert not plain.exists()
+        assert not journal_path(plain).exists()
+        assert json.loads(backup_path(plain).read_text()) == self.DATA
+        assert load_json(tmp_path / f"recipes.json{suffix}") == (data, False)
+
+    def test_truncated_file_recovers_from_backup(self, tmp_path, suffix):
+        """A torn compressed file is treated as corrupt and restored."""
+        filepath = tmp_path / f"recipes.json{suffix}"
+        save_json(filepath, self.DATA)
+        save_json(filepath, {"x": {}})
+        filepath.write_bytes(filepath.read_bytes()[:10])
+
+        assert load_json(filepath) == (self.DATA, False)
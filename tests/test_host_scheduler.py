@@ -0,0 +1,127 @@
+"""Tests for per-host politeness scheduling (token buckets + connection caps)."""
+
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from host_scheduler import (
+    HostLimit,
+    HostScheduler,
+    TokenBucket,
+    host_of,
+    interleave_by_host,
+    limits_from_websites,
+)
+
+_DEFAULT = HostLimit(requests_per_second=2.0, max_connections=2, burst=2)
+
+
+class TestHostOf:
+    """Tests for host normalization."""
+
+    def test_strips_www_and_lowercases(self) -> None:
+        """www. and case differences map to the same host."""
+        assert host_of("https://WWW.Example.com/a") == "example.com"
+        assert host_of("https://example.com/b") == "example.com"
+
+
+class TestTokenBucket:
+    """Tests for the token bucket rate limiter."""
+
+    def test_burst_is_free_then_rate_limited(self) -> None:
+        """The first `capacity` tokens don't wait; the next waits ~1/rate."""
+        bucket = TokenBucket(rate=20.0, capacity=2)
+
+        assert bucket.acquire() == 0.0
+        assert bucket.acquire() == 0.0
+        waited = bucket.acquire()
+
+        assert 0.03 < waited <= 0.05
+
+
+class TestHostScheduler:
+    """Tests for HostScheduler slots."""
+
+    def test_connection_cap_per_host(self) -> None:
+        """No more than max_connections slots are held for one host at once."""
+        scheduler = HostScheduler(HostLimit(1e9, max_connections=1))
+        lock = threading.Lock()
+        active = 0
+        peak = 0
+
+        def _fetch() -> None:
+            nonlocal active, peak
+            with scheduler.slot("https://a.com/x"):
+                with lock:
+                    active += 1
+                    peak = max(peak, active)
+                time.sleep(0.01)
+                with lock:
+                    active -= 1
+
+        threads = [threading.Thread(target=_fetch) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert peak == 1
+
+    def test_hosts_do_not_share_budgets(self) -> None:
+        """Exhausting one host's tokens doesn't delay another host."""
+        scheduler = HostScheduler(HostLimit(0.5, max_connections=4, burst=1))
+        with scheduler.slot("https://a.com/1"):
+            pass
+
+        start = time.monotonic()
+        with scheduler.slot("https://b.com/1"):
+            pass
+
+        assert time.monotonic() - start < 0.1
+
+
+class TestLimitsFromWebsites:
+    """Tests for reading per-site overrides out of WEBSITES entries."""
+
+    def test_override_applies_to_listing_hosts(self) -> None:
+        """Overrides map to each listing URL's host; unset fields use defaults."""
+        websites = {
+            "Slow": {
+                "main course": "https://www.slow.com/m",
+                "side dish": "https://sides.slow.com/s",
+                "requests_per_second": 0.5,
+            },
+            "Normal": {"main course": "https://fast.com/m", "side dish": "x"},
+        }
+
+        overrides = limits_from_websites(websites, _DEFAULT)
+
+        assert set(overrides) == {"slow.com", "sides.slow.com"}
+        assert overrides["slow.com"] == HostLimit(0.5, 2, 2)
+        assert HostScheduler(_DEFAULT, overrides).limit_for("fast.com") == _DEFAULT
+
+
+class TestInterleaveByHost:
+    """Tests for round-robin URL ordering."""
+
+    def test_round_robin_keeps_per_host_order(self) -> None:
+        """Hosts alternate; each host's URLs stay in their original order."""
+        urls = [
+            "https://a.com/1",
+            "https://a.com/2",
+            "https://a.com/3",
+            "https://b.com/1",
+            "https://www.c.com/1",
+            "https://c.com/2",
+        ]
+
+        assert interleave_by_host(urls) == [
+            "https://a.com/1",
+            "https://b.com/1",
+            "https://www.c.com/1",
+            "https://a.com/2",
+            "https://c.com/2",
+            "https://a.com/3",
+        ]
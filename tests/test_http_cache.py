@@ -0,0 +1,83 @@
+"""Tests for the on-disk conditional-GET HTTP cache."""
+
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from http_cache import HttpCache
+
+
+def _cache(tmp_path: Path, max_bytes: int = 1_000_000, ttl: int = 3600) -> HttpCache:
+    """Build a cache rooted in the test's tmp dir."""
+    return HttpCache(tmp_path / "cache", max_bytes=max_bytes, ttl_seconds=ttl)
+
+
+class TestStoreAndLookup:
+    """Tests for store + lookup round trips."""
+
+    def test_roundtrip_keeps_body_and_validators(self, tmp_path: Path) -> None:
+        """A stored response comes back with its body and conditional headers."""
+        cache = _cache(tmp_path)
+        cache.store(
+            "https://a.com/x",
+            "<html>é</html>",
+            {"ETag": '"abc"', "Last-Modified": "Wed, 01 Jan 2026 00:00:00 GMT"},
+        )
+
+        entry = cache.lookup("https://a.com/x")
+
+        assert entry is not None
+        assert entry.body == "<html>é</html>"
+        assert entry.validators() == {
+            "If-None-Match": '"abc"',
+            "If-Modified-Since": "Wed, 01 Jan 2026 00:00:00 GMT",
+        }
+
+    def test_response_without_validators_is_not_stored(self, tmp_path: Path) -> None:
+        """Nothing could ever revalidate it, so it isn't cached (no dir created)."""
+        cache = _cache(tmp_path)
+        cache.store("https://a.com/x", "body", {"content-type": "text/html"})
+
+        assert cache.lookup("https://a.com/x") is None
+        assert not (tmp_path / "cache").exists()
+
+    def test_expired_entry_is_dropped(self, tmp_path: Path) -> None:
+        """Entries past the TTL are treated as misses and deleted."""
+        cache = _cache(tmp_path, ttl=0)
+        cache.store("https://a.com/x", "body", {"ETag": "e"})
+        time.sleep(0.01)
+
+        assert cache.lookup("https://a.com/x") is None
+        assert list((tmp_path / "cache").glob("*.json")) == []
+
+    def test_corrupt_entry_is_a_miss(self, tmp_path: Path) -> None:
+        """An unreadable entry file is discarded rather than raising."""
+        cache = _cache(tmp_path)
+        cache.store("https://a.com/x", "body", {"ETag": "e"})
+        (entry_file,) = (tmp_path / "cache").glob("*.json")
+        entry_file.write_text("{not json")
+
+        assert cache.lookup("https://a.com/x") is None
+
+
+class TestEviction:
+    """Tests for size-bounded LRU eviction."""
+
+    def test_least_recently_used_entry_is_evicted(self, tmp_path: Path) -> None:
+        """Past max_bytes, the entry used longest ago goes first."""
+        cache = _cache(tmp_path, max_bytes=700)
+        cache.store("https://a.com/old", "x" * 200, {"ETag": "1"})
+        cache.store("https://a.com/hot", "x" * 200, {"ETag": "2"})
+        # Age both, then touch "hot" so "old" is the LRU entry.
+        for url in ("https://a.com/old", "https://a.com/hot"):
+            path = cache._path(url)
+            os.utime(path, (time.time() - 100, time.time() - 100))
+        cache.touch("https://a.com/hot")
+
+        cache.store("https://a.com/new", "x" * 200, {"ETag": "3"})
+
+        assert cache.lookup("https://a.com/old") is None
+        assert cache.lookup("https://a.com/hot") is not None
+        assert cache.lookup("https://a.com/new") is not None
@@ -0,0 +1,72 @@
+"""Tests for the shared multi-keyword matcher."""
+
+import random
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from keyword_matcher import KeywordMatcher, any_keyword_matcher
+
+
+class TestKeywordMatcher:
+    """Test group detection against plain substring checks."""
+
+    def test_reports_every_group_present(self):
+        """All groups with a keyword in the text are returned."""
+        matcher = KeywordMatcher({"fish": ("salmon", "cod"), "meat": ("beef",)})
+
+        assert matcher.groups_in("salmon and beef") == {"fish", "meat"}
+        assert matcher.groups_in("codfish") == {"fish"}
+        assert matcher.groups_in("tofu") == set()
+
+    def test_prefix_keywords_in_other_groups(self):
+        """A keyword that prefixes a longer match still reports its group."""
+        matcher = KeywordMatcher({"short": ("bake",), "long": ("baked",)})
+
+        assert matcher.groups_in("baked") == {"short", "long"}
+        assert matcher.groups_in("bakes") == {"short"}
+
+    def test_overlapping_keywords(self):
+        """Keywords overlapping an earlier match are found too."""
+        matcher = KeywordMatcher({"a": ("eggplant",), "b": ("plant",)})
+
+        assert matcher.groups_in("eggplant") == {"a", "b"}
+
+    def test_first_group_follows_priority(self):
+        """first_group returns the highest-priority group present."""
+        matcher = KeywordMatcher({"oven": ("bake",), "grill": ("grill",)})
+
+        assert matcher.first_group("grill, then bake", ("oven", "grill")) == "oven"
+        assert matcher.first_group("grill it", ("oven", "grill")) == "grill"
+        assert matcher.first_group("stir", ("oven", "grill")) is None
+
+    def test_special_characters_are_literal(self):
+        """Regex metacharacters and non-ASCII in keywords match literally."""
+        matcher = any_keyword_matcher(("350°f", "no-cook", "a.b"))
+
+        assert matcher.search("heat to 350°f")
+        assert matcher.search("a no-cook salad")
+        assert not matcher.search("axb")
+
+    def test_empty_keyword_sets(self):
+        """No keywords (or only empty ones) never match."""
+        assert KeywordMatcher({}).groups_in("anything") == set()
+        assert not any_keyword_matcher(("",)).search("anything")
+
+    def test_agrees_with_substring_checks(self):
+        """Randomized keyword sets give the same answer as `kw in text`."""
+        rng = random.Random(7)
+        for _ in range(200):
+            groups = {
+                name: tuple(
+                    "".join(rng.choices("abc", k=rng.randint(1, 4))) for _ in range(3)
+                )
+                for name in ("x", "y", "z")
+            }
+            text = "".join(rng.choices("abc ", k=20))
+            expected = {
+                name for name, kws in groups.items() if any(k in text for k in kws)
+            }
+
+            assert KeywordMatcher(groups).groups_in(text) == expected
@@ -1,21 +1,42 @@
 """Tests for main._tag_new_recipes inline weekly tagging."""
 
+import json
 import sys
 from pathlib import Path
 from unittest.mock import patch
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 import main
+from config import (
+    TAGGING_QUEUE_FILENAME,
+    UNUSED_MAINS_FILENAME,
+    UNUSED_SIDES_FILENAME,
+)
+from file_utils import append_journal, journal_path, load_json, save_json
+from recipe_corpus import corpus_path, load_corpus, save_corpus
+from recipe_selector import FEATURE_HASH
 
+# The queue snapshot a completed tag pass leaves behind.
+DRAINED = {main._QUEUE_STAMP_KEY: FEATURE_HASH}
 
+
+def _tag_all(batch):
+    """Stand-in for ensure_recipes_tagged: tag every recipe in the batch."""
+    for recipe in batch:
+        recipe["seasonality"] = "summer"
+    return [True] * len(batch)
+
+
+@patch("main.save_json")
+@patch("main.append_journal", return_value=0)
 class TestTagNewRecipes:
     """Tests for tag new recipes."""
 
-    @patch("main.save_json")
-    @patch("main.ensure_recipe_tagged")
-    def test_tags_untagged_and_saves(self, mock_tag, mock_save):
-        """Tags untagged and saves."""
-        mock_tag.return_value = True  # pretend each recipe got tagged
+    @patch("main._load_tagging_queue", return_value=({}, True))
+    @patch("main.ensure_recipes_tagged")
+    def test_tags_untagged_and_saves(self, mock_tag, _queue, mock_journal, mock_save):
+        """A full scan tags both files and journals just the changed recipes."""
+        mock_tag.side_effect = _tag_all
         context = {
             "unused_mains": {"u1": {"title": "A"}},
             "unused_sides": {"u2": {"title": "B"}},
@@ -23,19 +44,20 @@ class TestTagNewRecipes:
 
         main._tag_new_recipes(context)
 
-        assert mock_tag.call_count == 2
-        assert mock_save.call_count == 2  # mains + sides saved
-
-    @patch("main.save_json")
-    @patch("main.ensure_recipe_tagged")
-    def test_tags_all_untagged_no_cap(self, mock_tag, mock_save):
+        assert mock_tag.call_count == 2  # one batch per file
+        mock_journal.assert_any_call(
+            UNUSED_MAINS_FILENAME, {"u1": {"title": "A", "seasonality": "summer"}}
+        )
+        mock_journal.assert_any_call(
+            UNUSED_SIDES_FILENAME, {"u2": {"title": "B", "seasonality": "summer"}}
+        )
+        mock_save.assert_called_once_with(TAGGING_QUEUE_FILENAME, DRAINED)
+
+    @patch("main._load_tagging_queue", return_value=({}, True))
+    @patch("main.ensure_recipes_tagged")
+    def test_tags_all_untagged_no_cap(self, mock_tag, _queue, mock_journal, mock_save):
         """Tags every untagged recipe in one run (no per-run cap)."""
-
-        def fake_tag(recipe):
-            recipe["seasonality"] = "summer"
-            return True
-
-        mock_tag.side_effect = fake_tag
+        mock_tag.side_effect = _tag_all
         # 60 mains: with no cap, all 60 get tagged in a single run.
         context = {
             "unused_mains": {f"u{i}": {"title": str(i)} for i in range(60)},
@@ -44,26 +66,145 @@ class TestTagNewRecipes:
 
         main._tag_new_recipes(context)
 
-        assert mock_tag.call_count == 60
+        assert len(mock_tag.call_args_list[0].args[0]) == 60
         assert all("seasonality" in r for r in context["unused_mains"].values())
 
-    @patch("main.save_json")
-    @patch("main.ensure_recipe_tagged")
-    def test_never_raises_on_failure(self, mock_tag, mock_save):
+    @patch("main._load_tagging_queue", return_value=({}, True))
+    @patch("main.ensure_recipes_tagged")
+    def test_never_raises_on_failure(self, mock_tag, _queue, mock_journal, mock_save):
         """Never raises on failure."""
         mock_tag.side_effect = RuntimeError("ollama exploded")
         context = {"unused_mains": {"u1": {"title": "A"}}, "unused_sides": {}}
 
         # Must swallow, not propagate
         main._tag_new_recipes(context)
-
-    @patch("main.save_json")
-    @patch("main.ensure_recipe_tagged")
-    def test_no_save_when_nothing_changed(self, mock_tag, mock_save):
-        """No save when nothing changed."""
-        mock_tag.return_value = False  # already tagged
+        mock_save.assert_not_called()  # a failed pass leaves the queue as-is
+
+    @patch("main._load_tagging_queue", return_value=({}, True))
+    @patch("main.ensure_recipes_tagged")
+    def test_no_save_when_nothing_changed(
+        self, mock_tag, _queue, mock_journal, mock_save
+    ):
+        """No recipe is written when nothing changed."""
+        mock_tag.return_value = [False]  # already tagged
         context = {"unused_mains": {"u1": {"title": "A"}}, "unused_sides": {}}
 
         main._tag_new_recipes(context)
 
-        mock_save.assert_not_called()
+        mock_journal.assert_not_called()
+
+    @patch("main.ensure_recipes_tagged")
+    def test_drains_only_queued_recipes(self, mock_tag, mock_journal, mock_save):
+        """With a queue, only queued recipes still unused are tagged."""
+        mock_tag.side_effect = _tag_all
+        queue = {
+            "u2": UNUSED_MAINS_FILENAME,
+            "s1": UNUSED_SIDES_FILENAME,
+            "sent": UNUSED_MAINS_FILENAME,
+        }
+        context = {
+            "unused_mains": {"u1": {"title": "A"}, "u2": {"title": "B"}},
+            "unused_sides": {"s1": {"title": "C"}},
+        }
+
+        with patch("main._load_tagging_queue", return_value=(queue, False)):
+            main._tag_new_recipes(context)
+
+        batches = [call.args[0] for call in mock_tag.call_args_list]
+        assert batches == [
+            [context["unused_mains"]["u2"]],
+            [context["unused_sides"]["s1"]],
+        ]
+        assert "seasonality" not in context["unused_mains"]["u1"]
+        mock_save.assert_called_once_with(TAGGING_QUEUE_FILENAME, DRAINED)
+
+    @patch("main.TAGGING_BATCH_SIZE", 2)
+    @patch("main.ensure_recipes_tagged")
+    def test_drains_in_batches(self, mock_tag, mock_journal, mock_save):
+        """The queue is tagged and journaled TAGGING_BATCH_SIZE recipes at a time."""
+        mock_tag.side_effect = _tag_all
+        mains = {f"u{i}": {"title": str(i)} for i in range(5)}
+        queue = dict.fromkeys(mains, UNUSED_MAINS_FILENAME)
+        context = {"unused_mains": mains, "unused_sides": {}}
+
+        with patch("main._load_tagging_queue", return_value=(queue, False)):
+            main._tag_new_recipes(context)
+
+        assert [len(call.args[0]) for call in mock_tag.call_args_list] == [2, 2, 1]
+        assert mock_journal.call_count == 3
+
+
+class TestLoadTaggingQueue:
+    """Tests for loading the scraper-filled tagging queue."""
+
+    def test_missing_snapshot_needs_full_scan(self, tmp_path):
+        """Without a queue snapshot, journaled URLs alone aren't trusted."""
+        path = tmp_path / "tagging_queue.json"
+        append_journal(path, {"u1": UNUSED_MAINS_FILENAME})
+
+        with patch("main.TAGGING_QUEUE_FILENAME", str(path)):
+            assert main._load_tagging_queue({}) == ({}, True)
+
+        assert not path.exists()  # only a completed pass writes the snapshot
+
+    def test_snapshot_plus_journal(self, tmp_path):
+        """Once drained, the queue is the snapshot plus what scraping appended."""
+        path = tmp_path / "tagging_queue.json"
+        save_json(path, DRAINED)
+        append_journal(path, {"u1": UNUSED_MAINS_FILENAME})
+
+        with patch("main.TAGGING_QUEUE_FILENAME", str(path)):
+            assert main._load_tagging_queue({}) == (
+                {"u1": UNUSED_MAINS_FILENAME},
+                False,
+            )
+
+    def test_stale_feature_hash_needs_full_scan(self, tmp_path):
+        """A pass stamped with other keyword lists leaves stale features behind."""
+        path = tmp_path / "tagging_queue.json"
+        save_json(path, {main._QUEUE_STAMP_KEY: "old"})
+        append_journal(path, {"u1": UNUSED_MAINS_FILENAME})
+
+        with patch("main.TAGGING_QUEUE_FILENAME", str(path)):
+            queue, full_scan = main._load_tagging_queue({})
+
+        assert full_scan is True
+        assert queue == {"u1": UNUSED_MAINS_FILENAME}
+
+    def test_database_store_needs_no_queue(self):
+        """The SQLite store finds untagged recipes through its tag table."""
+        assert main._load_tagging_queue({"recipe_db": object()}) == ({}, True)
+
+
+class TestTaggingOnCorpus:
+    """End-to-end tagging against the corpus store."""
+
+    def test_full_scan_then_drain(self, tmp_path, monkeypatch):
+        """LazyRecipes are journaled, and the queue is trusted only afterwards."""
+        monkeypatch.chdir(tmp_path)
+        for filename, url in (
+            (UNUSED_MAINS_FILENAME, "m1"),
+            (UNUSED_SIDES_FILENAME, "s1"),
+        ):
+            save_corpus(corpus_path(filename), {url: {"title": url}})
+        context = {
+            "unused_mains": load_corpus(corpus_path(UNUSED_MAINS_FILENAME))[0],
+            "unused_sides": load_corpus(corpus_path(UNUSED_SIDES_FILENAME))[0],
+        }
+
+        with (
+            patch("main.RECIPE_STORE", "corpus"),
+            patch("main.ensure_recipes_tagged", side_effect=_tag_all) as mock_tag,
+        ):
+            main._tag_new_recipes(context)
+            assert mock_tag.call_count == 2
+            assert journal_path(corpus_path(UNUSED_SIDES_FILENAME)).exists()
+            assert load_json(TAGGING_QUEUE_FILENAME) == (DRAINED, False)
+
+            mock_tag.reset_mock()
+            main._tag_new_recipes(context)
+            mock_tag.assert_not_called()
+
+        reloaded, _ = load_corpus(corpus_path(UNUSED_MAINS_FILENAME))
+        assert reloaded["m1"]["seasonality"] == "summer"
+        assert json.loads(Path(TAGGING_QUEUE_FILENAME).read_text()) == DRAINED
@@ -0,0 +1,212 @@
+"""Tests for the lazily decoded recipe corpus."""
+
+import json
+import sys
+from datetime import date
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from file_utils import (
+    FileOperationError,
+    append_journal,
+    journal_path,
+    json_writer,
+    load_json,
+    save_json,
+    save_snapshots,
+)
+from recipe_corpus import (
+    LazyRecipe,
+    corpus_path,
+    corpus_writer,
+    load_corpus,
+    save_corpus,
+)
+from recipe_selector import ensure_features, ensure_veggies, select_random_proteins
+
+
+def _recipe(title, *ingredients, **extra):
+    return {
+        "title": title,
+        "image": f"https://img/{title}.jpg",
+        "ingredients": list(ingredients),
+        "instructions": "Bake it.",
+        "ingredient_groups": [{"ingredients": list(ingredients), "purpose": None}],
+        **extra,
+    }
+
+
+RECIPES = {
+    "https://a.com/1": _recipe("Beef Stew", "2 lb beef", "1 carrot", oven_use=1.0),
+    "https://a.com/2": _recipe("Roast Chicken", "1 whole chicken"),
+    "https://a.com/3": _recipe("Pork Chops", "4 pork chops", "1 onion"),
+    "https://a.com/4": _recipe("Salmon", "2 salmon fillets", seasonality={"fall": 1}),
+}
+
+
+class TestCorpusRoundtrip:
+    """Test saving and loading a corpus."""
+
+    def test_roundtrip_equal(self, tmp_path):
+        """A loaded corpus compares equal to the dict that was saved."""
+        path = tmp_path / "mains.corpus"
+        save_corpus(path, RECIPES)
+
+        data, created = load_corpus(path)
+
+        assert created is False
+        assert list(data) == list(RECIPES)
+        assert {url: dict(recipe) for url, recipe in data.items()} == RECIPES
+
+    def test_selection_fields_do_not_decode_body(self, tmp_path):
+        """Reading selection fields, present or absent, leaves bodies undecoded."""
+        path = tmp_path / "mains.corpus"
+        save_corpus(path, RECIPES)
+        data, _ = load_corpus(path)
+        recipe = data["https://a.com/2"]
+
+        assert recipe["ingredients"] == ["1 whole chicken"]
+        assert recipe.get("seasonality") is None
+        assert "oven_use" not in recipe
+        assert recipe.body_loaded is False
+
+        assert recipe["title"] == "Roast Chicken"
+        assert recipe.body_loaded is True
+
+    def test_resave_copies_untouched_bodies(self, tmp_path):
+        """Rewriting a corpus keeps undecoded bodies as-is, and keeps edits."""
+        path = tmp_path / "mains.corpus"
+        save_corpus(path, RECIPES)
+        data, _ = load_corpus(path)
+        data["https://a.com/2"]["oven_use"] = 0.5
+        data["https://a.com/3"]["title"] = "Pan Pork Chops"
+        del data["https://a.com/4"]
+
+        save_corpus(path, data)
+        assert data["https://a.com/1"].body_loaded is False
+        reloaded, _ = load_corpus(path)
+
+        assert list(reloaded) == [
+            "https://a.com/1",
+            "https://a.com/2",
+            "https://a.com/3",
+        ]
+        assert reloaded["https://a.com/2"]["oven_use"] == 0.5
+        assert reloaded["https://a.com/3"]["title"] == "Pan Pork Chops"
+        assert dict(reloaded["https://a.com/1"]) == RECIPES["https://a.com/1"]
+
+    def test_journal_replayed_then_compacted(self, tmp_path):
+        """Journaled scrape flushes show up on load and vanish on save."""
+        path = tmp_path / "mains.corpus"
+        save_corpus(path, RECIPES)
+        new = _recipe("Tacos", "1 lb beef")
+        append_journal(path, {"https://b.com/1": new}, removals=["https://a.com/1"])
+
+        data, _ = load_corpus(path)
+        assert data["https://b.com/1"] == new
+        assert "https://a.com/1" not in data
+
+        save_corpus(path, data)
+        assert not journal_path(path).exists()
+        assert dict(load_corpus(path)[0]["https://b.com/1"]) == new
+
+    def test_group_save_with_json_is_all_or_nothing(self, tmp_path):
+        """A corpus saved in a group with JSON files is replaced only with them."""
+        path, used = tmp_path / "mains.corpus", tmp_path / "used.json"
+        save_snapshots({path: corpus_writer(RECIPES), used: json_writer(used, {})})
+        moved = {url: r for url, r in RECIPES.items() if url != "https://a.com/1"}
+
+        with pytest.raises(FileOperationError):
+            save_snapshots(
+                {
+                    path: corpus_writer(moved),
+                    used: json_writer(used, {"https://a.com/1": object()}),
+                }
+            )
+
+        assert list(load_corpus(path)[0]) == list(RECIPES)
+        assert load_json(used) == ({}, False)
+        assert not list(tmp_path.glob("*.tmp"))
+
+
+class TestLoadCorpusSetup:
+    """Test first-use conversion and error recovery."""
+
+    def test_migrates_from_json(self, tmp_path):
+        """A missing corpus is built from the JSON file, which is kept."""
+        json_file = tmp_path / "unused_mains_recipes.json"
+        save_json(json_file, RECIPES)
+
+        data, created = load_corpus(corpus_path(json_file), migrate_from=json_file)
+
+        assert created is False
+        assert corpus_path(json_file).exists()
+        assert isinstance(data["https://a.com/1"], LazyRecipe)
+        assert json.loads(json_file.read_text()) == RECIPES
+
+    def test_corpus_path_ignores_compression(self):
+        """Compressed and plain JSON files map to the same corpus."""
+        assert corpus_path("mains.json.zst") == corpus_path("mains.json")
+        assert corpus_path("mains.json.gz") == Path("mains.corpus")
+
+    def test_missing_everything_creates_empty(self, tmp_path):
+        """With no corpus and no JSON, an empty corpus is created."""
+        path = tmp_path / "mains.corpus"
+
+        data, created = load_corpus(path, migrate_from=tmp_path / "none.json")
+
+        assert (data, created) == ({}, True)
+        assert load_corpus(path) == ({}, False)
+
+    def test_corrupt_corpus_reinitializes(self, tmp_path):
+        """A file that isn't a corpus is reset, like load_json does."""
+        path = tmp_path / "mains.corpus"
+        path.write_bytes(b"garbage")
+
+        assert load_corpus(path) == ({}, True)
+
+    def test_corrupt_corpus_recovers_from_backup(self, tmp_path):
+        """A torn corpus is rebuilt from the previous one."""
+        path = tmp_path / "mains.corpus"
+        save_corpus(path, RECIPES)
+        save_corpus(path, {})
+        path.write_bytes(b"RCORPUS1\ntorn")
+
+        data, created = load_corpus(path)
+
+        assert created is False
+        assert list(data) == list(RECIPES)
+
+
+class TestSelectionOnCorpus:
+    """Selection runs on selection fields alone."""
+
+    def test_selection_decodes_no_bodies(self, tmp_path):
+        """Picking mains and sides never decodes a recipe body."""
+        path = tmp_path / "mains.corpus"
+        save_corpus(path, RECIPES)
+        data, _ = load_corpus(path)
+
+        picked = select_random_proteins(data, date(2026, 1, 15))
+        ensure_veggies(picked, data, ("carrot",), date(2026, 1, 15))
+
+        assert len(picked) == 3
+        assert not any(recipe.body_loaded for recipe in data.values())
+
+    def test_features_kept_in_index(self, tmp_path):
+        """Cached selection features are stored without touching bodies."""
+        path = tmp_path / "mains.corpus"
+        save_corpus(path, RECIPES)
+        data, _ = load_corpus(path)
+        for recipe in data.values():
+            ensure_features(recipe)
+        save_corpus(path, data)
+
+        reloaded, _ = load_corpus(path)
+        select_random_proteins(reloaded, date(2026, 1, 15))
+
+        assert reloaded["https://a.com/4"]["protein"] == "seafood"
+        assert not any(recipe.body_loaded for recipe in reloaded.values())
@@ -0,0 +1,305 @@
+"""Tests for the SQLite recipe store and its dict-like views."""
+
+import json
+import sys
+import time
+from pathlib import Path
+from unittest.mock import Mock, patch
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import main
+from file_utils import append_journal, save_json
+from recipe_db import RecipeDB, migrate_from_json, open_recipe_db
+from recipe_selector import FEATURE_HASH, ensure_features
+
+
+@pytest.fixture
+def db(tmp_path):
+    """A fresh database in a temp dir."""
+    database = RecipeDB(tmp_path / "recipes.db")
+    yield database
+    database.close()
+
+
+def _recipe(*ingredients, **extra):
+    return {"title": "t", "ingredients": list(ingredients), **extra}
+
+
+class TestRecipeDB:
+    """Test connection setup and meta bookkeeping."""
+
+    def test_uses_wal_mode(self, db):
+        """The database runs in write-ahead-log mode."""
+        mode = db.conn.execute("PRAGMA journal_mode").fetchone()[0]
+        assert mode == "wal"
+
+    def test_is_stale_until_scraped(self, db):
+        """A never-scraped pool is stale; a just-scraped one is not."""
+        assert db.is_stale(12) is True
+        db.mark_scraped()
+        assert db.is_stale(12) is False
+
+    def test_is_stale_after_threshold(self, db):
+        """A scrape older than the threshold is stale."""
+        db.mark_scraped(time.time() - 13 * 3600)
+        assert db.is_stale(12) is True
+
+    def test_transaction_rolls_back_on_error(self, db):
+        """An exception inside transaction() discards its writes."""
+        with pytest.raises(RuntimeError), db.transaction():
+            db.used["u1"] = "2026-01-01"
+            raise RuntimeError("boom")
+        assert "u1" not in db.used
+
+
+class TestRecipeTable:
+    """Test the {url: recipe} MutableMapping view."""
+
+    def test_roundtrip(self, db):
+        """A stored recipe reads back equal, tags included."""
+        recipe = _recipe(
+            "1 lb chicken", oven_use=1.0, seasonality={"winter": 0.9, "summer": 0.1}
+        )
+        db.mains["https://a.com/r"] = recipe
+
+        assert db.mains["https://a.com/r"] == recipe
+        assert len(db.mains) == 1
+        assert "https://a.com/r" in db.mains
+        assert "https://a.com/r" not in db.sides
+
+    def test_behaves_like_dict(self, db):
+        """Iteration order, items(), values() and deletion match a dict."""
+        expected = {f"https://a.com/{i}": _recipe(f"ing {i}") for i in range(3)}
+        for url, recipe in expected.items():
+            db.sides[url] = recipe
+
+        assert list(db.sides) == list(expected)
+        assert dict(db.sides.items()) == expected
+        assert list(db.sides.values()) == list(expected.values())
+
+        del db.sides["https://a.com/1"]
+        assert "https://a.com/1" not in db.sides
+        with pytest.raises(KeyError):
+            del db.sides["https://a.com/1"]
+        with pytest.raises(KeyError):
+            db.sides["missing"]
+
+    def test_overwrite_replaces_tags(self, db):
+        """Writing a recipe back updates its tags row."""
+        db.mains["u"] = _recipe("beef")
+        recipe = db.mains["u"]
+        recipe["oven_use"] = 0.5
+        db.mains["u"] = recipe
+
+        assert db.mains["u"]["oven_use"] == 0.5
+
+    def test_untagged(self, db):
+        """untagged() returns recipes missing either tag or current features."""
+        tagged = _recipe("beef", oven_use=1.0, seasonality={"fall": 1})
+        ensure_features(tagged)
+        db.mains["tagged"] = tagged
+        db.mains["half"] = _recipe("pork", oven_use=0.0)
+        db.mains["bare"] = _recipe("lamb")
+        db.mains["stale"] = {**tagged, "feature_hash": "old"}
+
+        assert [url for url, _ in db.mains.untagged()] == ["half", "bare", "stale"]
+
+    def test_by_protein(self, db):
+        """by_protein() filters on the category computed at write time."""
+        db.mains["fish"] = _recipe("2 salmon fillets")
+        db.mains["meat"] = _recipe("1 lb chicken thighs")
+        db.mains["veg"] = _recipe("1 onion")
+
+        assert [url for url, _ in db.mains.by_protein("seafood")] == ["fish"]
+        assert [url for url, _ in db.mains.by_protein("landfood")] == ["meat"]
+        assert [url for url, _ in db.mains.by_protein(None)] == ["veg"]
+
+    def test_by_protein_uses_cached_feature(self, db):
+        """A current cached protein feature is stored as the category as-is."""
+        db.mains["u"] = _recipe("1 onion", protein="seafood", feature_hash=FEATURE_HASH)
+
+        assert [url for url, _ in db.mains.by_protein("seafood")] == ["u"]
+
+    def test_by_host(self, db):
+        """by_host() matches the normalized host of the URL."""
+        db.sides["https://www.a.com/1"] = _recipe()
+        db.sides["https://b.com/1"] = _recipe()
+
+        assert [url for url, _ in db.sides.by_host("a.com")] == ["https://www.a.com/1"]
+
+    def test_delete_cascades_to_tags(self, db):
+        """Deleting a recipe removes its tags row too."""
+        db.mains["u"] = _recipe("beef", oven_use=1.0)
+        del db.mains["u"]
+
+        count = db.conn.execute("SELECT COUNT(*) FROM recipe_tags").fetchone()[0]
+        assert count == 0
+
+
+class TestStringTable:
+    """Test the used / failures views."""
+
+    def test_roundtrip_and_update(self, db):
+        """Values upsert, update() works, and len/iter match."""
+        db.failed["u1"] = "FAILS due to: a"
+        db.failed.update({"u1": "FAILS due to: b", "u2": "FAILS due to: c"})
+
+        assert dict(db.failed) == {"u1": "FAILS due to: b", "u2": "FAILS due to: c"}
+        assert len(db.failed) == 2
+        del db.failed["u1"]
+        assert list(db.failed) == ["u2"]
+
+    def test_persists_across_connections(self, tmp_path):
+        """Writes are committed as they happen."""
+        path = tmp_path / "recipes.db"
+        first = RecipeDB(path)
+        first.used["u1"] = "2026-01-01"
+        first.close()
+
+        second = RecipeDB(path)
+        assert second.used["u1"] == "2026-01-01"
+        second.close()
+
+
+class TestMigrateFromJson:
+    """Test the one-time JSON -> SQLite migration."""
+
+    def _write_state(self, tmp_path):
+        files = {
+            name: str(tmp_path / f"{name}.json")
+            for name in ("mains", "sides", "failed", "used")
+        }
+        save_json(files["mains"], {"m1": _recipe("beef", oven_use=1.0)})
+        append_journal(files["mains"], {"m2": _recipe("salmon")})
+        save_json(files["sides"], {"s1": _recipe("kale")})
+        save_json(files["failed"], {"f1": "FAILS due to: x"})
+        return files
+
+    def test_migrates_all_state_including_journals(self, tmp_path):
+        """Every JSON file, with its journal replayed, lands in the database."""
+        files = self._write_state(tmp_path)
+
+        db = open_recipe_db(
+            tmp_path / "recipes.db",
+            files["mains"],
+            files["sides"],
+            files["failed"],
+            files["used"],
+        )
+
+        assert dict(db.mains.items()) == {
+            "m1": _recipe("beef", oven_use=1.0),
+            "m2": _recipe("salmon"),
+        }
+        assert list(db.sides) == ["s1"]
+        assert dict(db.failed) == {"f1": "FAILS due to: x"}
+        assert len(db.used) == 0
+        assert db.is_stale(12) is False  # mains file mtime carried over
+        db.close()
+
+    def test_runs_only_once(self, tmp_path):
+        """A second migration is skipped, so database edits aren't clobbered."""
+        files = self._write_state(tmp_path)
+        db = RecipeDB(tmp_path / "recipes.db")
+        assert migrate_from_json(db, *files.values()) is True
+        del db.mains["m1"]
+
+        assert migrate_from_json(db, *files.values()) is False
+        assert "m1" not in db.mains
+        db.close()
+
+    def test_json_files_left_untouched(self, tmp_path):
+        """Migration only reads the JSON files."""
+        files = self._write_state(tmp_path)
+        before = Path(files["sides"]).read_text()
+
+        db = RecipeDB(tmp_path / "recipes.db")
+        migrate_from_json(db, *files.values())
+        db.close()
+
+        assert json.loads(Path(files["sides"]).read_text()) == json.loads(before)
+        assert not Path(files["used"]).exists()
+
+    def test_schema_has_indexes(self, db):
+        """URL, host and course/protein lookups are indexed."""
+        indexes = {
+            row[0]
+            for row in db.conn.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'index'"
+            )
+        }
+        assert {"recipes_url", "recipes_host", "recipes_course_protein"} <= indexes
+
+
+class TestMainWithDatabase:
+    """Test main's state handling against the SQLite store."""
+
+    def _context(self, db):
+        return {
+            "unused_mains": db.mains,
+            "unused_sides": db.sides,
+            "failed_recipes": db.failed,
+            "used_recipes": db.used,
+            "recipe_db": db,
+        }
+
+    @patch("main.save_json")
+    def test_tagging_writes_tags_back(self, mock_save, db):
+        """Tags added to a copy read from the database are written back."""
+        db.mains["u"] = _recipe("beef")
+
+        def _tag(batch):
+            for recipe in batch:
+                recipe["oven_use"] = 1.0
+                recipe["seasonality"] = {"winter": 1.0}
+                ensure_features(recipe)
+            return [True] * len(batch)
+
+        with patch("main.ensure_recipes_tagged", side_effect=_tag):
+            main._tag_new_recipes(self._context(db))
+
+        assert db.mains["u"]["oven_use"] == 1.0
+        assert db.mains.untagged() == []
+        mock_save.assert_not_called()
+
+    @patch("main.save_json")
+    def test_update_tracking_moves_recipe_to_used(self, mock_save, db):
+        """Sent recipes move from unused to used without any JSON writes."""
+        db.mains["u"] = _recipe("beef")
+
+        main._update_tracking_data(self._context(db), [{"obj": {"u": {}}}])
+
+        assert "u" not in db.mains
+        assert "u" in db.used
+        mock_save.assert_not_called()
+
+    def test_update_tracking_is_one_transaction(self, db):
+        """A failure partway through rolls back the moves already made."""
+        db.mains["u"] = _recipe("beef")
+        meals = [{"obj": {"u": {}}}, {"obj": {"missing": {}}}]
+
+        with patch("main.logger.warning", side_effect=RuntimeError("boom")):
+            with pytest.raises(RuntimeError):
+                main._update_tracking_data(self._context(db), meals)
+
+        assert "u" in db.mains
+        assert "u" not in db.used
+
+    @patch("main._send_error_notification")
+    @patch("main._select_and_prepare_meals", side_effect=RuntimeError("boom"))
+    @patch("main._tag_new_recipes")
+    @patch("main.is_debug_mode", return_value=False)
+    @patch("main._start_run_log")
+    def test_main_closes_database(self, _log, _debug, _tag, _select, _notify):
+        """The database opened for the run is closed even when the run fails."""
+        db = Mock()
+        context = {"needs_fresh_data": False, "recipe_db": db}
+
+        with patch("main._initialize_context", return_value=context):
+            with pytest.raises(SystemExit):
+                main.main()
+
+        db.close.assert_called_once_with()
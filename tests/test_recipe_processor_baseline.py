@@ -1,6 +1,10 @@
 """Characterization tests for recipe_processor streaming scrape - locks in behavior."""
 
+import multiprocessing
 import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from pathlib import Path
 from unittest.mock import Mock, patch
 
@@ -10,6 +14,7 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 
 import config
 import recipe_processor
+import web_scraper
 from site_health import STATUS_OK, STATUS_REGEX_BROKEN, RunOutcome
 
 
@@ -29,31 +34,66 @@ class TestFlushScrapeProgress:
     """Test the _flush_scrape_progress disk-persist helper."""
 
     @patch("recipe_processor.save_json")
-    def test_flush_writes_target_and_failed(self, mock_save: Mock) -> None:
-        """A flush persists the active stream's file plus the failed-recipes file."""
-        target = {"u1": {"title": "a"}}
+    @patch("recipe_processor.append_journal", return_value=0)
+    def test_flush_journals_new_entries_only(
+        self, mock_append: Mock, mock_save: Mock
+    ) -> None:
+        """A flush appends just the new entries to the files' journals."""
+        target = {"old": {"title": "o"}, "u1": {"title": "a"}}
         failed = {"bad": "reason"}
         recipe_processor._flush_scrape_progress(
-            config.UNUSED_MAINS_FILENAME, target, failed, debug_mode=False
+            config.UNUSED_MAINS_FILENAME,
+            target,
+            failed,
+            {"u1": {"title": "a"}},
+            {},
+            debug_mode=False,
+        )
+        # Journals the active stream's file + the failed-recipes file, and
+        # queues the new recipe for tagging.
+        assert mock_append.call_count == 3
+        mock_append.assert_any_call(
+            config.UNUSED_MAINS_FILENAME, {"u1": {"title": "a"}}
+        )
+        mock_append.assert_any_call(config.FAILED_FILENAME, {})
+        mock_append.assert_any_call(
+            config.TAGGING_QUEUE_FILENAME, {"u1": config.UNUSED_MAINS_FILENAME}
+        )
+        mock_save.assert_not_called()
+
+    @patch("recipe_processor.JOURNAL_COMPACT_BYTES", 10)
+    @patch("recipe_processor.save_json")
+    @patch("recipe_processor.append_journal")
+    def test_oversized_journal_is_compacted(
+        self, mock_append: Mock, mock_save: Mock
+    ) -> None:
+        """A journal past JOURNAL_COMPACT_BYTES is folded into a full save."""
+        mock_append.side_effect = lambda filename, changes: (
+            50 if filename == config.UNUSED_MAINS_FILENAME else 5
+        )
+        target = {"u1": {"title": "a"}}
+        recipe_processor._flush_scrape_progress(
+            config.UNUSED_MAINS_FILENAME, target, {}, target, {}, debug_mode=False
         )
-        # Writes exactly the active stream's file + the failed-recipes file.
-        assert mock_save.call_count == 2
-        mock_save.assert_any_call(config.UNUSED_MAINS_FILENAME, target)
-        mock_save.assert_any_call(config.FAILED_FILENAME, failed)
+        mock_save.assert_called_once_with(config.UNUSED_MAINS_FILENAME, target)
 
     @patch("recipe_processor.save_json")
-    def test_flush_is_noop_in_debug_mode(self, mock_save: Mock) -> None:
+    @patch("recipe_processor.append_journal", return_value=0)
+    def test_flush_is_noop_in_debug_mode(
+        self, mock_append: Mock, mock_save: Mock
+    ) -> None:
         """Debug mode never writes the database files."""
         recipe_processor._flush_scrape_progress(
-            config.UNUSED_MAINS_FILENAME, {"u1": {}}, {}, debug_mode=True
+            config.UNUSED_MAINS_FILENAME, {"u1": {}}, {}, {"u1": {}}, {}, True
         )
+        mock_append.assert_not_called()
         mock_save.assert_not_called()
 
 
 class TestScrapeUrlsStreaming:
     """Test the _scrape_urls_streaming one-page-at-a-time loop."""
 
-    @patch("recipe_processor.save_json")
+    @patch("recipe_processor.append_journal", return_value=0)
     @patch("recipe_processor.scraper")
     @patch("recipe_processor.get_html")
     def test_routes_recipes_and_skips_none(
@@ -75,7 +115,7 @@ class TestScrapeUrlsStreaming:
         assert target == {"u1": {"title": "u1"}, "u3": {"title": "u3"}}
         assert "u2" not in target
 
-    @patch("recipe_processor.save_json")
+    @patch("recipe_processor.append_journal", return_value=0)
     @patch("recipe_processor.scraper")
     @patch("recipe_processor.get_html")
     def test_streams_one_call_per_url(
@@ -93,7 +133,7 @@ class TestScrapeUrlsStreaming:
         assert mock_get_html.call_count == 7
         assert mock_scraper.call_count == 7
 
-    @patch("recipe_processor.save_json")
+    @patch("recipe_processor.append_journal", return_value=0)
     @patch("recipe_processor.scraper")
     @patch("recipe_processor.get_html")
     def test_periodic_flush_plus_final(
@@ -125,7 +165,7 @@ class TestScrapeUrlsStreaming:
         assert len(target_saves) == 3
         assert len(failed_saves) == 3
 
-    @patch("recipe_processor.save_json")
+    @patch("recipe_processor.append_journal", return_value=0)
     @patch("recipe_processor.scraper")
     @patch("recipe_processor.get_html")
     def test_final_flush_always_happens(
@@ -146,7 +186,7 @@ class TestScrapeUrlsStreaming:
         ]
         assert len(target_saves) == 1
 
-    @patch("recipe_processor.save_json")
+    @patch("recipe_processor.append_journal", return_value=0)
     @patch("recipe_processor.scraper")
     @patch("recipe_processor.get_html")
     def test_debug_mode_never_flushes(
@@ -167,7 +207,7 @@ class TestScrapeUrlsStreaming:
 
         mock_save.assert_not_called()
 
-    @patch("recipe_processor.save_json")
+    @patch("recipe_processor.append_journal", return_value=0)
     @patch("recipe_processor.scraper")
     @patch("recipe_processor.get_html")
     def test_empty_url_list_still_flushes_once(
@@ -191,7 +231,7 @@ class TestScrapeUrlsStreaming:
         assert len(target_saves) == 1
         assert len(failed_saves) == 1
 
-    @patch("recipe_processor.save_json")
+    @patch("recipe_processor.append_journal", return_value=0)
     @patch("recipe_processor.scraper")
     @patch("recipe_processor.get_html")
     def test_get_html_error_on_one_url_does_not_abort_stream(
@@ -223,10 +263,168 @@ class TestScrapeUrlsStreaming:
         )
 
 
+class TestScrapeUrlsConcurrent:
+    """Test the bounded worker-pool mode of _scrape_urls_streaming."""
+
+    @patch("recipe_processor.append_journal", return_value=0)
+    @patch("recipe_processor.scraper")
+    @patch("recipe_processor.get_html")
+    def test_results_land_in_input_order(
+        self, mock_get_html: Mock, mock_scraper: Mock, mock_save: Mock
+    ) -> None:
+        """Out-of-order completion still routes recipes + failures in URL order."""
+
+        def _get_html(url: str, dbg: bool) -> str:
+            # Earlier URLs finish last.
+            time.sleep(0.01 * (5 - int(url[1:])))
+            return "html"
+
+        def _scraper(html: str, url: str, failed: dict) -> dict | None:
+            if url == "u2":
+                failed[url] = "FAILS due to: bad"
+                return None
+            return {"title": url}
+
+        mock_get_html.side_effect = _get_html
+        mock_scraper.side_effect = _scraper
+        target: dict[str, dict] = {}
+        failed: dict[str, str] = {}
+
+        recipe_processor._scrape_urls_streaming(
+            [f"u{i}" for i in range(5)],
+            target,
+            config.UNUSED_MAINS_FILENAME,
+            failed,
+            False,
+            workers=3,
+        )
+
+        assert list(target) == ["u0", "u1", "u3", "u4"]
+        assert failed == {"u2": "FAILS due to: bad"}
+
+    @patch("recipe_processor.append_journal", return_value=0)
+    @patch("recipe_processor.scraper")
+    @patch("recipe_processor.get_html")
+    def test_never_exceeds_worker_count_in_flight(
+        self, mock_get_html: Mock, mock_scraper: Mock, mock_save: Mock
+    ) -> None:
+        """At most `workers` pages are being fetched/scraped at any moment."""
+        lock = threading.Lock()
+        active = 0
+        peak = 0
+
+        def _get_html(url: str, dbg: bool) -> str:
+            nonlocal active, peak
+            with lock:
+                active += 1
+                peak = max(peak, active)
+            time.sleep(0.005)
+            return "html"
+
+        def _scraper(html: str, url: str, failed: dict) -> dict:
+            nonlocal active
+            with lock:
+                active -= 1
+            return {"title": url}
+
+        mock_get_html.side_effect = _get_html
+        mock_scraper.side_effect = _scraper
+
+        recipe_processor._scrape_urls_streaming(
+            [f"u{i}" for i in range(20)],
+            {},
+            config.UNUSED_MAINS_FILENAME,
+            {},
+            False,
+            workers=3,
+        )
+
+        assert 1 <= peak <= 3
+
+    @patch("recipe_processor.append_journal", return_value=0)
+    @patch("recipe_processor.scraper")
+    @patch("recipe_processor.get_html")
+    def test_concurrent_mode_keeps_periodic_flushes(
+        self, mock_get_html: Mock, mock_scraper: Mock, mock_save: Mock
+    ) -> None:
+        """Flush cadence is per processed URL, same as the serial path."""
+        mock_get_html.return_value = "html"
+        mock_scraper.return_value = {"title": "x"}
+
+        recipe_processor._scrape_urls_streaming(
+            [f"u{i}" for i in range(5)],
+            {},
+            config.UNUSED_MAINS_FILENAME,
+            {},
+            False,
+            flush_interval=2,
+            workers=4,
+        )
+
+        target_saves = [
+            c
+            for c in mock_save.call_args_list
+            if c.args[0] == config.UNUSED_MAINS_FILENAME
+        ]
+        assert len(target_saves) == 3
+
+
+class TestParsePool:
+    """Test handing fetched HTML to a parser pool."""
+
+    @patch("recipe_processor.append_journal", return_value=0)
+    @patch("recipe_processor.scraper")
+    @patch("recipe_processor.parse_recipe")
+    @patch("recipe_processor.get_html")
+    def test_parsing_goes_through_the_pool(
+        self,
+        mock_get_html: Mock,
+        mock_parse: Mock,
+        mock_scraper: Mock,
+        mock_save: Mock,
+    ) -> None:
+        """With a parse pool, HTML goes to parse_recipe and results come back."""
+        mock_get_html.side_effect = lambda url, dbg: f"html-{url}"
+        mock_parse.side_effect = lambda html, url: (
+            (None, {url: "FAILS due to: nope"}) if url == "u1" else ({"t": html}, {})
+        )
+        target: dict[str, dict] = {}
+        failed: dict[str, str] = {}
+
+        with ThreadPoolExecutor(max_workers=2) as parse_pool:
+            recipe_processor._scrape_urls_streaming(
+                ["u0", "u1"],
+                target,
+                config.UNUSED_MAINS_FILENAME,
+                failed,
+                False,
+                workers=2,
+                parse_pool=parse_pool,
+            )
+
+        mock_scraper.assert_not_called()
+        assert target == {"u0": {"t": "html-u0"}}
+        assert failed == {"u1": "FAILS due to: nope"}
+
+    def test_failure_reason_survives_a_real_worker_process(self) -> None:
+        """A parser process returns scraper()'s failure reason intact."""
+        with ProcessPoolExecutor(
+            max_workers=1, mp_context=multiprocessing.get_context("spawn")
+        ) as pool:
+            recipe, failures = pool.submit(
+                web_scraper.parse_recipe, "<html></html>", "https://example.com/r"
+            ).result()
+
+        assert recipe is None
+        assert failures["https://example.com/r"].startswith("FAILS due to: ")
+
+
 class TestFetchFreshRecipesStreaming:
     """End-to-end: fetch_fresh_recipes streams mains then sides, no batch dicts."""
 
-    @patch("recipe_processor.save_json")
+    # Mocked scraper can't cross into parser processes; parse in-thread here.
+    @patch("recipe_processor.SCRAPE_PARSE_WORKERS", 0)
+    @patch("recipe_processor.append_journal", return_value=0)
     @patch("recipe_processor.scraper")
     @patch("recipe_processor.get_html")
     @patch("recipe_processor.get_recipe_urls")
@@ -267,11 +465,39 @@ class TestFetchFreshRecipesStreaming:
 class TestFetchFreshRecipesOutcomes:
     """fetch_fresh_recipes collects per-(site, course) RunOutcome health records."""
 
+    @patch("recipe_processor.fetch_listing_pages")
+    @patch("recipe_processor.get_recipe_urls")
+    def test_listing_pages_prefetched_then_passed_per_site(
+        self, mock_urls: Mock, mock_listing: Mock
+    ) -> None:
+        """All listing pages are fetched up front and shared with each site."""
+        mock_urls.return_value = ([], [], {})
+        mock_listing.return_value = {"m": "page"}
+        websites = {"A": {"main course": "m"}, "B": {"main course": "n"}}
+
+        recipe_processor.fetch_fresh_recipes(
+            websites,
+            unused_main_recipes={},
+            unused_side_recipes={},
+            used_recipes={},
+            failed_recipes={},
+            debug_mode=True,
+        )
+
+        mock_listing.assert_called_once_with(websites, True)
+        for call in mock_urls.call_args_list:
+            assert call.args[2] == {"m": "page"}
+
+    @patch("recipe_processor.append_journal", return_value=0)
     @patch("recipe_processor.scraper")
     @patch("recipe_processor.get_html")
     @patch("recipe_processor.get_recipe_urls")
     def test_builds_run_outcomes_keyed_by_site_and_course(
-        self, mock_urls: Mock, mock_get_html: Mock, mock_scraper: Mock
+        self,
+        mock_urls: Mock,
+        mock_get_html: Mock,
+        mock_scraper: Mock,
+        mock_journal: Mock,
     ) -> None:
         """Each (site, course) status becomes a keyed RunOutcome in the result."""
         # No URLs returned -> no recipe HTML fetching/scraping needed
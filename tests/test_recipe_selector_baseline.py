@@ -1,5 +1,6 @@
 """Characterization tests for recipe_selector module - locks in existing behavior."""
 
+import random
 import sys
 from pathlib import Path
 from unittest.mock import patch
@@ -9,20 +10,25 @@ import pytest
 sys.path.insert(0, str(Path(__file__).parent.parent))
 from datetime import date
 
+from config import VEGGIES
 from recipe_selector import (
+    FEATURE_HASH,
+    CandidatePool,
     InsufficientRecipesError,
+    ensure_features,
     ensure_veggies,
     select_random_proteins,
 )
+from seasonal_selection import final_scores
 
 
 class TestSelectRandomProteins:
     """Selection now uses weighted-random by seasonal score within protein groups."""
 
-    @patch("recipe_selector.weighted_sample")
-    def test_selects_two_land_one_seafood(self, mock_sample):
+    @patch("recipe_selector._pick")
+    def test_selects_two_land_one_seafood(self, mock_pick):
         """Selects two land one seafood."""
-        mock_sample.side_effect = lambda items, weights, k: items[:k]
+        mock_pick.side_effect = lambda pool, k: pool.items[:k]
         recipes = {
             "url1": {"ingredients": ["chicken breast", "salt"]},
             "url2": {"ingredients": ["salmon fillet", "pepper"]},
@@ -38,17 +44,17 @@ class TestSelectRandomProteins:
             assert isinstance(item, dict)
             assert len(item) == 1
 
-    @patch("recipe_selector.weighted_sample")
-    def test_passes_final_scores_as_weights(self, mock_sample):
+    @patch("recipe_selector._pick")
+    def test_passes_final_scores_as_weights(self, mock_pick):
         """Passes final scores as weights."""
         captured = {}
 
-        def capture(items, weights, k):
+        def capture(pool, k):
             """Helper for the surrounding test."""
-            captured["weights"] = weights
-            return items[:k]
+            captured["weights"] = pool.weights
+            return pool.items[:k]
 
-        mock_sample.side_effect = capture
+        mock_pick.side_effect = capture
         recipes = {
             "url1": {"ingredients": ["chicken"]},
             "url2": {"ingredients": ["pork"]},
@@ -150,11 +156,11 @@ class TestEnsureVeggies:
 class TestSeasonalSelection:
     """Tests for seasonal selection."""
 
-    @patch("recipe_selector.weighted_sample")
-    def test_preserves_protein_balance_with_seafood(self, mock_sample):
-        # weighted_sample returns the first k items it is given (deterministic)
+    @patch("recipe_selector._pick")
+    def test_preserves_protein_balance_with_seafood(self, mock_pick):
+        # _pick returns the first k items of the pool (deterministic)
         """Preserves protein balance with seafood."""
-        mock_sample.side_effect = lambda items, weights, k: items[:k]
+        mock_pick.side_effect = lambda pool, k: pool.items[:k]
         recipes = {
             "land1": {"ingredients": ["chicken breast"]},
             "land2": {"ingredients": ["pork loin"]},
@@ -168,10 +174,10 @@ class TestSeasonalSelection:
         # 2 landfood + 1 seafood
         assert len(selected) == 3
 
-    @patch("recipe_selector.weighted_sample")
-    def test_three_landfood_when_no_seafood(self, mock_sample):
+    @patch("recipe_selector._pick")
+    def test_three_landfood_when_no_seafood(self, mock_pick):
         """Three landfood when no seafood."""
-        mock_sample.side_effect = lambda items, weights, k: items[:k]
+        mock_pick.side_effect = lambda pool, k: pool.items[:k]
         recipes = {
             "land1": {"ingredients": ["chicken"]},
             "land2": {"ingredients": ["pork"]},
@@ -189,3 +195,116 @@ class TestSeasonalSelection:
 
         with pytest.raises(InsufficientRecipesError):
             select_random_proteins(recipes, today=date(2026, 6, 21))
+
+
+class TestCachedFeatures:
+    """Selection reads cached features instead of rescanning ingredients."""
+
+    def test_ensure_features_computes_once(self):
+        """Features are stamped with FEATURE_HASH and not recomputed."""
+        recipe = {"ingredients": ["2 salmon fillets", "1 cup Broccoli florets"]}
+
+        assert ensure_features(recipe) is True
+        assert recipe["protein"] == "seafood"
+        assert recipe["has_veggies"] is True
+        assert recipe["feature_hash"] == FEATURE_HASH
+        assert ensure_features(recipe) is False
+
+    def test_stale_features_recomputed(self):
+        """Features stamped with another keyword hash are recomputed."""
+        recipe = {"ingredients": ["chicken"], "protein": None, "feature_hash": "old"}
+
+        assert ensure_features(recipe) is True
+        assert recipe["protein"] == "landfood"
+
+    @patch("recipe_selector._categorize_by_protein")
+    @patch("recipe_selector._pick")
+    def test_selection_uses_cached_protein(self, mock_pick, mock_categorize):
+        """Recipes with current features are grouped without any scanning."""
+        mock_pick.side_effect = lambda pool, k: pool.items[:k]
+        recipes = {
+            f"url{i}": {
+                "ingredients": ["tofu"],
+                "protein": protein,
+                "has_veggies": False,
+                "feature_hash": FEATURE_HASH,
+            }
+            for i, protein in enumerate(["landfood", "landfood", "seafood"])
+        }
+
+        selected = select_random_proteins(recipes, today=date(2026, 6, 21))
+
+        assert [next(iter(item)) for item in selected] == ["url0", "url1", "url2"]
+        mock_categorize.assert_not_called()
+
+    def test_ensure_veggies_uses_cached_flag(self):
+        """The cached veggie flag decides, for the configured VEGGIES only."""
+        meal = {"url1": {"ingredients": ["beef"]}}
+        ensure_features(meal["url1"])
+        meal["url1"]["has_veggies"] = True  # cached answer wins
+
+        assert ensure_veggies([meal], {}, VEGGIES)[0]["type"] == "single_main"
+        result = ensure_veggies([meal], {"s": {"ingredients": []}}, ("kale",))
+        assert [m["type"] for m in result] == ["combo_main", "combo_side"]
+
+
+class TestCandidatePool:
+    """Side candidates are weighted once and drawn without replacement."""
+
+    SIDES = {f"side{i}": {"ingredients": ["kale"]} for i in range(4)}
+
+    def test_no_repeats_until_exhausted(self):
+        """Every side is drawn once before any side repeats."""
+        pool = CandidatePool.from_recipes(self.SIDES, date(2026, 1, 15))
+
+        first = {next(iter(pool.draw())) for _ in range(4)}
+        again = next(iter(pool.draw()))
+
+        assert first == set(self.SIDES)
+        assert again in self.SIDES
+
+    @patch("recipe_selector.final_scores", wraps=final_scores)
+    def test_weights_scored_once(self, mock_scores):
+        """Every draw reuses the weights scored on first use."""
+        pool = CandidatePool.from_recipes(self.SIDES, date(2026, 1, 15))
+        mock_scores.assert_not_called()
+
+        for _ in range(6):
+            pool.draw()
+
+        assert mock_scores.call_count == 1
+
+    def test_ensure_veggies_distinct_sides(self):
+        """Meals lacking veggies get different sides from a shared pool."""
+        meals = [{f"main{i}": {"ingredients": ["beef"]}} for i in range(3)]
+        pool = CandidatePool.from_recipes(self.SIDES, date(2026, 1, 15))
+
+        result = ensure_veggies(meals, pool, ("kale",), date(2026, 1, 15))
+
+        sides = [next(iter(m["obj"])) for m in result if m["type"] == "combo_side"]
+        assert len(sides) == len(set(sides)) == 3
+
+    def test_empty_pool_raises(self):
+        """Drawing from an empty pool is an error."""
+        with pytest.raises(ValueError):
+            CandidatePool([], date(2026, 1, 15)).draw()
+
+    def test_seeded_rng_is_reproducible(self):
+        """Mains and sides draw from the pool's rng, so a seed fixes them."""
+        recipes = {
+            **{f"land{i}": {"ingredients": ["chicken"]} for i in range(6)},
+            **{f"sea{i}": {"ingredients": ["salmon"]} for i in range(6)},
+        }
+
+        def run(seed):
+            mains = select_random_proteins(
+                recipes, date(2026, 1, 15), random.Random(seed)
+            )
+            pool = CandidatePool.from_recipes(
+                self.SIDES, date(2026, 1, 15), random.Random(seed)
+            )
+            return [next(iter(m)) for m in mains], [
+                next(iter(pool.draw())) for _ in range(4)
+            ]
+
+        assert run(7) == run(7)
@@ -4,6 +4,9 @@ import json
 import sys
 from pathlib import Path
 
+import numpy as np
+import pytest
+
 sys.path.insert(0, str(Path(__file__).parent.parent))
 import seasonal_model
 
@@ -96,3 +99,202 @@ class TestPredictForRecipe:
         assert seasonal_model.predict_for_recipe({}, path) == dict.fromkeys(
             seasonal_model.SEASONS, 0.5
         )
+
+
+class TestSeasonalModel:
+    """Tests for the compiled model's batch scoring."""
+
+    def test_predict_many_matches_single(self, tmp_path: Path) -> None:
+        """Batch scores equal one-at-a-time scores; empty recipes are neutral."""
+        model = seasonal_model.load_compiled_model(_tiny_artifact(tmp_path))
+        recipes = [
+            {"title": "summer winter winter"},
+            {},
+            {"title": "rutabaga"},
+            {"title": "Summer salad"},
+        ]
+
+        batch = model.predict_many(recipes)
+
+        assert batch[1] == dict.fromkeys(seasonal_model.SEASONS, 0.5)
+        for i in (0, 2, 3):
+            single = seasonal_model.predict_seasons(
+                seasonal_model.recipe_text(recipes[i]), model
+            )
+            assert batch[i] == pytest.approx(single)
+        assert batch[0]["winter"] > batch[0]["summer"] > 0.0
+
+    def test_transform_is_sparse(self, tmp_path: Path) -> None:
+        """Only in-vocabulary tokens are stored, one entry per distinct token."""
+        model = seasonal_model.load_compiled_model(_tiny_artifact(tmp_path))
+
+        data, indices, indptr = model.transform(["summer summer", "", "winter x"])
+
+        assert indices.tolist() == [0, 1]
+        assert indptr.tolist() == [0, 1, 1, 2]
+        assert data.tolist() == [1.0, 1.0]
+
+    def test_predict_for_recipes_missing_model(self) -> None:
+        """A missing artifact yields neutral scores for the whole batch."""
+        scores = seasonal_model.predict_for_recipes(
+            [{"title": "x"}, {}], "/nonexistent/model.json"
+        )
+        assert scores == [dict.fromkeys(seasonal_model.SEASONS, 0.5)] * 2
+
+
+class TestBinaryModel:
+    """Tests for the memory-mapped binary copy of the artifact."""
+
+    def test_binary_matches_json(self, tmp_path: Path) -> None:
+        """The binary copy loads memory-mapped and scores like the JSON."""
+        path = _tiny_artifact(tmp_path)
+        artifact = seasonal_model.load_model(path)
+        seasonal_model.save_binary_model(artifact, path)
+
+        model = seasonal_model.load_binary_model(path)
+
+        assert isinstance(model.idf, np.memmap)
+        assert model.vocabulary == artifact["vocabulary"]
+        text = "summer winter winter"
+        assert model.predict(text) == pytest.approx(
+            seasonal_model.predict_seasons(text, artifact)
+        )
+
+    def test_missing_binary_returns_none(self, tmp_path: Path) -> None:
+        """Without a binary copy there is nothing to load."""
+        assert seasonal_model.load_binary_model(_tiny_artifact(tmp_path)) is None
+
+    def test_stale_binary_ignored(self, tmp_path: Path) -> None:
+        """A binary copy written for a different JSON is not used."""
+        path = _tiny_artifact(tmp_path)
+        seasonal_model.save_binary_model(seasonal_model.load_model(path), path)
+        Path(path).write_text(Path(path).read_text() + " ")
+
+        assert seasonal_model.load_binary_model(path) is None
+
+    def test_same_size_retrain_is_stale(self, tmp_path: Path) -> None:
+        """A retrained JSON of exactly the same size still outdates the copy."""
+        path = _tiny_artifact(tmp_path)
+        seasonal_model.save_binary_model(seasonal_model.load_model(path), path)
+        before = Path(path).read_text()
+        after = before.replace('"idf": [1.0, 1.0]', '"idf": [2.0, 1.0]')
+        assert len(after) == len(before) and after != before
+        Path(path).write_text(after)
+
+        assert seasonal_model.load_binary_model(path) is None
+
+    def test_compiled_model_falls_back_to_json(self, tmp_path: Path) -> None:
+        """An unreadable binary copy falls back to parsing the JSON."""
+        path = _tiny_artifact(tmp_path)
+        seasonal_model.save_binary_model(seasonal_model.load_model(path), path)
+        seasonal_model.binary_paths(path)[0].write_bytes(b"garbage")
+
+        model = seasonal_model.load_compiled_model(path)
+
+        assert not isinstance(model.idf, np.memmap)
+        assert model.predict("summer")["summer"] == 1.0
+
+
+class TestHashingFeaturizer:
+    """Tests for the vocabulary-free hashing featurizer."""
+
+    def _hashing_artifact(self, tmp_path: Path) -> str:
+        """Write a 16-column hashing artifact where 'summer' drives summer."""
+        n_features = 16
+        coef = [[0.0] * n_features for _ in seasonal_model.SEASONS]
+        coef[1][seasonal_model.hash_feature("summer", n_features)] = 1.0
+        model = {
+            "version": 1,
+            "seasons": list(seasonal_model.SEASONS),
+            "featurizer": "hashing",
+            "idf": [1.0] * n_features,
+            "coef": coef,
+            "intercept": [0.0] * 4,
+        }
+        p = tmp_path / "seasonal_model.json"
+        p.write_text(json.dumps(model))
+        return str(p)
+
+    def test_hash_is_stable(self) -> None:
+        """Columns don't depend on the process's str hash seed."""
+        assert seasonal_model.hash_feature("summer", 4096) == 2348
+        assert seasonal_model.hash_feature("summer", 16) == 2348 % 16
+
+    def test_predicts_without_vocabulary(self, tmp_path: Path) -> None:
+        """Any token maps to a column; 'summer' alone scores summer 1.0."""
+        model = seasonal_model.load_compiled_model(self._hashing_artifact(tmp_path))
+
+        assert model.vocabulary is None
+        assert model.predict("summer")["summer"] == 1.0
+        assert model.feature_index("rutabaga") is not None
+
+    def test_binary_roundtrip(self, tmp_path: Path) -> None:
+        """The binary copy of a hashing artifact stores no tokens."""
+        path = self._hashing_artifact(tmp_path)
+        seasonal_model.save_binary_model(seasonal_model.load_model(path), path)
+
+        model = seasonal_model.load_binary_model(path)
+
+        assert model.vocabulary is None
+        assert model.n_features == 16
+        assert model.predict("summer")["summer"] == 1.0
+
+
+class TestQuantization:
+    """Tests for quantized binary weights."""
+
+    def test_int8_per_column_scale(self) -> None:
+        """Each column is scaled to [-127, 127] on its own."""
+        weights = np.array([[1.0, -0.02], [4.0, 0.01], [0.0, 0.0]])
+
+        quantized, scales = seasonal_model.quantize_weights(weights, "int8")
+
+        assert quantized.dtype == np.int8
+        assert np.abs(quantized).max(axis=0).tolist() == [127, 127]
+        assert np.allclose(quantized * scales, weights, atol=scales.max() / 2)
+
+    def test_unknown_quantization_raises(self) -> None:
+        """Only the listed formats are accepted."""
+        with pytest.raises(ValueError):
+            seasonal_model.quantize_weights(np.ones((2, 2)), "int4")
+
+    def test_quantized_binary_scores_close(self, tmp_path: Path) -> None:
+        """A quantized binary copy is smaller and scores near full precision."""
+        path = _tiny_artifact(tmp_path)
+        artifact = seasonal_model.load_model(path)
+        text = "summer winter winter"
+        full = seasonal_model.predict_seasons(text, artifact)
+        for quantization, itemsize in (("float16", 2), ("int8", 1)):
+            seasonal_model.save_binary_model(artifact, path, quantization)
+
+            model = seasonal_model.load_binary_model(path)
+
+            assert model.coef_t.itemsize == itemsize
+            assert model.predict(text) == pytest.approx(full, abs=0.01)
+
+
+class TestModelHash:
+    """Tests for model_hash."""
+
+    def test_hash_follows_artifact_contents(self, tmp_path: Path) -> None:
+        """The hash identifies the artifact's contents; missing gives None."""
+        path = _tiny_artifact(tmp_path)
+        first = seasonal_model.model_hash(path)
+        other = tmp_path / "other.json"
+        other.write_text(Path(path).read_text() + " ")
+
+        assert len(first) == 16
+        assert seasonal_model.model_hash(str(other)) != first
+        assert seasonal_model.model_hash(str(tmp_path / "none.json")) is None
+
+    def test_hash_follows_binary_export(self, tmp_path: Path) -> None:
+        """Re-exporting the binary copy with another quantization changes it."""
+        path = _tiny_artifact(tmp_path)
+        artifact = seasonal_model.load_model(path)
+        hashes = []
+        for quantization in ("", "float16"):
+            seasonal_model.save_binary_model(artifact, path, quantization)
+            seasonal_model.model_hash.cache_clear()
+            hashes.append(seasonal_model.model_hash(path))
+
+        assert hashes[0] != hashes[1]
@@ -1,13 +1,19 @@
 """Characterization tests for seasonal_selection module (pure date math)."""
 
+import random
 import sys
+from collections import Counter
 from datetime import date
 from pathlib import Path
 from unittest.mock import patch
 
+import pytest
+
 sys.path.insert(0, str(Path(__file__).parent.parent))
 from seasonal_selection import (
+    WeightedSampler,
     final_score,
+    final_scores,
     heat_preference,
     season_blend,
     weighted_sample,
@@ -116,6 +122,31 @@ class TestFinalScore:
         assert final_score(hostile, date(2026, 6, 21)) >= 0.01
 
 
+class TestFinalScores:
+    """Tests for batch scoring."""
+
+    RECIPES = [
+        {"seasonality": {"winter": 0.9, "summer": 0.1}, "oven_use": 1.0},
+        {"seasonality": {"spring": 0.5, "summer": 0.8, "fall": 0.2}},
+        {"oven_use": 0.0},
+        {},
+        {"seasonality": "bogus", "oven_use": 0.5},
+    ]
+
+    def test_matches_final_score(self):
+        """Every batch score equals the per-recipe final_score."""
+        for today in (date(2026, 1, 15), date(2026, 4, 30), date(2026, 7, 4)):
+            scores = final_scores(self.RECIPES, today)
+
+            assert scores.tolist() == pytest.approx(
+                [final_score(recipe, today) for recipe in self.RECIPES]
+            )
+
+    def test_empty_list(self):
+        """No recipes gives an empty array."""
+        assert final_scores([], date(2026, 1, 15)).shape == (0,)
+
+
 class TestWeightedSample:
     """Tests for weighted sample."""
 
@@ -145,3 +176,56 @@ class TestWeightedSample:
         with patch("seasonal_selection.random.uniform", return_value=0.0):
             result = weighted_sample(["heavy", "light"], [10.0, 0.1], 1)
         assert result == ["heavy"]
+
+    def test_seeded_rng_is_reproducible(self):
+        """The same seed gives the same draws."""
+        items = list(range(50))
+        weights = [float(i + 1) for i in items]
+
+        first = weighted_sample(items, weights, 5, random.Random(42))
+        second = weighted_sample(items, weights, 5, random.Random(42))
+
+        assert first == second
+        assert len(set(first)) == 5
+
+    def test_matches_successive_sampling_distribution(self):
+        """Draw-order frequencies match sequential proportional sampling."""
+        rng = random.Random(0)
+        weights = [1.0, 2.0, 3.0, 4.0]
+        trials = 40000
+        counts = Counter(
+            tuple(weighted_sample("abcd", weights, 2, rng)) for _ in range(trials)
+        )
+
+        # P(d then c) = 4/10 * 3/6
+        assert abs(counts[("d", "c")] / trials - 0.2) < 0.01
+        # P(a then b) = 1/10 * 2/9
+        assert abs(counts[("a", "b")] / trials - 1 / 45) < 0.005
+
+    def test_zero_weight_items_drawn_last(self):
+        """Positive-weight items all come before any zero-weight one."""
+        result = weighted_sample(["z1", "a", "z2", "b"], [0.0, 1.0, 0.0, 5.0], 3)
+
+        assert set(result[:2]) == {"a", "b"}
+        assert result[2] in {"z1", "z2"}
+
+
+class TestWeightedSampler:
+    """Tests for the sum-tree sampler."""
+
+    def test_removed_indices_never_drawn(self):
+        """After remove(), an index is out of every later draw."""
+        sampler = WeightedSampler([5.0, 1.0, 1.0], random.Random(1))
+        sampler.remove(0)
+
+        assert sampler.total == 2.0
+        assert {sampler.draw() for _ in range(200)} == {1, 2}
+
+    def test_empty_sampler_raises(self):
+        """Drawing with no positive weight left raises ValueError."""
+        sampler = WeightedSampler([1.0, 0.0])
+        sampler.remove(0)
+
+        assert sampler.total == 0.0
+        with pytest.raises(ValueError):
+            sampler.draw()
@@ -11,7 +11,14 @@ from unittest.mock import Mock, patch
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 import seasonal_tagging
-from seasonal_tagging import ensure_recipe_tagged, score_oven_use
+from recipe_selector import FEATURE_HASH, ensure_features
+from seasonal_tagging import (
+    ensure_recipe_tagged,
+    ensure_recipes_tagged,
+    is_stale,
+    retag_recipes,
+    score_oven_use,
+)
 
 
 class TestScoreOvenUse:
@@ -85,6 +92,9 @@ class TestEnsureRecipeTagged:
 
         assert changed is True
         assert recipe["oven_use"] == 0.0
+        assert recipe["protein"] is None
+        assert recipe["has_veggies"] is True
+        assert recipe["feature_hash"] == FEATURE_HASH
         assert recipe["seasonality"]["summer"] == 0.9
         mock_seasons.assert_called_once_with(recipe)
 
@@ -98,8 +108,108 @@ class TestEnsureRecipeTagged:
             "oven_use": 1.0,
             "seasonality": {"spring": 0.1, "summer": 0.1, "fall": 0.1, "winter": 0.1},
         }
+        ensure_features(recipe)
 
         changed = ensure_recipe_tagged(recipe)
 
         assert changed is False
         mock_seasons.assert_not_called()
+
+
+class TestEnsureRecipesTagged:
+    """Tests for batch tagging."""
+
+    @patch("seasonal_tagging.score_seasons")
+    @patch("seasonal_tagging.score_seasons_many")
+    def test_scores_missing_seasonality_in_one_batch(
+        self, mock_many: Mock, mock_single: Mock
+    ) -> None:
+        """Only untagged recipes are scored, together, and flagged changed."""
+        summer = {"spring": 0.0, "summer": 1.0, "fall": 0.0, "winter": 0.0}
+        mock_many.side_effect = lambda batch: [summer] * len(batch)
+        tagged = {
+            "ingredients": ["y"],
+            "oven_use": 1.0,
+            "seasonality": {"spring": 0.1, "summer": 0.1, "fall": 0.1, "winter": 0.1},
+        }
+        ensure_features(tagged)
+        untagged = [{"ingredients": ["kale"]}, {"ingredients": ["beef"]}]
+
+        flags = ensure_recipes_tagged([untagged[0], tagged, untagged[1]])
+
+        assert flags == [True, False, True]
+        mock_many.assert_called_once_with(untagged)
+        mock_single.assert_not_called()
+        assert all(recipe["seasonality"] == summer for recipe in untagged)
+
+
+_SUMMER = {"spring": 0.0, "summer": 1.0, "fall": 0.0, "winter": 0.0}
+
+
+class TestSeasonalityStamp:
+    """Model scores are stamped with the model hash + a recipe-text fingerprint."""
+
+    @patch("seasonal_tagging.model_hash", return_value="model-1")
+    @patch("seasonal_tagging.score_seasons", return_value=_SUMMER)
+    def test_new_score_is_stamped(self, _score: Mock, _hash: Mock) -> None:
+        """A freshly scored recipe is current until the model or text changes."""
+        recipe = {"title": "Gazpacho", "ingredients": ["tomato"]}
+        ensure_recipe_tagged(recipe)
+
+        assert recipe["seasonality_stamp"].startswith("model-1:")
+        assert is_stale(recipe) is False
+
+        recipe["title"] = "Chilled Gazpacho"
+        assert is_stale(recipe) is True
+
+    @patch("seasonal_tagging.score_seasons", return_value=_SUMMER)
+    def test_retrained_model_makes_scores_stale(self, _score: Mock) -> None:
+        """A different model hash marks every earlier score stale."""
+        recipe = {"title": "Gazpacho", "ingredients": ["tomato"]}
+        with patch("seasonal_tagging.model_hash", return_value="model-1"):
+            ensure_recipe_tagged(recipe)
+        with patch("seasonal_tagging.model_hash", return_value="model-2"):
+            assert is_stale(recipe) is True
+
+    @patch("seasonal_tagging.model_hash", return_value="model-1")
+    @patch("seasonal_tagging.score_seasons")
+    def test_fallback_score_is_not_stamped(self, mock_score, _hash) -> None:
+        """A neutral fallback for a recipe with text stays stale, to be retried."""
+        mock_score.return_value = dict.fromkeys(_SUMMER, 0.5)
+        recipe = {"title": "Gazpacho", "seasonality_stamp": "model-0:abc"}
+        empty = {}
+        ensure_recipe_tagged(recipe)
+        ensure_recipe_tagged(empty)
+
+        assert "seasonality_stamp" not in recipe
+        assert is_stale(recipe) is True
+        # With no text to score, neutral is the real answer.
+        assert is_stale(empty) is False
+
+    @patch("seasonal_tagging.model_hash", return_value="model-1")
+    def test_unstamped_score_is_stale(self, _hash: Mock) -> None:
+        """Scores from before stamping are rescored once there is a model."""
+        assert is_stale({"title": "x", "seasonality": _SUMMER}) is True
+
+    @patch("seasonal_tagging.model_hash", return_value=None)
+    def test_nothing_stale_without_a_model(self, _hash: Mock) -> None:
+        """Without a model, only a missing score counts as stale."""
+        assert is_stale({"seasonality": _SUMMER}) is False
+        assert is_stale({"title": "x"}) is True
+
+    @patch("seasonal_tagging.model_hash", return_value="model-2")
+    @patch("seasonal_tagging.score_seasons_many")
+    def test_retag_rescores_only_stale(self, mock_many: Mock, _hash: Mock) -> None:
+        """retag_recipes rescores the stale recipes in one batch."""
+        mock_many.side_effect = lambda batch: [_SUMMER] * len(batch)
+        current = {"title": "Salad", "ingredients": ["kale"], "oven_use": 0.0}
+        ensure_features(current)
+        retag_recipes([current])
+        old = {**current, "title": "Soup", "seasonality_stamp": "model-1:abc"}
+        mock_many.reset_mock()
+
+        flags = retag_recipes([current, old])
+
+        assert flags == [False, True]
+        mock_many.assert_called_once_with([old])
+        assert old["seasonality_stamp"].startswith("model-2:")
@@ -0,0 +1,66 @@
+"""Tests for the slim_recipes one-off script."""
+
+import json
+import sys
+from pathlib import Path
+from unittest.mock import patch
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+import slim_recipes
+from recipe_db import RecipeDB
+
+FULL = {
+    "title": "Stew",
+    "ingredients": ["beef"],
+    "instructions": "Simmer.",
+    "image": "img.jpg",
+    "seasonality": {"winter": 1.0},
+    "nutrients": {"calories": "400"},
+    "ingredient_groups": [{"ingredients": ["beef"], "purpose": None}],
+}
+SLIM = {k: v for k, v in FULL.items() if k not in ("nutrients", "ingredient_groups")}
+
+
+class TestSlimRecipes:
+    """Tests for the in-place projection."""
+
+    def test_drops_unlisted_fields_only(self):
+        """Unread fields go; tags and required fields stay; slim ones untouched."""
+        recipes = {"u1": dict(FULL), "u2": dict(SLIM)}
+
+        assert slim_recipes.slim_recipes(recipes) == 1
+        assert recipes == {"u1": SLIM, "u2": SLIM}
+
+    def test_slims_json_files(self, tmp_path):
+        """The JSON store's files are rewritten slim."""
+        mains = tmp_path / "mains.json"
+        sides = tmp_path / "sides.json"
+        mains.write_text(json.dumps({"u1": FULL}))
+        sides.write_text(json.dumps({"u2": SLIM}))
+
+        with (
+            patch("slim_recipes.UNUSED_MAINS_FILENAME", str(mains)),
+            patch("slim_recipes.UNUSED_SIDES_FILENAME", str(sides)),
+            patch("slim_recipes.RECIPE_STORE", "json"),
+        ):
+            slim_recipes.main()
+
+        assert json.loads(mains.read_text()) == {"u1": SLIM}
+        assert json.loads(sides.read_text()) == {"u2": SLIM}
+
+    def test_slims_database(self, tmp_path):
+        """With the SQLite store, database rows are rewritten slim."""
+        path = tmp_path / "recipes.db"
+        db = RecipeDB(path)
+        db.mains["u1"] = FULL
+        db.close()
+
+        with (
+            patch("slim_recipes.RECIPE_DB_FILENAME", str(path)),
+            patch("slim_recipes.RECIPE_STORE", "sqlite"),
+        ):
+            slim_recipes.main()
+
+        db = RecipeDB(path)
+        assert db.mains["u1"] == SLIM
+        db.close()
@@ -39,3 +39,39 @@ def test_calendar_baseline_runs() -> None:
     scores = train_seasonal_model.calendar_baseline("fresh tomato and corn salad")
     assert set(scores) == set(seasonal_model.SEASONS)
     assert all(0.0 <= v <= 1.0 for v in scores.values())
+
+
+def test_hashing_export_roundtrip_matches_sklearn() -> None:
+    """The hashing featurizer's artifact has no vocabulary and matches sklearn."""
+    texts = [
+        "tomato basil corn zucchini",
+        "butternut squash root vegetable braise",
+        "asparagus pea spring greens",
+    ]
+    Y = np.array([[0.2, 0.9, 0.1, 0.0], [0.0, 0.0, 0.6, 0.9], [0.9, 0.2, 0.0, 0.0]])
+    vec, ridge = train_seasonal_model.fit(texts, Y, alpha=1.0, featurizer="hashing")
+    artifact = train_seasonal_model.export_model(vec, ridge)
+
+    assert artifact["featurizer"] == "hashing"
+    assert "vocabulary" not in artifact
+    assert len(artifact["idf"]) == len(artifact["coef"][0]) == vec.n_features
+    sk_pred = np.clip(ridge.predict(vec.transform([texts[1]]))[0], 0.0, 1.0)
+    np_pred = seasonal_model.predict_seasons(texts[1], artifact)
+    np_vec = np.array([np_pred[s] for s in seasonal_model.SEASONS])
+    assert np.allclose(np_vec, sk_pred, atol=1e-9)
+
+
+def test_quantization_mae_delta_is_small() -> None:
+    """Quantizing the exported model barely moves holdout MAE."""
+    texts = ["tomato basil corn", "squash root braise", "asparagus pea spring"]
+    Y = np.array([[0.2, 0.9, 0.1, 0.0], [0.0, 0.0, 0.6, 0.9], [0.9, 0.2, 0.0, 0.0]])
+    vec, ridge = train_seasonal_model.fit(texts, Y, alpha=1.0, max_features=50)
+    model = seasonal_model.SeasonalModel.from_artifact(
+        train_seasonal_model.export_model(vec, ridge)
+    )
+
+    for quantization in seasonal_model.QUANTIZATIONS:
+        delta = train_seasonal_model.quantization_mae_delta(
+            model, quantization, texts, Y
+        )
+        assert abs(delta) < 0.01
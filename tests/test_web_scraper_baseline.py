@@ -1,28 +1,66 @@
 """Characterization tests for web_scraper module - locks in existing behavior."""
 
 import sys
+import threading
+import time
+from collections.abc import Iterator
 from pathlib import Path
 from unittest.mock import Mock, patch
 
+import pytest
 import requests
+from recipe_scrapers import scrape_html
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
+from config import HEADERS, HTTP_POOL_MAXSIZE
+from host_scheduler import HostLimit, HostScheduler
+from http_cache import HttpCache
 from web_scraper import (
+    PARSER_JSONLD,
+    PARSER_SCRAPE_HTML,
     PageResult,
     cleanup_recipe_urls,
+    extract_jsonld_recipe,
+    fetch_listing_pages,
     fetch_page,
     get_html,
     get_recipe_urls,
+    get_session,
     scraper,
 )
 
 
+@pytest.fixture(autouse=True)
+def _unthrottled() -> Iterator[None]:
+    """Keep fetch tests fast: lift the per-host politeness limits."""
+    scheduler = HostScheduler(HostLimit(requests_per_second=1e9, max_connections=64))
+    with patch("web_scraper.get_host_scheduler", return_value=scheduler):
+        yield
+
+
+class TestGetSession:
+    """Test the shared, connection-pooled HTTP session."""
+
+    def test_session_is_shared_across_calls(self) -> None:
+        """Every fetch reuses one session for the whole run."""
+        assert get_session() is get_session()
+
+    def test_session_carries_headers_and_pool_size(self) -> None:
+        """HEADERS are set once on the session; adapters use configured pools."""
+        session = get_session()
+        for key, value in HEADERS.items():
+            assert session.headers[key] == value
+        adapter = session.get_adapter("https://example.com")
+        assert adapter._pool_maxsize == HTTP_POOL_MAXSIZE
+
+
 class TestGetHtml:
     """Test get_html function behavior."""
 
-    @patch("web_scraper.requests.get")
-    def test_successful_html_fetch(self, mock_get: Mock) -> None:
+    @patch("web_scraper.get_session")
+    def test_successful_html_fetch(self, mock_session: Mock) -> None:
         """Test successful HTML retrieval."""
+        mock_get = mock_session.return_value.get
         mock_response = Mock()
         mock_response.headers = {"content-type": "text/html; charset=utf-8"}
         mock_response.text = "<html>test content</html>"
@@ -35,18 +73,20 @@ class TestGetHtml:
         assert result == "<html>test content</html>"
         mock_get.assert_called_once()
 
-    @patch("web_scraper.requests.get")
-    def test_timeout_returns_empty_string(self, mock_get: Mock) -> None:
+    @patch("web_scraper.get_session")
+    def test_timeout_returns_empty_string(self, mock_session: Mock) -> None:
         """Test that timeout returns empty string."""
+        mock_get = mock_session.return_value.get
         mock_get.side_effect = requests.exceptions.Timeout()
 
         result = get_html("https://example.com", debug_mode=False)
 
         assert result == ""
 
-    @patch("web_scraper.requests.get")
-    def test_debug_mode_uses_longer_timeout(self, mock_get: Mock) -> None:
+    @patch("web_scraper.get_session")
+    def test_debug_mode_uses_longer_timeout(self, mock_session: Mock) -> None:
         """Test that debug mode uses DEBUG_TIMEOUT."""
+        mock_get = mock_session.return_value.get
         mock_response = Mock()
         mock_response.headers = {"content-type": "text/html; charset=utf-8"}
         mock_response.text = "content"
@@ -60,9 +100,10 @@ class TestGetHtml:
         call_kwargs = mock_get.call_args[1]
         assert call_kwargs["timeout"] == 20  # DEBUG_TIMEOUT
 
-    @patch("web_scraper.requests.get")
-    def test_normal_mode_uses_normal_timeout(self, mock_get: Mock) -> None:
+    @patch("web_scraper.get_session")
+    def test_normal_mode_uses_normal_timeout(self, mock_session: Mock) -> None:
         """Test that normal mode uses NORMAL_TIMEOUT."""
+        mock_get = mock_session.return_value.get
         mock_response = Mock()
         mock_response.headers = {"content-type": "text/html; charset=utf-8"}
         mock_response.text = "content"
@@ -148,6 +189,104 @@ class TestGetRecipeUrls:
         assert statuses["side dish"] == ("UNREACHABLE", 0)
 
 
+class TestFetchListingPages:
+    """Test concurrent listing-page discovery across sites."""
+
+    @patch("web_scraper.fetch_page")
+    def test_fetches_every_listing_page_once(self, mock_fetch: Mock) -> None:
+        """Each distinct main/side listing URL is fetched exactly once."""
+        mock_fetch.side_effect = lambda url, dbg: PageResult(True, 200, url)
+        websites = {
+            "A": {
+                "regex": "r",
+                "main course": "https://a.com/m",
+                "side dish": "https://a.com/s",
+            },
+            "B": {
+                "regex": "r",
+                "main course": "https://b.com/m",
+                "side dish": "https://a.com/s",
+            },
+        }
+
+        pages = fetch_listing_pages(websites)
+
+        assert set(pages) == {"https://a.com/m", "https://a.com/s", "https://b.com/m"}
+        assert pages["https://b.com/m"].html == "https://b.com/m"
+        assert mock_fetch.call_count == 3
+
+    @patch("web_scraper.LISTING_PER_HOST", 1)
+    @patch("web_scraper.fetch_page")
+    def test_per_host_limit_serializes_one_host(self, mock_fetch: Mock) -> None:
+        """Pages from one host never overlap when LISTING_PER_HOST is 1."""
+        lock = threading.Lock()
+        active: dict[str, int] = {}
+        peak: dict[str, int] = {}
+
+        def _fetch(url: str, dbg: bool) -> PageResult:
+            host = url.split("/")[2]
+            with lock:
+                active[host] = active.get(host, 0) + 1
+                peak[host] = max(peak.get(host, 0), active[host])
+            time.sleep(0.01)
+            with lock:
+                active[host] -= 1
+            return PageResult(True, 200, "x")
+
+        mock_fetch.side_effect = _fetch
+        websites = {
+            f"site{i}": {
+                "regex": "r",
+                "main course": f"https://{host}/m{i}",
+                "side dish": f"https://{host}/s{i}",
+            }
+            for i, host in enumerate(["a.com", "a.com", "b.com"])
+        }
+
+        fetch_listing_pages(websites)
+
+        assert peak["a.com"] == 1
+
+    @patch("web_scraper.fetch_page")
+    def test_raising_fetch_is_left_out(self, mock_fetch: Mock) -> None:
+        """A fetch that raises is omitted so get_recipe_urls can retry it."""
+
+        def _fetch(url: str, dbg: bool) -> PageResult:
+            if url.endswith("/s"):
+                raise requests.exceptions.InvalidURL("bad")
+            return PageResult(True, 200, "x")
+
+        mock_fetch.side_effect = _fetch
+        websites = {
+            "A": {
+                "regex": "r",
+                "main course": "https://a.com/m",
+                "side dish": "https://a.com/s",
+            }
+        }
+
+        assert set(fetch_listing_pages(websites)) == {"https://a.com/m"}
+
+    @patch("web_scraper.fetch_page")
+    def test_get_recipe_urls_uses_prefetched_pages(self, mock_fetch: Mock) -> None:
+        """Prefetched listing pages are used as-is, with no second fetch."""
+        selection = {
+            "main course": "https://a.com/m",
+            "side dish": "https://a.com/s",
+            "regex": r'href="(\S+)"',
+        }
+        pages = {
+            "https://a.com/m": PageResult(True, 200, 'href="https://a.com/r1"'),
+            "https://a.com/s": PageResult(False, None, ""),
+        }
+
+        main_urls, side_urls, statuses = get_recipe_urls(selection, pages=pages)
+
+        mock_fetch.assert_not_called()
+        assert main_urls == ["https://a.com/r1"]
+        assert statuses == {"main course": ("OK", 1), "side dish": ("UNREACHABLE", 0)}
+
+
 class TestCleanupRecipeUrls:
     """Test cleanup_recipe_urls function behavior."""
 
@@ -235,6 +374,40 @@ class TestScrapeRecipe:
         assert result["title"] == "Test Recipe"
         assert len(failed_recipes) == 0
 
+    @patch("web_scraper.scrape_html")
+    def test_drops_fields_not_stored(self, mock_scrape: Mock) -> None:
+        """Only STORED_RECIPE_KEYS fields survive into the stored recipe."""
+        mock_scrape_obj = Mock()
+        mock_scrape_obj.to_json.return_value = {
+            "canonical_url": "https://example.com/recipe",
+            "title": "Test Recipe",
+            "site_name": "Example",
+            "host": "example.com",
+            "ingredients": ["ingredient1"],
+            "instructions": "Do this",
+            "image": "https://example.com/image.jpg",
+            "yields": "4 servings",
+            "nutrients": {"calories": "400"},
+            "ingredient_groups": [{"ingredients": ["ingredient1"]}],
+            "description": "Long blurb",
+        }
+        mock_scrape.return_value = mock_scrape_obj
+
+        result = scraper("html", "https://example.com/recipe", {})
+
+        assert result is not None
+        assert set(result) == {
+            "canonical_url",
+            "title",
+            "site_name",
+            "host",
+            "ingredients",
+            "instructions",
+            "image",
+            "yields",
+            "parser",
+        }
+
     @patch("web_scraper.scrape_html")
     def test_replaces_canonical_url_if_different(self, mock_scrape: Mock) -> None:
         """Test that canonical_url is replaced with input URL if different."""
@@ -348,12 +521,139 @@ class TestScrapeRecipe:
         assert "Scraping error" in failed_recipes["https://example.com/recipe"]
 
 
+_JSONLD_PAGE = """<html><head>
+<meta property="og:site_name" content="Example Kitchen">
+<script type="application/ld+json">
+{"@context": "https://schema.org", "@graph": [
+  {"@type": "WebSite", "name": "Example"},
+  {"@type": ["Recipe"], "name": "Lemon  Chicken",
+   "image": [{"@type": "ImageObject", "url": "https://example.com/a.jpg"}],
+   "recipeIngredient": ["1 lemon", " 2 chicken thighs "],
+   "recipeInstructions": [
+     {"@type": "HowToSection", "name": "Prep", "itemListElement": [
+       {"@type": "HowToStep", "text": "Zest the lemon."}]},
+     {"@type": "HowToStep", "text": "Roast the chicken."}],
+   "totalTime": "PT45M", "recipeYield": "4",
+   "author": {"@type": "Person", "name": "Sam"},
+   "keywords": "chicken, lemon"}
+]}
+</script></head><body></body></html>"""
+
+
+class TestJsonLdFastPath:
+    """Test the schema.org JSON-LD fast path in front of scrape_html."""
+
+    def test_extracts_recipe_from_graph(self) -> None:
+        """A Recipe nested in @graph yields the scraper's dict shape."""
+        recipe = extract_jsonld_recipe(_JSONLD_PAGE, "https://www.example.com/r")
+
+        assert recipe is not None
+        assert recipe["title"] == "Lemon Chicken"
+        assert recipe["site_name"] == "Example Kitchen"
+        assert recipe["host"] == "example.com"
+        assert recipe["image"] == "https://example.com/a.jpg"
+        assert recipe["ingredients"] == ["1 lemon", "2 chicken thighs"]
+        assert recipe["instructions"] == "Prep\nZest the lemon.\nRoast the chicken."
+        assert recipe["total_time"] == 45
+        assert recipe["author"] == "Sam"
+        assert recipe["keywords"] == ["chicken", "lemon"]
+
+    def test_instructions_match_scrape_html(self) -> None:
+        """Section names and step names come out as recipe_scrapers reads them."""
+        page = _JSONLD_PAGE.replace(
+            '{"@type": "HowToStep", "text": "Roast the chicken."}',
+            '{"@type": "HowToSection", "name": "Cook", "itemListElement":'
+            ' {"@type": "HowToStep", "name": "Roast", "text": "Roast it hot."}},'
+            ' {"@type": "HowToStep", "name": "Rest", "text": "Let it sit."}',
+        )
+        url = "https://example.com/r"
+
+        fast = extract_jsonld_recipe(page, url)
+        full = scrape_html(page, url, supported_only=False).to_json()
+
+        assert fast is not None
+        assert fast["instructions_list"] == [
+            "Prep",
+            "Zest the lemon.",
+            "Cook",
+            "Roast it hot.",
+            "Rest",
+            "Let it sit.",
+        ]
+        assert fast["instructions"] == full["instructions"]
+        assert fast["instructions_list"] == full["instructions_list"]
+
+    def test_no_recipe_node_returns_none(self) -> None:
+        """Pages without a Recipe node are left to scrape_html."""
+        html = '<script type="application/ld+json">{"@type": "WebSite"}</script>'
+        assert extract_jsonld_recipe(html, "https://example.com/r") is None
+
+    def test_malformed_block_is_skipped(self) -> None:
+        """Broken JSON in one block doesn't hide a Recipe in another."""
+        html = '<script type="application/ld+json">{oops</script>' + _JSONLD_PAGE
+        assert extract_jsonld_recipe(html, "https://example.com/r") is not None
+
+    @patch("web_scraper.scrape_html")
+    def test_scraper_uses_fast_path_when_complete(self, mock_scrape: Mock) -> None:
+        """A complete JSON-LD recipe skips recipe_scrapers entirely."""
+        failed_recipes: dict[str, str] = {}
+        result = scraper(_JSONLD_PAGE, "https://example.com/r", failed_recipes)
+
+        assert result is not None
+        assert result["parser"] == PARSER_JSONLD
+        assert result["canonical_url"] == "https://example.com/r"
+        mock_scrape.assert_not_called()
+        assert failed_recipes == {}
+
+    @patch("web_scraper.scrape_html")
+    def test_scraper_falls_back_when_keys_missing(self, mock_scrape: Mock) -> None:
+        """A JSON-LD recipe lacking a required key falls back to scrape_html."""
+        page = _JSONLD_PAGE.replace('"image"', '"thumbnail"')
+        mock_scrape.return_value.to_json.return_value = {
+            "canonical_url": "https://example.com/r",
+            "title": "Lemon Chicken",
+            "site_name": "Example Kitchen",
+            "host": "example.com",
+            "ingredients": ["1 lemon"],
+            "instructions": "Roast.",
+            "image": "https://example.com/b.jpg",
+        }
+
+        result = scraper(page, "https://example.com/r", {})
+
+        assert result is not None
+        assert result["parser"] == PARSER_SCRAPE_HTML
+        assert result["image"] == "https://example.com/b.jpg"
+        mock_scrape.assert_called_once()
+
+    @patch("web_scraper.JSONLD_FAST_PATH", False)
+    @patch("web_scraper.scrape_html")
+    def test_fast_path_can_be_disabled(self, mock_scrape: Mock) -> None:
+        """With JSONLD_FAST_PATH off, every page goes through scrape_html."""
+        mock_scrape.side_effect = Exception("parsed")
+
+        failed_recipes: dict[str, str] = {}
+        assert scraper(_JSONLD_PAGE, "https://example.com/r", failed_recipes) is None
+        assert "parsed" in failed_recipes["https://example.com/r"]
+
+    @patch("web_scraper._JSONLD_HELPERS", False)
+    @patch("web_scraper.scrape_html")
+    def test_missing_helpers_disable_fast_path(self, mock_scrape: Mock) -> None:
+        """If recipe_scrapers' private helpers move, scrape_html parses instead."""
+        mock_scrape.side_effect = Exception("parsed")
+
+        failed_recipes: dict[str, str] = {}
+        assert scraper(_JSONLD_PAGE, "https://example.com/r", failed_recipes) is None
+        assert "parsed" in failed_recipes["https://example.com/r"]
+
+
 class TestFetchPage:
     """Test fetch_page reachability classification."""
 
-    @patch("web_scraper.requests.get")
-    def test_reachable_on_200_with_body(self, mock_get: Mock) -> None:
+    @patch("web_scraper.get_session")
+    def test_reachable_on_200_with_body(self, mock_session: Mock) -> None:
         """A 200 response with a non-empty body is classified as reachable."""
+        mock_get = mock_session.return_value.get
         mock_response = Mock()
         mock_response.headers = {"content-type": "text/html; charset=utf-8"}
         mock_response.text = "<html>content</html>"
@@ -368,9 +668,10 @@ class TestFetchPage:
             reachable=True, status_code=200, html="<html>content</html>"
         )
 
-    @patch("web_scraper.requests.get")
-    def test_unreachable_on_200_with_empty_body(self, mock_get: Mock) -> None:
+    @patch("web_scraper.get_session")
+    def test_unreachable_on_200_with_empty_body(self, mock_session: Mock) -> None:
         """A 200 response with a blank body is classified as unreachable."""
+        mock_get = mock_session.return_value.get
         mock_response = Mock()
         mock_response.headers = {"content-type": "text/html; charset=utf-8"}
         mock_response.text = "   "
@@ -384,9 +685,10 @@ class TestFetchPage:
         assert result.reachable is False
         assert result.status_code == 200
 
-    @patch("web_scraper.requests.get")
-    def test_unreachable_on_non_200(self, mock_get: Mock) -> None:
+    @patch("web_scraper.get_session")
+    def test_unreachable_on_non_200(self, mock_session: Mock) -> None:
         """A non-200 status code is classified as unreachable."""
+        mock_get = mock_session.return_value.get
         mock_response = Mock()
         mock_response.headers = {"content-type": "text/html; charset=utf-8"}
         mock_response.text = "Forbidden"
@@ -400,18 +702,67 @@ class TestFetchPage:
         assert result.reachable is False
         assert result.status_code == 403
 
-    @patch("web_scraper.requests.get")
-    def test_unreachable_on_timeout(self, mock_get: Mock) -> None:
+    @patch("web_scraper.get_http_cache")
+    @patch("web_scraper.get_session")
+    def test_not_modified_is_served_from_cache_and_reachable(
+        self, mock_session: Mock, mock_cache: Mock, tmp_path: Path
+    ) -> None:
+        """A 304 revalidation returns the cached body and counts as reachable."""
+        cache = HttpCache(tmp_path, max_bytes=1_000_000, ttl_seconds=3600)
+        cache.store("https://example.com", "<html>cached</html>", {"ETag": '"v1"'})
+        mock_cache.return_value = cache
+        mock_response = Mock()
+        mock_response.status_code = 304
+        mock_response.__enter__ = Mock(return_value=mock_response)
+        mock_response.__exit__ = Mock(return_value=False)
+        mock_session.return_value.get.return_value = mock_response
+
+        result = fetch_page("https://example.com")
+
+        assert result == PageResult(
+            reachable=True, status_code=304, html="<html>cached</html>"
+        )
+        sent = mock_session.return_value.get.call_args.kwargs["headers"]
+        assert sent == {"If-None-Match": '"v1"'}
+
+    @patch("web_scraper.get_http_cache")
+    @patch("web_scraper.get_session")
+    def test_validated_200_is_cached(
+        self, mock_session: Mock, mock_cache: Mock, tmp_path: Path
+    ) -> None:
+        """A 200 with an ETag is stored for the next run's conditional GET."""
+        cache = HttpCache(tmp_path, max_bytes=1_000_000, ttl_seconds=3600)
+        mock_cache.return_value = cache
+        mock_response = Mock()
+        mock_response.headers = {
+            "content-type": "text/html; charset=utf-8",
+            "ETag": "e",
+        }
+        mock_response.text = "<html>fresh</html>"
+        mock_response.status_code = 200
+        mock_response.__enter__ = Mock(return_value=mock_response)
+        mock_response.__exit__ = Mock(return_value=False)
+        mock_session.return_value.get.return_value = mock_response
+
+        fetch_page("https://example.com")
+
+        entry = cache.lookup("https://example.com")
+        assert entry is not None and entry.body == "<html>fresh</html>"
+
+    @patch("web_scraper.get_session")
+    def test_unreachable_on_timeout(self, mock_session: Mock) -> None:
         """A request timeout is classified as unreachable with no status code."""
+        mock_get = mock_session.return_value.get
         mock_get.side_effect = requests.exceptions.Timeout()
 
         result = fetch_page("https://example.com")
 
         assert result == PageResult(reachable=False, status_code=None, html="")
 
-    @patch("web_scraper.requests.get")
-    def test_unreachable_on_connection_error(self, mock_get: Mock) -> None:
+    @patch("web_scraper.get_session")
+    def test_unreachable_on_connection_error(self, mock_session: Mock) -> None:
         """A connection error is classified as unreachable with no status code."""
+        mock_get = mock_session.return_value.get
         mock_get.side_effect = requests.exceptions.ConnectionError()
 
         result = fetch_page("https://example.com")
@@ -2,31 +2,57 @@
 """Desktop training: distill teacher labels into a TF-IDF + ridge student.
 
 Reads seasonal_labels.json + the recipe corpus, fits TF-IDF + multi-output ridge,
-exports the dependency-free seasonal_model.json (numpy-only inference on the Pi),
-and reports holdout MAE vs a deterministic produce-calendar baseline.
+exports the dependency-free seasonal_model.json (numpy-only inference on the Pi)
+plus its memory-mappable binary copy (seasonal_model.npy / .index.json), and
+reports holdout MAE vs a deterministic produce-calendar baseline, plus the
+artifact's size, load time and in-memory footprint.
 
     python train_seasonal_model.py
+    SEASONAL_FEATURIZER=hashing python train_seasonal_model.py
+    SEASONAL_QUANTIZATION=int8 python train_seasonal_model.py
+
+With SEASONAL_QUANTIZATION set, the binary copy's weights are quantized, but only
+if that costs at most SEASONAL_QUANTIZATION_MAX_MAE_DELTA holdout MAE; otherwise
+nothing is written.
 """
 
 from __future__ import annotations
 
 import json
 import logging
+import os
+import sys
+import time
 from typing import Any
 
 import numpy as np
-from sklearn.feature_extraction.text import TfidfVectorizer
+from scipy.sparse import csr_matrix
+from sklearn.feature_extraction.text import TfidfTransformer, TfidfVectorizer
 from sklearn.linear_model import Ridge
 from sklearn.model_selection import train_test_split
 
 from config import (
+    SEASONAL_FEATURIZER,
+    SEASONAL_HASH_FEATURES,
     SEASONAL_LABELS_FILENAME,
     SEASONAL_MODEL_FILENAME,
+    SEASONAL_QUANTIZATION,
+    SEASONAL_QUANTIZATION_MAX_MAE_DELTA,
     UNUSED_MAINS_FILENAME,
     UNUSED_SIDES_FILENAME,
 )
 from file_utils import load_json
-from seasonal_model import SEASONS, predict_seasons, recipe_text, tokenize
+from seasonal_model import (
+    SEASONS,
+    SeasonalModel,
+    binary_paths,
+    hash_feature,
+    load_binary_model,
+    recipe_text,
+    save_binary_model,
+    token_counts,
+    tokenize,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -39,39 +65,88 @@ _PRODUCE = {
 }
 
 
+class HashingTfidf:
+    """TF-IDF (l2) over hashed token columns: the "hashing" featurizer.
+
+    Counts come from seasonal_model.token_counts + hash_feature, the same code
+    that featurizes at inference time.
+    """
+
+    def __init__(self, n_features: int = SEASONAL_HASH_FEATURES) -> None:
+        """Hash tokens into n_features columns (the model's SEASONAL_HASH_FEATURES)."""
+        self.n_features = n_features
+        self.tfidf = TfidfTransformer(norm="l2", smooth_idf=True, sublinear_tf=False)
+
+    def _counts(self, texts: list[str]) -> csr_matrix:
+        """Hashed token counts of texts, one row per text."""
+        counts, indices, indptr = token_counts(
+            texts, lambda token: hash_feature(token, self.n_features)
+        )
+        return csr_matrix(
+            (counts, indices, indptr), shape=(len(texts), self.n_features)
+        )
+
+    def fit_transform(self, texts: list[str]) -> csr_matrix:
+        """Learn the per-column idf and return the TF-IDF rows of texts."""
+        return self.tfidf.fit_transform(self._counts(texts))
+
+    def transform(self, texts: list[str]) -> csr_matrix:
+        """Return the TF-IDF rows of texts."""
+        return self.tfidf.transform(self._counts(texts))
+
+    @property
+    def idf_(self) -> np.ndarray:
+        """Per-column idf weights (like TfidfVectorizer.idf_)."""
+        return np.asarray(self.tfidf.idf_)
+
+
 def fit(
-    texts: list[str], Y: np.ndarray, alpha: float = 0.3, max_features: int = 4000
-) -> tuple[TfidfVectorizer, Ridge]:
+    texts: list[str],
+    Y: np.ndarray,
+    alpha: float = 0.3,
+    max_features: int = 4000,
+    featurizer: str = SEASONAL_FEATURIZER,
+) -> tuple[TfidfVectorizer | HashingTfidf, Ridge]:
     """Fit TF-IDF (l2) + multi-output ridge on texts -> 4 season targets.
 
     alpha=0.3 lightly decompresses predictions (sharper season contrast) versus
     the ridge default while keeping holdout MAE well below the calendar baseline.
+    featurizer "hashing" ignores max_features (the width is SEASONAL_HASH_FEATURES).
     """
-    vec = TfidfVectorizer(
-        tokenizer=tokenize,
-        token_pattern=None,
-        lowercase=False,  # tokenize() already lowercases
-        max_features=max_features,
-        norm="l2",
-        smooth_idf=True,
-        sublinear_tf=False,
-    )
+    if featurizer == "hashing":
+        vec: TfidfVectorizer | HashingTfidf = HashingTfidf()
+    elif featurizer == "vocabulary":
+        vec = TfidfVectorizer(
+            tokenizer=tokenize,
+            token_pattern=None,
+            lowercase=False,  # tokenize() already lowercases
+            max_features=max_features,
+            norm="l2",
+            smooth_idf=True,
+            sublinear_tf=False,
+        )
+    else:
+        raise ValueError(f"Unknown seasonal featurizer: {featurizer!r}")
     X = vec.fit_transform(texts)
     ridge = Ridge(alpha=alpha)
     ridge.fit(X, Y)
     return vec, ridge
 
 
-def export_model(vec: TfidfVectorizer, ridge: Ridge) -> dict[str, Any]:
+def export_model(vec: TfidfVectorizer | HashingTfidf, ridge: Ridge) -> dict[str, Any]:
     """Serialize the fitted vectorizer + ridge into the numpy-only artifact dict."""
-    return {
-        "version": 1,
-        "seasons": list(SEASONS),
-        "vocabulary": {t: int(i) for t, i in vec.vocabulary_.items()},
-        "idf": vec.idf_.tolist(),
-        "coef": ridge.coef_.tolist(),
-        "intercept": ridge.intercept_.tolist(),
-    }
+    artifact: dict[str, Any] = {"version": 1, "seasons": list(SEASONS)}
+    if isinstance(vec, HashingTfidf):
+        artifact["featurizer"] = "hashing"
+    else:
+        artifact["featurizer"] = "vocabulary"
+        artifact["vocabulary"] = {t: int(i) for t, i in vec.vocabulary_.items()}
+    artifact.update(
+        idf=vec.idf_.tolist(),
+        coef=ridge.coef_.tolist(),
+        intercept=ridge.intercept_.tolist(),
+    )
+    return artifact
 
 
 def calendar_baseline(text: str) -> dict[str, float]:
@@ -87,6 +162,38 @@ def calendar_baseline(text: str) -> dict[str, float]:
     return {s: raw[s] / total for s in SEASONS}
 
 
+def quantization_mae_delta(
+    model: SeasonalModel, quantization: str, texts: list[str], Y: np.ndarray
+) -> float:
+    """Holdout MAE of the quantized model minus that of model (full precision)."""
+    full = np.mean(np.abs(model.score_texts(texts) - Y))
+    reduced = np.mean(np.abs(model.quantized(quantization).score_texts(texts) - Y))
+    return float(reduced - full)
+
+
+def _report_footprint(path: str) -> None:
+    """Log the artifact's size on disk, load time, and in-memory footprint."""
+    start = time.perf_counter()
+    model = load_binary_model(path)
+    load_ms = (time.perf_counter() - start) * 1000
+    if model is None:
+        weights_path, _ = binary_paths(path)
+        logger.error(f"{weights_path} was not written; no footprint to report")
+        return
+    vocab_bytes = 0
+    if model.vocabulary is not None:
+        vocab_bytes = sys.getsizeof(model.vocabulary) + sum(
+            sys.getsizeof(token) for token in model.vocabulary
+        )
+    array_bytes = model.idf.nbytes + model.coef_t.nbytes
+    logger.info(
+        f"Artifact: {os.path.getsize(path) // 1024} KB JSON, "
+        f"binary load {load_ms:.1f} ms, "
+        f"in memory {vocab_bytes // 1024} KB vocabulary "
+        f"+ {array_bytes // 1024} KB arrays"
+    )
+
+
 def _load_dataset() -> tuple[list[str], np.ndarray]:
     """Join labels with recipe text; return aligned (texts, Y)."""
     labels, _ = load_json(SEASONAL_LABELS_FILENAME)
@@ -111,16 +218,33 @@ def main() -> None:
     vec, ridge = fit(tr_x, tr_y)
     artifact = export_model(vec, ridge)
 
-    student = np.array(
-        [[predict_seasons(t, artifact)[s] for s in SEASONS] for t in te_x]
-    )
+    model = SeasonalModel.from_artifact(artifact)
+    student = model.score_texts(te_x)
     baseline = np.array([[calendar_baseline(t)[s] for s in SEASONS] for t in te_x])
-    logger.info(f"Student  MAE: {np.mean(np.abs(student - te_y)):.3f}")
+    logger.info(
+        f"Student  MAE: {np.mean(np.abs(student - te_y)):.3f} "
+        f"({SEASONAL_FEATURIZER} featurizer)"
+    )
     logger.info(f"Calendar MAE: {np.mean(np.abs(baseline - te_y)):.3f}")
+    if SEASONAL_QUANTIZATION:
+        delta = quantization_mae_delta(model, SEASONAL_QUANTIZATION, te_x, te_y)
+        logger.info(f"{SEASONAL_QUANTIZATION} MAE delta: {delta:+.4f}")
+        if delta > SEASONAL_QUANTIZATION_MAX_MAE_DELTA:
+            logger.error(
+                f"{SEASONAL_QUANTIZATION} costs more than "
+                f"{SEASONAL_QUANTIZATION_MAX_MAE_DELTA} MAE; not exporting"
+            )
+            sys.exit(1)
 
     with open(SEASONAL_MODEL_FILENAME, "w", encoding="utf-8") as f:
         json.dump(artifact, f)
-    logger.info(f"Wrote {SEASONAL_MODEL_FILENAME} (vocab={len(artifact['idf'])})")
+    save_binary_model(artifact, SEASONAL_MODEL_FILENAME, SEASONAL_QUANTIZATION)
+    weights_path, _ = binary_paths(SEASONAL_MODEL_FILENAME)
+    logger.info(
+        f"Wrote {SEASONAL_MODEL_FILENAME} and {weights_path} "
+        f"(vocab={len(artifact['idf'])})"
+    )
+    _report_footprint(SEASONAL_MODEL_FILENAME)
 
 
 if __name__ == "__main__":
@@ -1,28 +1,89 @@
 """Web scraping utilities for fetching and parsing recipes."""
 
+import asyncio
+import json
 import re
+from collections import defaultdict
+from collections.abc import Iterator, Mapping
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
+from functools import lru_cache
+from typing import Literal
+from urllib.parse import urlsplit
 
 import requests
 from recipe_scrapers import scrape_html
+from requests.adapters import HTTPAdapter
+
+# The JSON-LD fast path reuses recipe_scrapers' own field normalizers, so both
+# parsers store identical values. They are private helpers: if an upgrade moves
+# them, the fast path switches off and every page goes through scrape_html.
+try:
+    from recipe_scrapers._utils import (
+        csv_to_tags,
+        get_host_name,
+        get_minutes,
+        get_yields,
+        normalize_string,
+    )
+except ImportError:
+    _JSONLD_HELPERS = False
+else:
+    _JSONLD_HELPERS = True
 
 from config import (
     DEBUG_TIMEOUT,
     HEADERS,
+    HOST_BURST,
+    HOST_MAX_CONNECTIONS,
+    HOST_REQUESTS_PER_SECOND,
+    HTTP_CACHE_DIR,
+    HTTP_CACHE_MAX_BYTES,
+    HTTP_CACHE_TTL_SECONDS,
+    HTTP_POOL_CONNECTIONS,
+    HTTP_POOL_MAXSIZE,
+    JSONLD_FAST_PATH,
+    LISTING_CONCURRENCY,
+    LISTING_PER_HOST,
     NORMAL_TIMEOUT,
     REQUIRED_RECIPE_KEYS,
+    STORED_RECIPE_KEYS,
     URL_EXCLUSION_PATTERNS,
     URL_FIX_DOMAIN,
     URL_FIX_PREFIX,
 )
+from host_scheduler import HostLimit, HostScheduler, limits_from_websites
+from http_cache import HttpCache
+from keyword_matcher import KeywordMatcher
 from site_health import classify_outcome
+from websites import WEBSITES, SiteInfo
+
+_COURSES: tuple[Literal["main course"], Literal["side dish"]] = (
+    "main course",
+    "side dish",
+)
+
+# Values of the "parser" key every scraped recipe carries: which path built it.
+PARSER_JSONLD = "jsonld"
+PARSER_SCRAPE_HTML = "scrape_html"
+
+_JSONLD_RE = re.compile(
+    r"<script[^>]*\btype\s*=\s*[\"']?application/ld\+json[\"']?[^>]*>(.*?)</script>",
+    re.IGNORECASE | re.DOTALL,
+)
+_OG_SITE_NAME_RE = re.compile(
+    r"<meta[^>]*\bproperty\s*=\s*[\"']og:site_name[\"'][^>]*"
+    r"\bcontent\s*=\s*[\"']([^\"']*)",
+    re.IGNORECASE,
+)
 
 
 @dataclass(frozen=True)
 class PageResult:
     """Outcome of fetching a listing page, for health monitoring.
 
-    reachable is True only for an HTTP 200 with a non-empty body.
+    reachable is True only for an HTTP 200 (or a 304 answered from the HTTP
+    cache) with a non-empty body.
     """
 
     reachable: bool
@@ -30,6 +91,45 @@ class PageResult:
     html: str
 
 
+@lru_cache(maxsize=1)
+def get_session() -> requests.Session:
+    """Return the run-wide HTTP session shared by every listing + recipe fetch.
+
+    Keeps connections alive per host, so the dozens of pages fetched from one
+    site reuse a TCP/TLS connection instead of handshaking per page. HEADERS
+    are set once on the session. Cached: built on first use, then reused.
+    """
+    session = requests.Session()
+    session.headers.update(HEADERS)
+    adapter = HTTPAdapter(
+        pool_connections=HTTP_POOL_CONNECTIONS, pool_maxsize=HTTP_POOL_MAXSIZE
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+@lru_cache(maxsize=1)
+def get_host_scheduler() -> HostScheduler:
+    """Return the run-wide per-host politeness scheduler (see host_scheduler).
+
+    Uses the config defaults, plus any requests_per_second / max_connections
+    overrides set on WEBSITES entries.
+    """
+    default = HostLimit(
+        requests_per_second=HOST_REQUESTS_PER_SECOND,
+        max_connections=HOST_MAX_CONNECTIONS,
+        burst=HOST_BURST,
+    )
+    return HostScheduler(default, limits_from_websites(WEBSITES, default))
+
+
+@lru_cache(maxsize=1)
+def get_http_cache() -> HttpCache:
+    """Return the run-wide conditional-GET cache (see http_cache)."""
+    return HttpCache(HTTP_CACHE_DIR, HTTP_CACHE_MAX_BYTES, HTTP_CACHE_TTL_SECONDS)
+
+
 def _decode(response: requests.Response) -> str:
     """Decode a response body, sniffing the charset when the server omits one.
 
@@ -43,29 +143,60 @@ def _decode(response: requests.Response) -> str:
     return response.text
 
 
+def _get_cached(url: str, timeout: int) -> tuple[int, str]:
+    """GET url with conditional headers from the HTTP cache.
+
+    Returns (status_code, body). A 304 is answered with the cached body; a
+    200 carrying an ETag / Last-Modified refreshes the cache entry.
+    """
+    cache = get_http_cache()
+    entry = cache.lookup(url)
+    validators = entry.validators() if entry is not None else {}
+    with (
+        get_host_scheduler().slot(url),
+        get_session().get(url, timeout=timeout, headers=validators) as response,
+    ):
+        if response.status_code == 304 and entry is not None:
+            cache.touch(url)
+            return 304, entry.body
+        body = _decode(response)
+        if response.status_code == 200:
+            cache.store(url, body, response.headers)
+        return response.status_code, body
+
+
 def fetch_page(url: str, debug_mode: bool = False) -> PageResult:
-    """Fetch a listing page, reporting reachability for health monitoring."""
+    """Fetch a listing page, reporting reachability for health monitoring.
+
+    Listing pages always go through the conditional-GET cache, so a page that
+    hasn't changed since last run costs a bodiless 304 and counts as reachable.
+    """
     timeout = DEBUG_TIMEOUT if debug_mode else NORMAL_TIMEOUT
     try:
-        with requests.get(url, headers=HEADERS, timeout=timeout) as response:
-            body = _decode(response)
-            reachable = response.status_code == 200 and bool(body.strip())
-            return PageResult(
-                reachable=reachable,
-                status_code=response.status_code,
-                html=body,
-            )
+        status_code, body = _get_cached(url, timeout)
+        reachable = status_code in (200, 304) and bool(body.strip())
+        return PageResult(reachable=reachable, status_code=status_code, html=body)
     except (requests.exceptions.Timeout, requests.exceptions.ConnectionError):
         print(f"{url} unreachable. Skipping")
         return PageResult(reachable=False, status_code=None, html="")
 
 
 def get_html(website: str, debug_mode: bool = False) -> str:
-    """Fetch HTML content from a website."""
+    """Fetch HTML content from a website.
+
+    Debug runs re-fetch the same recipe pages over and over, so they go through
+    the conditional-GET cache. Normal runs only ever fetch never-seen recipe
+    URLs once, so caching them would just evict the listing pages.
+    """
     timeout = DEBUG_TIMEOUT if debug_mode else NORMAL_TIMEOUT
 
     try:
-        with requests.get(website, headers=HEADERS, timeout=timeout) as response:
+        if debug_mode:
+            return _get_cached(website, timeout)[1]
+        with (
+            get_host_scheduler().slot(website),
+            get_session().get(website, timeout=timeout) as response,
+        ):
             return _decode(response)
     except requests.exceptions.Timeout:
         # Handle timeout gracefully
@@ -73,8 +204,61 @@ def get_html(website: str, debug_mode: bool = False) -> str:
         return ""
 
 
+async def _fetch_pages_async(
+    urls: list[str], debug_mode: bool, pool: ThreadPoolExecutor
+) -> dict[str, PageResult]:
+    """Fetch all urls at once, capped globally and per host.
+
+    Each fetch runs the blocking fetch_page on `pool`; asyncio only schedules
+    them under LISTING_CONCURRENCY / LISTING_PER_HOST semaphores. Pages whose
+    fetch raised are left out, so the caller can fall back to fetch_page.
+    """
+    loop = asyncio.get_running_loop()
+    global_limit = asyncio.Semaphore(LISTING_CONCURRENCY)
+    host_limits: defaultdict[str, asyncio.Semaphore] = defaultdict(
+        lambda: asyncio.Semaphore(LISTING_PER_HOST)
+    )
+
+    async def _fetch(url: str) -> PageResult:
+        async with global_limit, host_limits[urlsplit(url).netloc]:
+            return await loop.run_in_executor(pool, fetch_page, url, debug_mode)
+
+    results = await asyncio.gather(
+        *(_fetch(url) for url in urls), return_exceptions=True
+    )
+    return {
+        url: result
+        for url, result in zip(urls, results, strict=True)
+        if isinstance(result, PageResult)
+    }
+
+
+def fetch_listing_pages(
+    websites: Mapping[str, SiteInfo], debug_mode: bool = False
+) -> dict[str, PageResult]:
+    """Fetch every site's main + side listing pages concurrently.
+
+    Returns a listing-URL -> PageResult map to hand to get_recipe_urls, so the
+    ~40 listing round trips overlap instead of running back to back.
+    """
+    urls = list(
+        dict.fromkeys(
+            site[course]
+            for site in websites.values()
+            for course in _COURSES
+            if course in site
+        )
+    )
+    if not urls:
+        return {}
+    with ThreadPoolExecutor(max_workers=LISTING_CONCURRENCY) as pool:
+        return asyncio.run(_fetch_pages_async(urls, debug_mode, pool))
+
+
 def get_recipe_urls(
-    selection: dict, debug_mode: bool = False
+    selection: dict,
+    debug_mode: bool = False,
+    pages: Mapping[str, PageResult] | None = None,
 ) -> tuple[list[str], list[str], dict[str, tuple[str, int]]]:
     """Get individual recipe URLs from a website's listing pages.
 
@@ -82,13 +266,16 @@ def get_recipe_urls(
     ("main course" / "side dish") to (status, raw_match_count) for health
     monitoring. Status is derived from the raw regex match count, before
     cleanup_recipe_urls filters excluded URLs, so an all-filtered page is not
-    mistaken for a broken regex.
+    mistaken for a broken regex. Listing pages already fetched by
+    fetch_listing_pages are taken from `pages`; any missing page is fetched here.
     """
     url_lists: dict[str, list[str]] = {}
     statuses: dict[str, tuple[str, int]] = {}
 
-    for course in ("main course", "side dish"):
-        page = fetch_page(selection[course], debug_mode)
+    for course in _COURSES:
+        page = (pages or {}).get(selection[course])
+        if page is None:
+            page = fetch_page(selection[course], debug_mode)
         urls = re.findall(selection["regex"], page.html)
         match_count = len(urls)
         cleanup_recipe_urls(urls)
@@ -98,6 +285,12 @@ def get_recipe_urls(
     return url_lists["main course"], url_lists["side dish"], statuses
 
 
+# Every keyword of URL_EXCLUSION_PATTERNS, each its own group.
+_URL_EXCLUSION_MATCHER = KeywordMatcher(
+    {keyword: (keyword,) for pattern in URL_EXCLUSION_PATTERNS for keyword in pattern}
+)
+
+
 def cleanup_recipe_urls(urls: list[str]) -> None:
     """Remove bad URL entries based on exclusion patterns."""
     bad_indices = []
@@ -110,15 +303,10 @@ def cleanup_recipe_urls(urls: list[str]) -> None:
             urls[n] = f"{URL_FIX_DOMAIN}{url}"
             url_lower = urls[n].lower()  # Update for pattern checking
 
-        # Check against exclusion patterns
-        should_exclude = False
-        for pattern in URL_EXCLUSION_PATTERNS:
-            # Check if all keywords in the pattern are present in the URL
-            if all(keyword in url_lower for keyword in pattern):
-                should_exclude = True
-                break
-
-        if should_exclude:
+        # Check against exclusion patterns: excluded if all keywords of any
+        # one pattern are present in the URL
+        found = _URL_EXCLUSION_MATCHER.groups_in(url_lower)
+        if any(found.issuperset(pattern) for pattern in URL_EXCLUSION_PATTERNS):
             bad_indices.append(n)
 
     # Remove bad entries in reverse order to avoid index shifting
@@ -126,11 +314,179 @@ def cleanup_recipe_urls(urls: list[str]) -> None:
         del urls[i]
 
 
+def _iter_jsonld_nodes(html: str) -> Iterator[dict]:
+    """Yield every JSON object in the page's ld+json blocks, @graph flattened.
+
+    A regex scan over the raw HTML; no DOM is built. Unparseable blocks are
+    skipped.
+    """
+    for match in _JSONLD_RE.finditer(html):
+        try:
+            data = json.loads(match.group(1))
+        except ValueError:
+            continue
+        stack = [data]
+        while stack:
+            node = stack.pop()
+            if isinstance(node, list):
+                stack.extend(reversed(node))
+            elif isinstance(node, dict):
+                graph = node.get("@graph")
+                if isinstance(graph, list):
+                    stack.extend(reversed(graph))
+                yield node
+
+
+def _has_type(node: dict, schema_type: str) -> bool:
+    """True if a JSON-LD node's @type is (or includes) schema_type."""
+    node_type = node.get("@type")
+    if isinstance(node_type, list):
+        return schema_type in node_type
+    return node_type == schema_type
+
+
+def _instruction_texts(item: object) -> list[str]:
+    """Flatten recipeInstructions (strings, HowToStep, HowToSection) to steps.
+
+    Mirrors recipe_scrapers' schema.org reader: a section's name is its own
+    line before its steps, and a step's name is kept only when it isn't just
+    the start of its text.
+    """
+    if isinstance(item, str):
+        return [normalize_string(item)] if item.strip() else []
+    if isinstance(item, list):
+        return [text for sub in item for text in _instruction_texts(sub)]
+    if not isinstance(item, dict):
+        return []
+    if _has_type(item, "HowToSection"):
+        name = item.get("name") or item.get("Name")
+        heading = _instruction_texts(name) if isinstance(name, str) else []
+        return heading + _instruction_texts(item.get("itemListElement") or [])
+    text = item.get("text") or ""
+    name = item.get("name")
+    distinct_name = (
+        isinstance(name, str)
+        and isinstance(text, str)
+        and not text.startswith(name.rstrip("."))
+    )
+    heading = _instruction_texts(name) if distinct_name else []
+    return heading + _instruction_texts(text)
+
+
+def _image_url(image: object) -> str | None:
+    """Pick the first absolute image URL from a schema.org image value."""
+    if isinstance(image, list):
+        image = image[0] if image else None
+    if isinstance(image, dict):
+        image = image.get("url")
+    if isinstance(image, str) and image.startswith(("http://", "https://")):
+        return image
+    return None
+
+
+def _author_name(author: object) -> str | None:
+    """Return the (first) author's name from a schema.org author value."""
+    if isinstance(author, list):
+        author = author[0] if author else None
+    if isinstance(author, dict):
+        author = author.get("name")
+    return author.strip() if isinstance(author, str) else None
+
+
+def extract_jsonld_recipe(html: str, url: str) -> dict | None:
+    """Build a recipe dict straight from the page's schema.org Recipe JSON-LD.
+
+    Returns the same shape scraper() stores for the fields it can read, or None
+    if the page has no Recipe node. The caller decides whether the result is
+    complete enough (see REQUIRED_RECIPE_KEYS) to skip the full scrape_html.
+    """
+    nodes = list(_iter_jsonld_nodes(html))
+    recipe = next((node for node in nodes if _has_type(node, "Recipe")), None)
+    if recipe is None:
+        return None
+
+    og_site_name = _OG_SITE_NAME_RE.search(html)
+    site_name = (
+        og_site_name.group(1)
+        if og_site_name
+        else next((n.get("name") for n in nodes if _has_type(n, "WebSite")), None)
+    )
+    ingredients = [
+        normalize_string(str(item))
+        for item in recipe.get("recipeIngredient") or []
+        if str(item).strip()
+    ]
+    instructions_list = _instruction_texts(recipe.get("recipeInstructions"))
+    elements: dict = {
+        "canonical_url": url,
+        "host": get_host_name(url),
+        "site_name": normalize_string(site_name) if site_name else None,
+        "title": normalize_string(str(recipe.get("name") or "")),
+        "image": _image_url(recipe.get("image")),
+        "ingredients": ingredients,
+        "ingredient_groups": [{"ingredients": ingredients, "purpose": None}],
+        "instructions": "\n".join(instructions_list),
+        "instructions_list": instructions_list,
+        "author": _author_name(recipe.get("author")),
+    }
+
+    # Optional fields: a malformed value just leaves that field out.
+    optional = {
+        "yields": lambda: get_yields(recipe["recipeYield"]),
+        "total_time": lambda: get_minutes(recipe["totalTime"]),
+        "prep_time": lambda: get_minutes(recipe["prepTime"]),
+        "cook_time": lambda: get_minutes(recipe["cookTime"]),
+        "description": lambda: normalize_string(recipe["description"]),
+        "keywords": lambda: csv_to_tags(
+            ", ".join(recipe["keywords"])
+            if isinstance(recipe["keywords"], list)
+            else recipe["keywords"]
+        ),
+    }
+    for key, read in optional.items():
+        try:
+            value = read()
+        except Exception:
+            continue
+        if value not in (None, "", []):
+            elements[key] = value
+    return elements
+
+
+def _has_required_keys(recipe_elements: dict) -> bool:
+    """True if every REQUIRED_RECIPE_KEYS field is present and non-empty."""
+    return all(recipe_elements.get(key) for key in REQUIRED_RECIPE_KEYS)
+
+
+def _extract_recipe(html: str, url: str) -> dict:
+    """Build recipe elements via the JSON-LD fast path, else full scrape_html.
+
+    The fast path is only taken when it yields every required key; anything
+    less falls back to recipe_scrapers. The "parser" key records which path
+    built the recipe, so the speedup can be measured per host.
+    """
+    if JSONLD_FAST_PATH and _JSONLD_HELPERS:
+        try:
+            fast = extract_jsonld_recipe(html, url)
+        except Exception:
+            fast = None
+        if fast is not None and _has_required_keys(fast):
+            fast["parser"] = PARSER_JSONLD
+            return fast
+    recipe_elements: dict = scrape_html(html, url).to_json()
+    recipe_elements["parser"] = PARSER_SCRAPE_HTML
+    return recipe_elements
+
+
+def trim_recipe(recipe: Mapping) -> dict:
+    """Return recipe with only the STORED_RECIPE_KEYS fields it has."""
+    return {key: recipe[key] for key in STORED_RECIPE_KEYS if key in recipe}
+
+
 def scraper(html: str, url: str, failed_recipes: dict) -> dict | None:
     """Scrape URL and returns hhursev recipe_scraper elements."""
     try:
-        scrape = scrape_html(html, url)
-        recipe_elements = scrape.to_json()
+        recipe_elements = _extract_recipe(html, url)
         # Replace returned canonical_url with the input URL if they differ
         if recipe_elements["canonical_url"] != url:
             recipe_elements["canonical_url"] = url
@@ -160,5 +516,16 @@ def scraper(html: str, url: str, failed_recipes: dict) -> dict | None:
         failed_recipes[url] = f"FAILS due to: {e}"
         return None
 
-    # Everything passed, return the elements
-    return recipe_elements
+    # Everything passed, return the fields worth storing
+    return trim_recipe(recipe_elements)
+
+
+def parse_recipe(html: str, url: str) -> tuple[dict | None, dict[str, str]]:
+    """Run scraper() on already-fetched HTML, returning (recipe, its failures).
+
+    A top-level, picklable entry point for parser worker processes: the
+    failed_recipes entry scraper() would record is returned instead of written
+    to a shared dict, so the reason survives the trip back intact.
+    """
+    failures: dict[str, str] = {}
+    return scraper(html, url, failures), failures
@@ -6,6 +6,11 @@
 # 2 - address for main course
 # 3 - address for side dishes
 # 4 - address for spider (not yet implemented)
+#
+# Optional per-site politeness overrides (see host_scheduler), applied to the
+# host of the site's listing URLs; defaults come from config.HOST_*:
+#   "requests_per_second" - sustained request budget for the host
+#   "max_connections"     - simultaneous connections to the host
 
 # --------------------------------------------------------------------------- #
 """
@@ -33,7 +38,20 @@ loveandlemons.com
 
 # --------------------------------------------------------------------------- #
 
-WEBSITES = {
+from typing import NotRequired, TypedDict
+
+SiteInfo = TypedDict(
+    "SiteInfo",
+    {
+        "regex": str,
+        "main course": str,
+        "side dish": str,
+        "requests_per_second": NotRequired[float],
+        "max_connections": NotRequired[int],
+    },
+)
+
+WEBSITES: dict[str, SiteInfo] = {
     "Recipe Runner": {
         "regex": r'a href="(\S*)" tabindex="-1" aria-hidden="true"',
         "main course": "https://www.reciperunner.com/category/recipes/dinners/",
@@ -68,6 +86,9 @@ WEBSITES = {
         "regex": r'a.*class="comp mntl-card-list-items mntl-document-card mntl-card card card--no-image".*href="(\S*)"',
         "main course": "https://www.thespruceeats.com/dinner-4162806",
         "side dish": "https://www.thespruceeats.com/side-dishes-4162722",
+        # Dotdash sites throttle bursts hard; stay well under their limit.
+        "requests_per_second": 0.5,
+        "max_connections": 1,
     },
     "Nourished By Nutrition": {
         "regex": r'a class="post" href="(\S*)"',